@@ -0,0 +1,25 @@
+# backend/domainscanner/findings.py
+"""
+Persist header-analysis findings as DomainHeaderFinding rows.
+"""
+from .models import DomainHeaderFinding
+
+
+def finding_rows(scan, analysis):
+    return [
+        DomainHeaderFinding(
+            scan=scan, domain=scan.domain, code=f["id"], priority=f["priority"], header=f["header"][:100],
+            description=f["desc"], suggestion=f.get("suggestion", ""), evidence=f.get("evidence", "")[:255],
+        )
+        for f in (analysis or {}).get("findings", [])
+    ]
+
+
+def save_findings(scans_and_analyses):
+    """[(DomainScan, analysis), ...] -> one bulk INSERT of their findings."""
+    rows = []
+    for scan, analysis in scans_and_analyses:
+        if scan is not None and scan.pk is not None:
+            rows.extend(finding_rows(scan, analysis))
+    DomainHeaderFinding.objects.bulk_create(rows)
+    return len(rows)
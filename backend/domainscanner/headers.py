@@ -0,0 +1,198 @@
+# backend/domainscanner/headers.py
+"""
+Security-header analysis for domain probes.
+
+Rules are compiled once, at import, into RULES: lower-cased header name
+-> checks for that header's value. Analysing a response is one pass over
+its (name, value) pairs with a dict lookup each, then one set difference
+for the headers that must be present but weren't seen.
+
+Findings use the same shape as sslscanner's vulnerabilities:
+  {"id", "priority", "desc", "suggestion"} plus "header" and "evidence".
+Evidence is the header value, except for Set-Cookie where the cookie value
+(often a live session token) is replaced by REDACTED.
+"""
+import re
+
+PRIORITIES = ("high", "medium", "low", "info")
+
+HSTS_MIN_AGE = 180 * 24 * 3600
+_MAX_AGE = re.compile(r"max-age\s*=\s*\"?(\d+)", re.I)
+_VERSION = re.compile(r"\d+\.\d+")
+_CSP_DIRECTIVE = re.compile(r"\s*([a-z-]+)\s*([^;]*)", re.I)
+EVIDENCE_MAX = 200
+REDACTED = "<redacted>"
+
+
+def _finding(fid, priority, desc, suggestion):
+    return {"id": fid, "priority": priority, "desc": desc, "suggestion": suggestion}
+
+
+# ---- per-header checks: (value, context) -> [finding, ...] ----
+
+def _check_hsts(value, ctx):
+    if ctx["scheme"] != "https":
+        return []  # browsers ignore HSTS over plain HTTP
+    m = _MAX_AGE.search(value)
+    if not m:
+        return [_finding("HDR-HSTS-INVALID", "medium", "Strict-Transport-Security has no valid max-age",
+                         "Send Strict-Transport-Security: max-age=31536000; includeSubDomains")]
+    age = int(m.group(1))
+    if age == 0:
+        return [_finding("HDR-HSTS-DISABLED", "medium", "Strict-Transport-Security max-age=0 disables HSTS",
+                         "Set max-age to at least 180 days")]
+    out = []
+    if age < HSTS_MIN_AGE:
+        out.append(_finding("HDR-HSTS-SHORT", "low", f"HSTS max-age is only {age} seconds",
+                            "Set max-age to at least 15552000 (180 days)"))
+    if "includesubdomains" not in value.lower():
+        out.append(_finding("HDR-HSTS-NO-SUBDOMAINS", "info", "HSTS does not cover subdomains",
+                            "Add includeSubDomains once every subdomain serves HTTPS"))
+    return out
+
+
+def _csp_directives(value):
+    directives = {}
+    for part in value.split(";"):
+        m = _CSP_DIRECTIVE.match(part)
+        if m and m.group(1):
+            directives.setdefault(m.group(1).lower(), m.group(2).split())
+    return directives
+
+
+def _check_csp(value, ctx):
+    directives = _csp_directives(value)
+    ctx["csp_frame_ancestors"] = "frame-ancestors" in directives
+    scripts = directives.get("script-src", directives.get("default-src"))
+    out = []
+    if scripts is None:
+        out.append(_finding("HDR-CSP-NO-SCRIPT-SRC", "low", "Content-Security-Policy does not restrict scripts",
+                            "Add a script-src (or default-src) directive"))
+        return out
+    lowered = [s.lower() for s in scripts]
+    if "'unsafe-inline'" in lowered and not any(s.startswith(("'nonce-", "'sha")) for s in lowered):
+        out.append(_finding("HDR-CSP-UNSAFE-INLINE", "medium", "CSP allows inline scripts ('unsafe-inline')",
+                            "Use nonces or hashes instead of 'unsafe-inline'"))
+    if "'unsafe-eval'" in lowered:
+        out.append(_finding("HDR-CSP-UNSAFE-EVAL", "low", "CSP allows eval() ('unsafe-eval')",
+                            "Remove 'unsafe-eval'"))
+    if any(s in ("*", "http:", "https:", "data:") for s in lowered):
+        out.append(_finding("HDR-CSP-WILDCARD", "medium", "CSP allows scripts from any origin",
+                            "List the script origins explicitly"))
+    return out
+
+
+def _check_xfo(value, ctx):
+    v = value.strip().upper()
+    if v in ("DENY", "SAMEORIGIN"):
+        return []
+    if v.startswith("ALLOW-FROM"):
+        return [_finding("HDR-XFO-ALLOW-FROM", "low", "X-Frame-Options ALLOW-FROM is ignored by modern browsers",
+                         "Use CSP frame-ancestors instead")]
+    return [_finding("HDR-XFO-INVALID", "low", f"Invalid X-Frame-Options value '{value.strip()}'",
+                     "Use DENY or SAMEORIGIN")]
+
+
+def _check_xcto(value, ctx):
+    if value.strip().lower() == "nosniff":
+        return []
+    return [_finding("HDR-XCTO-INVALID", "low", "X-Content-Type-Options is not 'nosniff'",
+                     "Send X-Content-Type-Options: nosniff")]
+
+
+def _check_cookie(value, ctx):
+    name = value.split("=", 1)[0].strip() or "?"
+    attrs = {a.strip().split("=", 1)[0].lower() for a in value.split(";")[1:]}
+    out = []
+    if ctx["scheme"] == "https" and "secure" not in attrs:
+        out.append(_finding("HDR-COOKIE-NO-SECURE", "medium", f"Cookie '{name}' is set without Secure",
+                            "Add the Secure attribute"))
+    if "httponly" not in attrs:
+        out.append(_finding("HDR-COOKIE-NO-HTTPONLY", "low", f"Cookie '{name}' is readable by scripts (no HttpOnly)",
+                            "Add HttpOnly unless scripts need the cookie"))
+    if "samesite" not in attrs:
+        out.append(_finding("HDR-COOKIE-NO-SAMESITE", "low", f"Cookie '{name}' has no SameSite attribute",
+                            "Add SameSite=Lax (or Strict)"))
+    return out
+
+
+def redact_cookie(value):
+    """'sessionid=abc; Path=/; HttpOnly' -> 'sessionid=<redacted>; Path=/; HttpOnly'"""
+    pair, _, attrs = value.partition(";")
+    name = pair.split("=", 1)[0].strip()
+    return f"{name}={REDACTED}" + (f";{attrs}" if attrs else "")
+
+
+def _evidence(key, value):
+    if key == "set-cookie":
+        value = redact_cookie(value)
+    return value[:EVIDENCE_MAX]
+
+
+def _disclosure_check(header):
+    def check(value, ctx):
+        if _VERSION.search(value):
+            return [_finding("HDR-VERSION-LEAK", "low", f"{header} discloses software version '{value.strip()}'",
+                             f"Remove version details from {header}")]
+        return [_finding("HDR-PRODUCT-LEAK", "info", f"{header} discloses software '{value.strip()}'",
+                         f"Consider removing {header}")]
+    return check
+
+
+# ---- rule table ----
+
+_RULES = [
+    ("Strict-Transport-Security", _check_hsts),
+    ("Content-Security-Policy", _check_csp),
+    ("X-Frame-Options", _check_xfo),
+    ("X-Content-Type-Options", _check_xcto),
+    ("Set-Cookie", _check_cookie),
+] + [(h, _disclosure_check(h)) for h in ("Server", "X-Powered-By", "X-AspNet-Version", "X-AspNetMvc-Version", "X-Generator")]
+
+# headers that must be present: (header, only over https, finding)
+_REQUIRED = [
+    ("Strict-Transport-Security", True, _finding("HDR-HSTS-MISSING", "medium", "Strict-Transport-Security header missing",
+                                                 "Send Strict-Transport-Security: max-age=31536000; includeSubDomains")),
+    ("Content-Security-Policy", False, _finding("HDR-CSP-MISSING", "medium", "Content-Security-Policy header missing",
+                                                "Define a Content-Security-Policy")),
+    ("X-Content-Type-Options", False, _finding("HDR-XCTO-MISSING", "low", "X-Content-Type-Options header missing",
+                                               "Send X-Content-Type-Options: nosniff")),
+]
+
+RULES = {}
+for _header, _check in _RULES:
+    RULES.setdefault(_header.lower(), []).append(_check)
+REQUIRED = {h.lower(): (https_only, dict(f, header=h.lower())) for h, https_only, f in _REQUIRED}
+
+
+def analyze_headers(items, scheme="https"):
+    """
+    items: (name, value) pairs, repeated headers (Set-Cookie) as separate
+    pairs, or a plain dict. Returns {"findings": [...], "counts": {priority: n}}.
+    """
+    if isinstance(items, dict):
+        items = items.items()
+    ctx = {"scheme": scheme, "csp_frame_ancestors": False}
+    findings, seen = [], set()
+    for name, value in items:
+        key = name.lower()
+        seen.add(key)
+        for check in RULES.get(key, ()):
+            for f in check(str(value), ctx):
+                f["header"] = key
+                f["evidence"] = _evidence(key, str(value))
+                findings.append(f)
+
+    for key in REQUIRED.keys() - seen:
+        https_only, finding = REQUIRED[key]
+        if not https_only or scheme == "https":
+            findings.append(dict(finding, evidence=""))
+    # clickjacking: neither X-Frame-Options nor CSP frame-ancestors
+    if "x-frame-options" not in seen and not ctx["csp_frame_ancestors"]:
+        findings.append(dict(_finding("HDR-CLICKJACKING", "medium", "Page can be framed by any site (no X-Frame-Options or frame-ancestors)",
+                                      "Send X-Frame-Options: DENY or CSP frame-ancestors 'none'"), header="x-frame-options", evidence=""))
+
+    counts = dict.fromkeys(PRIORITIES, 0)
+    for f in findings:
+        counts[f["priority"]] += 1
+    return {"findings": findings, "counts": counts}
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domainscanner', '0002_remove_domainscan_headers_domainscan_results_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainHeaderFinding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255)),
+                ('code', models.CharField(max_length=50)),
+                ('priority', models.CharField(max_length=10)),
+                ('header', models.CharField(max_length=100)),
+                ('description', models.TextField()),
+                ('suggestion', models.TextField(blank=True, default='')),
+                ('evidence', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('scan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='header_findings', to='domainscanner.domainscan')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['code', 'priority'], name='domainscann_code_39d35d_idx'), models.Index(fields=['priority'], name='domainscann_priorit_5bd5ab_idx'), models.Index(fields=['domain', '-created_at'], name='domainscann_domain_838dff_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domainscanner', '0003_domainheaderfinding'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='domainscan',
+            index=models.Index(fields=['domain', '-id'], name='domainscann_domain_c297fc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='domainscan',
+            index=models.Index(fields=['status_code', '-id'], name='domainscann_status__f57a25_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+REDACTED = "<redacted>"
+
+
+def _redact(value):
+    pair, _, attrs = value.partition(";")
+    name = pair.split("=", 1)[0].strip()
+    return f"{name}={REDACTED}" + (f";{attrs}" if attrs else "")
+
+
+def redact_cookie_evidence(apps, schema_editor):
+    """Set-Cookie findings stored before evidence was redacted carried the cookie value."""
+    DomainHeaderFinding = apps.get_model("domainscanner", "DomainHeaderFinding")
+    DomainScan = apps.get_model("domainscanner", "DomainScan")
+
+    findings = list(DomainHeaderFinding.objects.filter(header="set-cookie").only("id", "evidence"))
+    for f in findings:
+        f.evidence = _redact(f.evidence)[:255]
+    DomainHeaderFinding.objects.bulk_update(findings, ["evidence"], batch_size=500)
+
+    scan_ids = DomainHeaderFinding.objects.filter(header="set-cookie").values_list("scan_id", flat=True).distinct()
+    for scan in DomainScan.objects.filter(id__in=list(scan_ids)).only("id", "results").iterator():
+        for f in ((scan.results or {}).get("analysis") or {}).get("findings") or []:
+            if f.get("header") == "set-cookie" and f.get("evidence"):
+                f["evidence"] = _redact(f["evidence"])
+        scan.save(update_fields=["results"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domainscanner', '0004_domainscan_past_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(redact_cookie_evidence, migrations.RunPython.noop),
+    ]
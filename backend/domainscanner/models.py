@@ -7,5 +7,32 @@ class DomainScan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     results = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        indexes = [
+            # past scans: filters + keyset pagination on id
+            models.Index(fields=["domain", "-id"]),
+            models.Index(fields=["status_code", "-id"]),
+        ]
+
     def __str__(self):
         return f"{self.domain} ({self.created_at.strftime('%Y-%m-%d %H:%M:%S')})"
+
+
+class DomainHeaderFinding(models.Model):
+    """One security-header finding of a domain scan (see headers.py), queryable without the results blob."""
+    scan = models.ForeignKey(DomainScan, on_delete=models.CASCADE, related_name="header_findings")
+    domain = models.CharField(max_length=255)
+    code = models.CharField(max_length=50)  # e.g. HDR-HSTS-MISSING
+    priority = models.CharField(max_length=10)  # high | medium | low | info
+    header = models.CharField(max_length=100)
+    description = models.TextField()
+    suggestion = models.TextField(blank=True, default="")
+    evidence = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["code", "priority"]),
+            models.Index(fields=["priority"]),
+            models.Index(fields=["domain", "-created_at"]),
+        ]
@@ -0,0 +1,179 @@
+# backend/domainscanner/pipeline.py
+"""
+Bulk domain reconnaissance pipeline.
+
+    domains -> [resolve] -> [HTTP HEAD/GET] -> [header analysis] -> results
+
+Each stage is a small group of worker threads reading from the previous
+stage's bounded queue. When a stage falls behind, its input queue fills
+and the stage before it blocks on put(), so a slow stage throttles the
+whole pipeline instead of piling up work in memory. Results come out in
+completion order; the caller (the streaming response) does the DB writes.
+"""
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+
+from scan_utils import http_client
+from scan_utils.resolver import ResolveError, resolve
+
+from .headers import analyze_headers
+
+_DONE = object()
+PUT_POLL = 0.5  # seconds between stop checks while blocked on a full queue
+
+# lookups are cheap (threads only wait on the resolver's shared event loop), so
+# resolving runs wider than the HTTP stage: slow DNS shouldn't starve it
+RESOLVE_WORKERS = 16
+ANALYZE_WORKERS = 2
+HTTP_TIMEOUT = 5
+
+
+def normalize_target(raw):
+    """'https://Example.com/x' -> {"input", "domain", "scheme", "base_url", "hostname"} (as scan_domain does)."""
+    raw = str(raw).strip()
+    parsed = urlparse(raw if "://" in raw else f"http://{raw}")
+    scheme = parsed.scheme or "http"
+    domain = (parsed.netloc or parsed.path).lower()
+    return {
+        "input": raw, "domain": domain, "scheme": scheme, "base_url": f"{scheme}://{domain}",
+        "hostname": parsed.hostname or domain,
+    }
+
+
+def resolve_stage(result):
+    try:
+        addresses = resolve(result.pop("hostname"))
+        result["ip"] = addresses[0]
+        result["addresses"] = addresses
+    except ResolveError as e:
+        result["ip_error"] = str(e)
+    return result
+
+
+def http_stage(result):
+    if "ip_error" in result:
+        return result  # nothing to connect to
+    try:
+        resp = http_client.head(result["base_url"], timeout=HTTP_TIMEOUT, follow_redirects=True)
+        if resp.status_code in (405, 501):  # HEAD not supported: fall back to GET
+            resp = http_client.get(result["base_url"], timeout=HTTP_TIMEOUT)
+        result["status_code"] = resp.status_code
+        result["http_version"] = http_client.http_version(resp)
+        result["final_url"] = str(resp.url)
+        result["headers"] = {k: v for k, v in resp.headers.items()}
+        result["_header_items"] = http_client.header_items(resp)  # Set-Cookie etc. kept separate; analysis only
+    except Exception as e:
+        result["http_error"] = str(e)
+    return result
+
+
+def analyze_stage(result):
+    items = result.pop("_header_items", None)
+    if items is not None:
+        result["analysis"] = analyze_headers(items, scheme=urlparse(result["final_url"]).scheme)
+    return result
+
+
+class Stage:
+    """N worker threads applying fn to items from inq and putting results on outq."""
+
+    def __init__(self, name, fn, inq, outq, workers, stop):
+        self.name = name
+        self.fn = fn
+        self.inq = inq
+        self.outq = outq
+        self.workers = workers
+        self.stop = stop
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._alive = workers
+        self._lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f"domain-{self.name}-{i}", daemon=True).start()
+
+    def _work(self):
+        while not self.stop.is_set():
+            try:
+                item = self.inq.get(timeout=PUT_POLL)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                put(self.inq, _DONE, self.stop)  # let the other workers of this stage see it
+                break
+            started = time.monotonic()
+            try:
+                item = self.fn(item)
+            except Exception as e:
+                item["error"] = str(e)
+            with self._lock:
+                self.processed += 1
+                self.busy_seconds += time.monotonic() - started
+            if not put(self.outq, item, self.stop):
+                return
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            put(self.outq, _DONE, self.stop)
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "processed": self.processed, "busy_seconds": round(self.busy_seconds, 2)}
+
+
+def put(q, item, stop):
+    """Blocking put that gives up once stop is set. Returns False if it gave up."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=PUT_POLL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class DomainPipeline:
+    """
+    for result in DomainPipeline(domains, concurrency).run(): ...
+    concurrency = HTTP probes in flight; queues hold 2x that between stages.
+    """
+
+    def __init__(self, domains, concurrency=32):
+        self.domains = domains
+        self.concurrency = concurrency
+        self.stop = threading.Event()
+        size = max(2, concurrency * 2)
+        self.queues = [queue.Queue(maxsize=size) for _ in range(4)]
+        q_in, q_http, q_analyze, self.results = self.queues
+        self.stages = [
+            Stage("resolve", resolve_stage, q_in, q_http, max(RESOLVE_WORKERS, concurrency * 2), self.stop),
+            Stage("http", http_stage, q_http, q_analyze, concurrency, self.stop),
+            Stage("analyze", analyze_stage, q_analyze, self.results, ANALYZE_WORKERS, self.stop),
+        ]
+
+    def _feed(self):
+        for raw in self.domains:
+            if not put(self.queues[0], normalize_target(raw), self.stop):
+                return
+        put(self.queues[0], _DONE, self.stop)
+
+    def run(self):
+        """Yield result dicts as they finish. Closing the generator stops the pipeline."""
+        for stage in self.stages:
+            stage.start()
+        threading.Thread(target=self._feed, name="domain-feed", daemon=True).start()
+        try:
+            while True:
+                item = self.results.get()
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            self.stop.set()
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,203 @@
+# backend/domainscanner/subdomains.py
+"""
+Subdomain discovery for the domain scanner.
+
+Candidates come from two places:
+- a wordlist, brute-forced through the shared async resolver at a fixed
+  query rate (DOMAIN_ENUM_RATE names/s, DOMAIN_ENUM_CONCURRENCY in flight)
+- SAN entries of certificates seen by past SSL scans of the domain
+
+Wildcard DNS is detected per parent zone by resolving random labels
+under it. A name that resolves only to that zone's wildcard addresses is
+dropped, so a "*.example.com" record doesn't turn the whole wordlist
+into hits.
+
+Each run gets its own event loop on its own thread. It shares the
+resolver's cache but not the shared loop (or, without dnspython, that loop's
+getaddrinfo thread pool), so a large run doesn't queue the other scanners'
+lookups behind its own. 100k names at the default rate take a little over
+three minutes with dnspython; without it, lookups go through getaddrinfo on
+the run loop's small thread pool and are slower.
+"""
+import asyncio
+import queue
+import re
+import secrets
+import threading
+
+from django.conf import settings
+from django.db.models import Q
+
+from scan_utils.rate_limit import RateLimiter
+from scan_utils.resolver import NotFound, ResolveError, resolve_async
+from sslscanner.models import SSLScan
+
+WILDCARD_PROBES = 3
+SAN_SCAN_LIMIT = 2000  # most recent SSL scans looked at for SANs
+_LABEL = re.compile(r"^[a-z0-9_]([a-z0-9_-]{0,61}[a-z0-9_])?$")
+_DONE = object()
+
+COMMON_SUBDOMAINS = [
+    "www", "mail", "webmail", "smtp", "pop", "imap", "mx", "ns1", "ns2", "dns", "vpn", "remote",
+    "api", "app", "apps", "portal", "admin", "dashboard", "login", "sso", "auth", "id", "accounts",
+    "dev", "development", "test", "testing", "qa", "uat", "stage", "staging", "preprod", "prod",
+    "beta", "demo", "sandbox", "internal", "intranet", "extranet", "git", "gitlab", "jenkins", "ci",
+    "jira", "confluence", "wiki", "docs", "help", "support", "status", "monitor", "grafana",
+    "kibana", "static", "assets", "cdn", "media", "img", "images", "files", "download", "uploads",
+    "blog", "shop", "store", "pay", "payments", "billing", "m", "mobile", "crm", "erp", "hr",
+    "owa", "autodiscover", "exchange", "ftp", "sftp", "backup", "db", "sql", "mysql", "redis",
+]
+
+
+def enum_rate():
+    return getattr(settings, "DOMAIN_ENUM_RATE", 500)
+
+
+def enum_concurrency():
+    return getattr(settings, "DOMAIN_ENUM_CONCURRENCY", 256)
+
+
+def normalize_words(lines):
+    """Wordlist lines -> unique valid labels (or dotted label paths like 'dev.api'), order kept."""
+    words = {}
+    for line in lines:
+        word = str(line).split("#", 1)[0].strip().strip(".").lower()
+        if word and all(_LABEL.match(part) for part in word.split(".")):
+            words[word] = None
+    return list(words)
+
+
+def default_wordlist():
+    """DOMAIN_SUBDOMAIN_WORDLIST (a file, one word per line) or the built-in short list."""
+    path = getattr(settings, "DOMAIN_SUBDOMAIN_WORDLIST", "")
+    if path:
+        with open(path, encoding="utf-8", errors="ignore") as fh:
+            return normalize_words(fh)
+    return list(COMMON_SUBDOMAINS)
+
+
+def san_names(domain, limit=SAN_SCAN_LIMIT):
+    """Subdomains of domain named in SANs of past successful SSL scans of it and its subdomains."""
+    suffix = "." + domain
+    rows = (
+        SSLScan.objects.filter(Q(domain__iexact=domain) | Q(domain__iendswith=suffix), status="success")
+        .order_by("-scan_date")
+        .values_list("result_json", flat=True)[:limit]
+    )
+    names = {}
+    for result in rows:
+        for san in (result or {}).get("subject_alt_names") or []:
+            name = str(san).strip().rstrip(".").lower()
+            if name.startswith("*."):
+                continue  # wildcard certs don't name hosts
+            if name.endswith(suffix):
+                names[name] = None
+    return list(names)
+
+
+class SubdomainEnumerator:
+    """
+    await SubdomainEnumerator(domain, words, extra).run(emit)
+    emit({"subdomain", "addresses", "sources"}) is called for every live name.
+    """
+
+    def __init__(self, domain, words, extra=(), rate=None, concurrency=None):
+        self.domain = domain.strip().rstrip(".").lower()
+        self.sources = {}
+        for word in words:
+            self.sources.setdefault(f"{word}.{self.domain}", []).append("wordlist")
+        for name in extra:
+            self.sources.setdefault(name, []).append("san")
+        self.rate = rate or enum_rate()
+        self.concurrency = concurrency or enum_concurrency()
+        self._wildcards = {}  # zone -> task resolving to frozenset of wildcard addresses
+        self.stats = {"candidates": len(self.sources), "found": 0, "wildcard_filtered": 0, "errors": 0}
+
+    async def _wildcard_addresses(self, zone):
+        found = set()
+        for _ in range(WILDCARD_PROBES):
+            try:
+                found.update(await resolve_async(f"{secrets.token_hex(8)}.{zone}"))
+            except ResolveError:
+                pass
+        return frozenset(found)
+
+    def wildcard_for(self, zone):
+        task = self._wildcards.get(zone)
+        if task is None:
+            task = self._wildcards[zone] = asyncio.ensure_future(self._wildcard_addresses(zone))
+        return task
+
+    async def _check(self, name, emit):
+        try:
+            addresses = await resolve_async(name)
+        except NotFound:
+            return
+        except ResolveError:
+            self.stats["errors"] += 1
+            return
+        wildcard = await self.wildcard_for(name.split(".", 1)[1])
+        if wildcard and set(addresses) <= wildcard:
+            self.stats["wildcard_filtered"] += 1
+            return
+        self.stats["found"] += 1
+        emit({"subdomain": name, "addresses": addresses, "sources": self.sources[name]})
+
+    async def run(self, emit):
+        await self.wildcard_for(self.domain)
+        self.stats["wildcard"] = bool(self._wildcards[self.domain].result())
+        limiter = RateLimiter(self.rate)
+        names = iter(self.sources)
+
+        async def worker():
+            for name in names:  # shared iterator: each name goes to one worker
+                await limiter.wait()
+                await self._check(name, emit)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(self.sources)) or 1)))
+        return self.stats
+
+
+def enumerate_subdomains(enumerator):
+    """
+    Run an enumerator on its own event loop thread; yields found dicts as they
+    come. Closing the generator cancels the run. enumerator.stats is final
+    once exhausted.
+    """
+    results = queue.Queue()
+    started = threading.Event()
+    running = {}
+
+    async def main():
+        running["loop"] = asyncio.get_running_loop()
+        running["task"] = asyncio.current_task()
+        started.set()
+        await enumerator.run(results.put)
+
+    def runner():
+        try:
+            asyncio.run(main())
+        except asyncio.CancelledError:
+            pass
+        except BaseException as e:
+            results.put(e)
+        finally:
+            started.set()
+            results.put(_DONE)
+
+    threading.Thread(target=runner, name="subdomain-enum", daemon=True).start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        started.wait()
+        if "task" in running:
+            try:
+                running["loop"].call_soon_threadsafe(running["task"].cancel)
+            except RuntimeError:
+                pass  # loop already closed: the run finished
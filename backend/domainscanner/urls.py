@@ -3,5 +3,9 @@ from . import views
 
 urlpatterns = [
     path("scan/", views.scan_domain, name="scan_domain"),
+    path("scan/bulk/", views.scan_domain_bulk, name="scan_domain_bulk"),
+    path("subdomains/", views.scan_subdomains, name="scan_subdomains"),
     path("past/", views.past_scans, name="past_scans"),
+    path("findings/", views.header_findings, name="header_findings"),
+    path("http-pool/", views.http_pool_stats, name="http_pool_stats"),
 ]
@@ -1,10 +1,11 @@
-import socket
-import requests
 from urllib.parse import urlparse
+import base64
+import binascii
 import json
 import io
+import time
 
-from django.http import JsonResponse, FileResponse
+from django.http import JsonResponse, FileResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET
 
@@ -13,7 +14,20 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 
-from .models import DomainScan
+from scan_utils import http_client
+from scan_utils.resolver import resolve, ResolveError
+
+from .findings import save_findings
+from .headers import analyze_headers
+from .models import DomainScan, DomainHeaderFinding
+from .pipeline import DomainPipeline
+from .subdomains import SubdomainEnumerator, default_wordlist, enumerate_subdomains, normalize_words, san_names
+
+DOMAIN_BULK_MAX_DOMAINS = 20000
+DOMAIN_BULK_DEFAULT_CONCURRENCY = 32
+DOMAIN_BULK_MAX_CONCURRENCY = 256
+DOMAIN_BULK_SAVE_BATCH = 200  # rows per bulk INSERT while streaming
+DOMAIN_ENUM_MAX_WORDS = 200000
 
 @csrf_exempt
 def scan_domain(request):
@@ -46,19 +60,23 @@ def scan_domain(request):
             "base_url": base_url,
         }
 
-        # Get IP address
+        # Get IP address (shared cached resolver, A/AAAA in parallel)
         try:
-            ip = socket.gethostbyname(domain)
-            result["ip"] = ip
-        except Exception as e:
+            addresses = resolve(parsed.hostname or domain)
+            result["ip"] = addresses[0]
+            result["addresses"] = addresses
+        except ResolveError as e:
             result["ip_error"] = str(e)
 
-        # Get HTTP headers & status
+        # Get HTTP headers & status (shared keep-alive pool, HTTP/2 when available)
         try:
-            resp = requests.get(base_url, timeout=5)
+            resp = http_client.get(base_url, timeout=5)
             result["status_code"] = resp.status_code
+            result["http_version"] = http_client.http_version(resp)
             # convert headers to normal dict (some header values are lists/objects)
             result["headers"] = {k: v for k, v in resp.headers.items()}
+            # HSTS / CSP / framing / cookie flags / version leaks
+            result["analysis"] = analyze_headers(http_client.header_items(resp), scheme=urlparse(str(resp.url)).scheme)
         except Exception as e:
             result["http_error"] = str(e)
 
@@ -70,6 +88,7 @@ def scan_domain(request):
                 status_code=result.get("status_code"),
                 results=result
             )
+            save_findings([(scan_obj, result.get("analysis"))])
         except Exception as db_e:
             # don't fail the whole process for DB write issues; just log in result
             result["db_error"] = str(db_e)
@@ -157,6 +176,23 @@ def scan_domain(request):
                 elements.append(headers_table)
                 elements.append(Spacer(1, 12))
 
+            # Security header findings
+            findings = (result.get("analysis") or {}).get("findings") or []
+            if findings:
+                elements.append(Paragraph("🛡️ Security Header Findings", heading_style))
+                findings_data = [["Priority", "Finding", "Suggestion"]] + [
+                    [f["priority"].title(), Paragraph(f["desc"], normal), Paragraph(f["suggestion"], normal)]
+                    for f in findings
+                ]
+                findings_table = Table(findings_data, colWidths=[60, 240, 180], repeatRows=1)
+                findings_table.setStyle(TableStyle([
+                    ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
+                    ("GRID", (0,0), (-1,-1), 0.25, colors.black),
+                    ("VALIGN", (0,0), (-1,-1), "TOP"),
+                ]))
+                elements.append(findings_table)
+                elements.append(Spacer(1, 12))
+
             # Footer callback
             def add_page(canvas, doc):
                 canvas.saveState()
@@ -184,26 +220,287 @@ def scan_domain(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+# fields= names -> value lookups; blobs are only read from the DB when asked for
+PAST_SCAN_FIELDS = {
+    "id": "id",
+    "domain": "domain",
+    "ip": "ip",
+    "status_code": "status_code",
+    "created_at": "created_at",
+    "headers": "results__headers",
+    "results": "results",
+}
+PAST_SCAN_DEFAULT_FIELDS = ["id", "domain", "ip", "status_code", "created_at"]
+PAST_SCAN_DEFAULT_LIMIT = 50
+PAST_SCAN_MAX_LIMIT = 500
+
+
+def _encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """Opaque cursor -> id to continue below. Raises ValueError."""
+    return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+
+
 @require_GET
 def past_scans(request):
     """
-    GET /api/domainscanner/past/
-    Returns latest domain scans (most recent first).
+    GET /api/domainscanner/past/?limit=50&cursor=&fields=id,domain,...&domain=&status_code=200,301
+    Domain scans, most recent first, one page at a time: pass next_cursor
+    back as cursor for the next page. fields picks the columns per row
+    (default: no headers / results blobs); domain and status_code filter
+    through their indexes.
     """
+    fields = [f.strip() for f in request.GET.get("fields", "").split(",") if f.strip()] or PAST_SCAN_DEFAULT_FIELDS
+    unknown = [f for f in fields if f not in PAST_SCAN_FIELDS]
+    if unknown:
+        return JsonResponse({"error": f"Unknown fields {unknown}; choose from {sorted(PAST_SCAN_FIELDS)}"}, status=400)
+
+    qs = DomainScan.objects.all()
     try:
-        scans = DomainScan.objects.all().order_by("-created_at")[:50]
-        data = [
-            {
-                "id": s.id,
-                "domain": s.domain,
-                "ip": s.ip,
-                "status_code": s.status_code,
-                "headers": s.results.get("headers") if isinstance(s.results, dict) else None,
-                "created_at": s.created_at.isoformat(),
-                "results": s.results,
-            }
-            for s in scans
-        ]
-        return JsonResponse(data, safe=False)
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+        limit = max(1, min(int(request.GET.get("limit", PAST_SCAN_DEFAULT_LIMIT)), PAST_SCAN_MAX_LIMIT))
+        if request.GET.get("cursor"):
+            qs = qs.filter(id__lt=_decode_cursor(request.GET["cursor"]))
+        if request.GET.get("status_code"):
+            qs = qs.filter(status_code__in=[int(c) for c in request.GET["status_code"].split(",")])
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return JsonResponse({"error": "limit and status_code must be integers and cursor a value from next_cursor"}, status=400)
+    if request.GET.get("domain"):
+        qs = qs.filter(domain=request.GET["domain"])
+
+    lookups = {PAST_SCAN_FIELDS[f]: f for f in fields}
+    # the id is always read: it is the cursor
+    rows = list(qs.order_by("-id").values("id", *(l for l in lookups if l != "id"))[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    data = []
+    for row in rows:
+        item = {lookups[lookup]: row[lookup] for lookup in lookups}
+        if "created_at" in item:
+            item["created_at"] = item["created_at"].isoformat()
+        data.append(item)
+    return JsonResponse({
+        "results": data,
+        "fields": fields,
+        "limit": limit,
+        "has_next": has_next,
+        "next_cursor": _encode_cursor(rows[-1]["id"]) if has_next else None,
+    })
+
+
+@require_GET
+def http_pool_stats(request):
+    """
+    GET /api/domainscanner/http-pool/
+    Utilisation of the shared HTTP connection pool (for sizing bulk audits).
+    """
+    return JsonResponse(http_client.pool_stats())
+
+
+@require_GET
+def header_findings(request):
+    """
+    GET /api/domainscanner/findings/?domain=&code=&priority=&scan_id=&limit=100
+    Stored security-header findings, newest first.
+    """
+    qs = DomainHeaderFinding.objects.all()
+    for param, field in (("domain", "domain"), ("code", "code"), ("priority", "priority"), ("scan_id", "scan_id")):
+        value = request.GET.get(param)
+        if value:
+            qs = qs.filter(**{field: value})
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 100)), 1000))
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    rows = list(qs.order_by("-id").values(
+        "id", "scan_id", "domain", "code", "priority", "header", "description", "suggestion", "evidence", "created_at",
+    )[:limit])
+    return JsonResponse({"count": len(rows), "results": rows})
+
+
+def _read_bulk_domains(request):
+    """
+    (domains, options) for a bulk run, from either a JSON body
+    {"domains": [...] | "a.com\\nb.com", ...} or multipart with "file" (one
+    domain per line, '#' starts a comment) plus form fields.
+    Domains are de-duplicated (case-insensitive), input order kept.
+    """
+    upload = request.FILES.get("file")
+    if upload is not None:
+        options = request.POST
+        raw = [line.split("#", 1)[0] for line in upload.read().decode("utf-8", errors="ignore").splitlines()]
+    else:
+        options = json.loads(request.body.decode("utf-8") or "{}")
+        raw = options.get("domains") or []
+        if isinstance(raw, str):
+            raw = raw.replace(",", "\n").splitlines()
+
+    domains, seen = [], set()
+    for item in raw:
+        item = str(item).strip()
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            domains.append(item)
+    return domains, options
+
+
+def _save_bulk_rows(rows):
+    scans = DomainScan.objects.bulk_create([
+        DomainScan(domain=r["domain"][:255], ip=r.get("ip"), status_code=r.get("status_code"), results=r)
+        for r in rows
+    ])
+    save_findings([(scan, r.get("analysis")) for scan, r in zip(scans, rows)])
+
+
+def _bulk_domain_stream(domains, concurrency, save):
+    """
+    Yield one NDJSON line per domain as the pipeline finishes it, then a
+    summary line. Rows are saved in batches from this (the response) thread.
+    """
+    started = time.time()
+    pipeline = DomainPipeline(domains, concurrency)
+    counts = {"ok": 0, "dns_error": 0, "http_error": 0}
+    pending, saved, db_errors = [], 0, 0
+
+    def flush():
+        nonlocal saved, db_errors
+        try:
+            _save_bulk_rows(pending)
+            saved += len(pending)
+        except Exception:
+            db_errors += len(pending)
+        pending.clear()
+
+    results = pipeline.run()
+    try:
+        for result in results:
+            if "ip_error" in result:
+                counts["dns_error"] += 1
+            elif "http_error" in result or "error" in result:
+                counts["http_error"] += 1
+            else:
+                counts["ok"] += 1
+            if save:
+                pending.append(result)
+                if len(pending) >= DOMAIN_BULK_SAVE_BATCH:
+                    flush()
+            yield json.dumps(result, default=str) + "\n"
+    finally:
+        results.close()  # client went away or we're done: stop the stage workers
+        if save and pending:
+            flush()
+
+    yield json.dumps({
+        "summary": dict(
+            counts,
+            total=len(domains),
+            saved=saved,
+            db_errors=db_errors,
+            elapsed_seconds=round(time.time() - started, 2),
+            stages=pipeline.stats(),
+        )
+    }) + "\n"
+
+
+@csrf_exempt
+def scan_domain_bulk(request):
+    """
+    POST /api/domainscanner/scan/bulk/
+    Body JSON: { "domains": [...], "concurrency": 32, "save": true }
+      or multipart with "file" (one domain per line) + the same optional fields.
+    Runs resolve -> HTTP HEAD/GET -> header analysis as concurrent stages and
+    streams one NDJSON line per domain as it finishes (same fields as
+    scan_domain's result, plus "analysis"), then a summary line.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST allowed"}, status=405)
+    try:
+        domains, options = _read_bulk_domains(request)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+    if not domains:
+        return JsonResponse({"error": "No domains supplied"}, status=400)
+    if len(domains) > DOMAIN_BULK_MAX_DOMAINS:
+        return JsonResponse({"error": f"Too many domains (max {DOMAIN_BULK_MAX_DOMAINS})"}, status=400)
+
+    try:
+        concurrency = int(options.get("concurrency") or DOMAIN_BULK_DEFAULT_CONCURRENCY)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "concurrency must be an integer"}, status=400)
+    concurrency = max(1, min(concurrency, DOMAIN_BULK_MAX_CONCURRENCY, len(domains)))
+    save = str(options.get("save", "true")).lower() not in ("0", "false", "no")
+
+    response = StreamingHttpResponse(_bulk_domain_stream(domains, concurrency, save), content_type="application/x-ndjson")
+    response["X-Accel-Buffering"] = "no"  # let proxies pass lines through as they come
+    return response
+
+
+def _subdomain_stream(enumerator, probe, concurrency, save):
+    """
+    NDJSON: one {"subdomain", "addresses", "sources"} line per live name, an
+    {"enumeration": stats} line, then (with probe) the bulk probe lines for
+    the names found and their summary.
+    """
+    started = time.time()
+    found = []
+    for row in enumerate_subdomains(enumerator):
+        found.append(row["subdomain"])
+        yield json.dumps(row) + "\n"
+    yield json.dumps({"enumeration": dict(enumerator.stats, elapsed_seconds=round(time.time() - started, 2))}) + "\n"
+    if probe and found:
+        yield from _bulk_domain_stream(found, max(1, min(concurrency, len(found))), save)
+
+
+@csrf_exempt
+def scan_subdomains(request):
+    """
+    POST /api/domainscanner/subdomains/
+    Body JSON: { "domain": "example.com", "words": [...] (default: built-in / DOMAIN_SUBDOMAIN_WORDLIST),
+                 "san": true, "rate": 500, "probe": true, "concurrency": 32, "save": true }
+      or multipart with "file" (wordlist, one word per line) + the same fields.
+    Brute-forces the wordlist (wildcard DNS filtered), adds SAN names from
+    past SSL scans, streams every live subdomain as NDJSON, then probes them
+    like scan_domain/bulk.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST allowed"}, status=405)
+    upload = request.FILES.get("file")
+    try:
+        options = request.POST if upload is not None else json.loads(request.body.decode("utf-8") or "{}")
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    raw_domain = str(options.get("domain") or "").strip()
+    parsed = urlparse(raw_domain if "://" in raw_domain else f"http://{raw_domain}")
+    domain = (parsed.hostname or "").rstrip(".").lower()
+    if not domain or "." not in domain:
+        return JsonResponse({"error": "A domain like example.com is required"}, status=400)
+
+    if upload is not None:
+        words = normalize_words(upload.read().decode("utf-8", errors="ignore").splitlines())
+    elif options.get("words"):
+        raw_words = options["words"]
+        words = normalize_words(raw_words.replace(",", "\n").splitlines() if isinstance(raw_words, str) else raw_words)
+    else:
+        words = default_wordlist()
+    if len(words) > DOMAIN_ENUM_MAX_WORDS:
+        return JsonResponse({"error": f"Wordlist too long (max {DOMAIN_ENUM_MAX_WORDS})"}, status=400)
+
+    try:
+        rate = int(options.get("rate") or 0) or None
+        concurrency = int(options.get("concurrency") or DOMAIN_BULK_DEFAULT_CONCURRENCY)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "rate and concurrency must be integers"}, status=400)
+    concurrency = max(1, min(concurrency, DOMAIN_BULK_MAX_CONCURRENCY))
+    use_san = str(options.get("san", "true")).lower() not in ("0", "false", "no")
+    probe = str(options.get("probe", "true")).lower() not in ("0", "false", "no")
+    save = str(options.get("save", "true")).lower() not in ("0", "false", "no")
+
+    extra = san_names(domain) if use_san else []
+    enumerator = SubdomainEnumerator(domain, words, extra, rate=rate)
+    response = StreamingHttpResponse(_subdomain_stream(enumerator, probe, concurrency, save), content_type="application/x-ndjson")
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -3,3 +3,12 @@ from django.apps import AppConfig
 class NetworkscannerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'networkscanner'
+
+    def ready(self):
+        # map the CVE index now rather than on the first -sV scan
+        from .cve_index import get_index
+        try:
+            get_index()
+        except Exception as e:
+            # a broken index file shouldn't stop the server; version scans just won't match CVEs
+            print("Warning: could not open the CVE index:", e)
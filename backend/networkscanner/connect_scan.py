@@ -0,0 +1,208 @@
+# backend/networkscanner/connect_scan.py
+"""
+In-process asyncio TCP connect scanner: the fast path for small port
+lists, where launching nmap and round-tripping its XML costs more than
+the scan itself.
+
+- a global socket budget caps concurrent connection attempts
+- each target host gets its own rate limit
+- timeouts adapt per host from measured RTT (SRTT + 4*RTTVAR, as TCP does),
+  so filtered ports on a fast LAN don't each wait the full initial timeout
+
+Rows have the same shape as nmap_runner.host_rows. SYN and version
+scans (-sV) still go to nmap; see choose_engine().
+"""
+import asyncio
+import ipaddress
+import queue
+import resource
+import socket
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+
+from scan_utils.rate_limit import RateLimiter
+from scan_utils.resolver import ResolveError, resolve_async
+from .nmap_runner import port_count
+from .planner import port_ranges, split_targets
+
+INITIAL_TIMEOUT = 1.5
+MIN_TIMEOUT = 0.1
+MAX_TIMEOUT = 3.0
+HOST_RATE = 200  # connection attempts per second per target host
+SOCKET_BUDGET = 512
+
+# "auto" uses the connect scanner below these sizes
+AUTO_MAX_PORTS = 100
+MAX_PROBES = 65536  # hosts x ports
+
+_DONE = object()
+
+
+class RttEstimator:
+    def __init__(self, initial=INITIAL_TIMEOUT):
+        self.initial = initial
+        self.srtt = None
+        self.rttvar = None
+
+    def sample(self, rtt):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def timeout(self):
+        if self.srtt is None:
+            return self.initial
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, self.srtt + 4 * self.rttvar))
+
+
+@lru_cache(maxsize=4096)
+def service_name(port):
+    try:
+        return socket.getservbyport(port, "tcp")
+    except OSError:
+        return "-"
+
+
+def socket_budget():
+    budget = getattr(settings, "CONNECT_SCAN_SOCKET_BUDGET", SOCKET_BUDGET)
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY:
+        budget = min(budget, max(16, soft - 128))  # leave descriptors for Django / DB
+    return max(1, budget)
+
+
+def expand_targets(ip):
+    """
+    Individual targets for the connect scanner: IPs, CIDR blocks, hostnames.
+    Returns None for anything only nmap understands (e.g. 10.0.0.1-20).
+    """
+    out = []
+    for t in split_targets(ip):
+        try:
+            net = ipaddress.ip_network(t, strict=False)
+        except ValueError:
+            if "-" in t or "*" in t or "/" in t:
+                return None
+            out.append(t)
+            continue
+        if net.num_addresses > MAX_PROBES:
+            return None
+        out.extend(str(h) for h in (net.hosts() if net.num_addresses > 2 else net))
+    return out
+
+
+def port_list(ports):
+    ranges = port_ranges(ports)
+    if ranges is None:
+        return None
+    return sorted({p for start, end in ranges for p in range(start, end + 1) if 0 < p < 65536})
+
+
+def choose_engine(ip, ports, requested="auto", version_detection=False):
+    """'connect' or 'nmap' for a scan request; connect only where it can do the same job."""
+    if requested == "nmap" or version_detection:
+        return "nmap"
+    if requested == "auto" and port_count(ports) > AUTO_MAX_PORTS:
+        return "nmap"
+    targets = expand_targets(ip)
+    plist = port_list(ports)
+    if not targets or not plist or len(targets) * len(plist) > MAX_PROBES:
+        return "nmap"
+    return "connect"
+
+
+async def _probe(addr, port, rtt, limiter, budget):
+    await limiter.wait()
+    async with budget:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            _reader, writer = await asyncio.wait_for(asyncio.open_connection(addr, port), rtt.timeout())
+        except ConnectionRefusedError:
+            rtt.sample(loop.time() - start)
+            return "closed"
+        except (asyncio.TimeoutError, OSError):
+            return "filtered"
+        rtt.sample(loop.time() - start)
+        writer.close()
+        return "open"
+
+
+async def _scan_host(target, ports, budget, emit):
+    try:
+        addr = target if _is_ip(target) else (await resolve_async(target))[0]
+    except ResolveError:
+        return
+
+    rtt = RttEstimator()
+    limiter = RateLimiter(getattr(settings, "CONNECT_SCAN_HOST_RATE", HOST_RATE))
+    # probe the first port alone so the rest start with a measured RTT
+    states = [await _probe(addr, ports[0], rtt, limiter, budget)]
+    states += await asyncio.gather(*(_probe(addr, p, rtt, limiter, budget) for p in ports[1:]))
+
+    if all(s == "filtered" for s in states):
+        return  # nothing answered: treat as down, like nmap does
+    rows = [
+        {"host": addr, "port": str(p), "protocol": "tcp", "status": "open", "service": service_name(p),
+         "vulnerable": False, "cve": "-"}
+        for p, s in zip(ports, states) if s == "open"
+    ]
+    if not rows:
+        rows = [{"host": addr, "port": "-", "status": "-", "service": "-", "vulnerable": False, "cve": "-"}]
+    emit((addr, rows))
+
+
+def _is_ip(value):
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+
+async def _scan(targets, ports, emit):
+    budget = asyncio.Semaphore(socket_budget())
+    await asyncio.gather(*(_scan_host(t, ports, budget, emit) for t in targets))
+
+
+def run_connect_scan(targets, ports, on_host=None, options=None):
+    """
+    Same contract as nmap_runner.run_nmap: on_host(address, rows) per finished
+    host, returns all rows ([] when on_host is given). The event loop runs on its own thread so on_host
+    (which touches the ORM) is called from the caller's thread.
+    """
+    if not isinstance(targets, str):
+        targets = " ".join(targets)
+    hosts = expand_targets(targets)
+    plist = port_list(ports)
+    if hosts is None or plist is None:
+        raise ValueError("target or port syntax not supported by the connect scanner")
+
+    results = queue.Queue()
+
+    def runner():
+        try:
+            asyncio.run(_scan(hosts, plist, results.put))
+        except BaseException as e:
+            results.put(e)
+        finally:
+            results.put(_DONE)
+
+    threading.Thread(target=runner, name="connect-scan", daemon=True).start()
+    rows = []
+    while True:
+        item = results.get()
+        if item is _DONE:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        address, host_rows = item
+        if on_host is not None:
+            on_host(address, host_rows)
+        else:
+            rows.extend(host_rows)
+    return rows
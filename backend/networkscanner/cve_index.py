@@ -0,0 +1,292 @@
+# backend/networkscanner/cve_index.py
+"""
+Local CPE -> CVE index used to fill the "vulnerable" / "cve" columns of
+network scan rows from nmap's service version detection (-sV).
+
+The source data (NVD CVE API 2.0 JSON dumps, optionally gzipped, or a CSV)
+is compiled once by `manage.py build_cve_index` into a compact binary file.
+Scanner processes mmap that file at startup (NetworkscannerConfig.ready),
+so the first -sV scan doesn't pay for opening it, the OS page cache is
+shared between workers, and a lookup is a binary search plus a few entry
+reads, with no network calls.
+
+File layout (little-endian):
+  header   magic, key count, entry count, offsets of the three sections
+  keys     sorted by 64-bit hash of "vendor:product": (hash, key str, first entry, entry count)
+  entries  (version, start incl, start excl, end incl, end excl, cve id, cvss) - string offsets + float
+  strings  NUL-terminated UTF-8, deduplicated
+
+CSV columns: vendor,product,version,version_start_including,
+version_start_excluding,version_end_including,version_end_excluding,cve,cvss
+"""
+import csv
+import glob
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+
+MAGIC = b"CVEIDX01"
+_HEADER = struct.Struct("<8sIIQQQ")
+_KEY = struct.Struct("<QIII")
+_ENTRY = struct.Struct("<IIIIIIf")
+NO_STR = 0xFFFFFFFF
+
+# CVEs listed in a row's "cve" column (highest CVSS first)
+MAX_CVES_PER_ROW = 5
+
+
+def product_key(vendor, product):
+    return f"{vendor}:{product}".lower()
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def version_key(version):
+    """Comparable key for dotted versions ('2.4.49' < '2.4.50' < '2.10'); best effort for suffixes."""
+    return tuple((1, int(p)) if p.isdigit() else (0, p) for p in re.findall(r"\d+|[a-z]+", version.lower()))
+
+
+# ---- building ----
+
+def _cvss(metrics):
+    for name in ("cvssMetricV31", "cvssMetricV30", "cvssMetricV2"):
+        for m in metrics.get(name) or []:
+            score = (m.get("cvssData") or {}).get("baseScore")
+            if score is not None:
+                return float(score)
+    return 0.0
+
+
+def _iter_cpe_matches(nodes):
+    for node in nodes or []:
+        yield from node.get("cpeMatch") or []
+        yield from _iter_cpe_matches(node.get("children"))
+
+
+def _read_nvd_json(fh):
+    data = json.load(fh)
+    for item in data.get("vulnerabilities") or []:
+        cve = item.get("cve") or {}
+        cve_id = cve.get("id")
+        if not cve_id:
+            continue
+        cvss = _cvss(cve.get("metrics") or {})
+        for config in cve.get("configurations") or []:
+            for match in _iter_cpe_matches(config.get("nodes")):
+                if not match.get("vulnerable"):
+                    continue
+                parts = (match.get("criteria") or "").split(":")
+                if len(parts) < 6 or parts[2] != "a":  # applications only: what -sV identifies
+                    continue
+                yield {
+                    "vendor": parts[3], "product": parts[4], "version": parts[5],
+                    "version_start_including": match.get("versionStartIncluding"),
+                    "version_start_excluding": match.get("versionStartExcluding"),
+                    "version_end_including": match.get("versionEndIncluding"),
+                    "version_end_excluding": match.get("versionEndExcluding"),
+                    "cve": cve_id, "cvss": cvss,
+                }
+
+
+def _read_source(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        if ".json" in os.path.basename(path):
+            yield from _read_nvd_json(fh)
+        else:
+            for row in csv.DictReader(fh):
+                row["cvss"] = float(row.get("cvss") or 0)
+                yield row
+
+
+def source_files(source):
+    """A file, or every *.json / *.json.gz / *.csv in a directory."""
+    if os.path.isdir(source):
+        files = []
+        for pattern in ("*.json", "*.json.gz", "*.csv", "*.csv.gz"):
+            files.extend(glob.glob(os.path.join(source, pattern)))
+        return sorted(files)
+    return [source]
+
+
+def build_index(sources, out_path):
+    """Compile source files into the binary index at out_path. Returns (products, entries)."""
+    grouped = defaultdict(set)
+    for path in sources:
+        for rec in _read_source(path):
+            version = rec.get("version") or "*"
+            grouped[product_key(rec["vendor"], rec["product"])].add((
+                "" if version in ("*", "-") else version,
+                rec.get("version_start_including") or "",
+                rec.get("version_start_excluding") or "",
+                rec.get("version_end_including") or "",
+                rec.get("version_end_excluding") or "",
+                rec["cve"],
+                float(rec.get("cvss") or 0),
+            ))
+
+    strings = bytearray()
+    offsets = {}
+
+    def intern(s):
+        if not s:
+            return NO_STR
+        if s not in offsets:
+            offsets[s] = len(strings)
+            strings.extend(s.encode() + b"\0")
+        return offsets[s]
+
+    keys, entries = [], []
+    for key in sorted(grouped, key=_hash):
+        recs = sorted(grouped[key], key=lambda r: -r[6])
+        keys.append(_KEY.pack(_hash(key), intern(key), len(entries), len(recs)))
+        for version, si, se, ei, ee, cve, cvss in recs:
+            entries.append(_ENTRY.pack(intern(version), intern(si), intern(se), intern(ei), intern(ee), intern(cve), cvss))
+
+    keys_off = _HEADER.size
+    entries_off = keys_off + len(keys) * _KEY.size
+    strings_off = entries_off + len(entries) * _ENTRY.size
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp = f"{out_path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, len(keys), len(entries), keys_off, entries_off, strings_off))
+        fh.write(b"".join(keys))
+        fh.write(b"".join(entries))
+        fh.write(strings)
+    os.replace(tmp, out_path)  # running scanners keep their old mapping until restart
+    return len(keys), len(entries)
+
+
+# ---- lookups ----
+
+class CVEIndex:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_keys, self.n_entries, self._keys_off, self._entries_off, self._strings_off = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a CVE index")
+
+    def _str(self, off):
+        if off == NO_STR:
+            return ""
+        start = self._strings_off + off
+        return self._mm[start:self._mm.find(b"\0", start)].decode()
+
+    def _find(self, key):
+        h = _hash(key)
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_hash = _KEY.unpack_from(self._mm, self._keys_off + mid * _KEY.size)[0]
+            if mid_hash < h:
+                lo = mid + 1
+            else:
+                hi = mid
+        # equal hashes are adjacent; confirm the key string
+        while lo < self.n_keys:
+            kh, key_off, first, count = _KEY.unpack_from(self._mm, self._keys_off + lo * _KEY.size)
+            if kh != h:
+                break
+            if self._str(key_off) == key:
+                return first, count
+            lo += 1
+        return None
+
+    def lookup(self, vendor, product, version):
+        """
+        [(cve, cvss), ...] affecting this product version, highest CVSS first.
+        Each CVE appears once, even when an exact-version entry and a range (or
+        two overlapping ranges) both match; it keeps its highest score.
+        """
+        found = self._find(product_key(vendor, product))
+        if found is None or not version:
+            return []
+        first, count = found
+        vk = version_key(version)
+        best = {}
+        for i in range(first, first + count):
+            ver, si, se, ei, ee, cve, cvss = _ENTRY.unpack_from(self._mm, self._entries_off + i * _ENTRY.size)
+            if ver != NO_STR:
+                if version_key(self._str(ver)) != vk:
+                    continue
+            elif si == se == ei == ee == NO_STR:
+                continue  # "all versions" entries are too noisy to report
+            else:
+                if si != NO_STR and vk < version_key(self._str(si)):
+                    continue
+                if se != NO_STR and vk <= version_key(self._str(se)):
+                    continue
+                if ei != NO_STR and vk > version_key(self._str(ei)):
+                    continue
+                if ee != NO_STR and vk >= version_key(self._str(ee)):
+                    continue
+            cve, cvss = self._str(cve), round(cvss, 1)
+            if cvss > best.get(cve, -1.0):
+                best[cve] = cvss
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))
+
+
+_index = None
+_index_lock = threading.Lock()
+_index_loaded = False
+
+
+def get_index():
+    """The process-wide index (opened at startup, see apps.py), or None when no index file has been built."""
+    global _index, _index_loaded
+    with _index_lock:
+        if not _index_loaded:
+            path = str(getattr(settings, "NETWORK_CVE_INDEX", ""))
+            if path and os.path.exists(path):
+                _index = CVEIndex(path)
+            _index_loaded = True
+        return _index
+
+
+@lru_cache(maxsize=65536)
+def match_cves(vendor, product, version):
+    index = get_index()
+    if index is None:
+        return ()
+    return tuple(index.lookup(vendor, product, version))
+
+
+def parse_cpe(cpe):
+    """'cpe:/a:apache:http_server:2.4.49' (or CPE 2.3) -> (vendor, product, version or '')."""
+    parts = cpe.split(":")
+    if cpe.startswith("cpe:2.3:"):
+        parts = parts[1:]
+    if len(parts) < 4 or parts[1].lstrip("/") != "a":
+        return None
+    version = parts[4] if len(parts) > 4 and parts[4] not in ("*", "-") else ""
+    return parts[2], parts[3], version
+
+
+def annotate_rows(rows):
+    """Fill vulnerable / cve / max_cvss on rows that carry a CPE from version detection."""
+    for row in rows:
+        parsed = parse_cpe(row.get("cpe") or "")
+        if parsed is None:
+            continue
+        vendor, product, version = parsed
+        version = version or (row.get("version") if row.get("version") != "-" else "")
+        cves = match_cves(vendor, product, version) if version else ()
+        if cves:
+            row["vulnerable"] = True
+            row["cve"] = ", ".join(cve for cve, _ in cves[:MAX_CVES_PER_ROW])
+            row["max_cvss"] = cves[0][1]
+    return rows
@@ -0,0 +1,106 @@
+# backend/networkscanner/diff.py
+"""
+Differential scanning: compare a scan with the last finished scan of the
+same target and port range (the baseline).
+
+A diff scan first re-probes only the baseline's open ports on the
+baseline's live hosts. If nothing moved and the target was fully swept
+recently, that is the whole scan; otherwise a full sweep follows so newly
+opened ports are found too. Quick re-probes don't count as sweeps, so
+NETWORK_DIFF_FULL_SWEEP_DAYS is measured from the last scan that covered
+the whole range.
+"""
+import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import NetworkScan, NetworkScanPort
+
+
+def _earlier_scans(scan):
+    return NetworkScan.objects.filter(ip=scan.ip, ports=scan.ports, status="finished", id__lt=scan.id)
+
+
+def baseline_for(scan):
+    """Latest finished scan of the same ip and ports before this one, or None."""
+    return _earlier_scans(scan).only("id", "ip", "ports", "created_at", "finished_at").order_by("-id").first()
+
+
+def last_full_sweep(scan):
+    """Latest earlier scan of the same ip and ports that swept the whole range, or None."""
+    return (
+        _earlier_scans(scan)
+        .filter(Q(mode="full") | Q(diff__full_sweep=True))
+        .only("id", "created_at", "finished_at")
+        .order_by("-id")
+        .first()
+    )
+
+
+def open_ports(scan):
+    """{(host, port): service} of a scan's open ports."""
+    return {
+        (address, port): service
+        for address, port, service in NetworkScanPort.objects.filter(scan=scan, state="open")
+        .values_list("host__address", "port", "service")
+    }
+
+
+def ports_spec(ports):
+    """[22, 80, 81, 82, 443] -> '22,80-82,443' (nmap -p syntax)."""
+    ports = sorted(set(ports))
+    parts, start = [], None
+    for i, p in enumerate(ports):
+        if start is None:
+            start = p
+        if i + 1 == len(ports) or ports[i + 1] != p + 1:
+            parts.append(str(start) if start == p else f"{start}-{p}")
+            start = None
+    return ",".join(parts)
+
+
+def reprobe_plan(baseline_open):
+    """(targets, port spec) covering the baseline's open ports, or None if there is nothing to re-probe."""
+    if not baseline_open:
+        return None
+    hosts = sorted({host for host, _ in baseline_open})
+    return " ".join(hosts), ports_spec(port for _, port in baseline_open)
+
+
+def compute_diff(baseline_open, current_open, scope=None):
+    """
+    Compare open-port maps. With scope (the (host, port) pairs actually
+    re-probed) only those pairs are judged, so nothing counts as "opened".
+    """
+    keys = set(scope) if scope is not None else set(baseline_open) | set(current_open)
+    opened, closed, changed, unchanged = [], [], [], 0
+    for host, port in sorted(keys):
+        old = baseline_open.get((host, port))
+        new = current_open.get((host, port))
+        if old is None and new is not None:
+            opened.append({"host": host, "port": port, "service": new})
+        elif old is not None and new is None:
+            closed.append({"host": host, "port": port, "service": old})
+        elif old is not None and old != new:
+            changed.append({"host": host, "port": port, "old_service": old, "new_service": new})
+        elif old is not None:
+            unchanged += 1
+    return {"opened": opened, "closed": closed, "changed": changed, "unchanged": unchanged}
+
+
+def full_sweep_reason(baseline, quick_diff, last_full):
+    """Why the quick re-probe isn't enough, or None when it is. last_full: see last_full_sweep()."""
+    if baseline is None:
+        return "no baseline scan"
+    if quick_diff is None:
+        return "baseline has no open ports"
+    if quick_diff["closed"] or quick_diff["changed"]:
+        return "ports changed since baseline"
+    if last_full is None:
+        return "no earlier full sweep"
+    max_age = datetime.timedelta(days=getattr(settings, "NETWORK_DIFF_FULL_SWEEP_DAYS", 7))
+    if timezone.now() - (last_full.finished_at or last_full.created_at) > max_age:
+        return "last full sweep older than %d days" % max_age.days
+    return None
@@ -0,0 +1,251 @@
+# backend/networkscanner/discovery.py
+"""
+Host discovery pre-pass for network sweeps.
+
+On sparse networks most of a sweep is spent on addresses that don't
+exist. With discovery enabled, nmap -sn (ICMP echo/timestamp, TCP SYN and
+ACK pings, and ARP on directly attached segments) runs first, in parallel
+over the target's subnets, and only the live hosts are port-scanned.
+
+Subnets are swept DISCOVERY_GROUP at a time per nmap run, and nmap's
+output is parsed as it streams. With -v nmap reports down hosts too, so a
+run that fails or times out still yields every subnet it got all the way
+through; only the unfinished ones are port-scanned whole.
+
+Results are cached per subnet (/24, or a /120 for IPv6) for
+NETWORK_DISCOVERY_TTL seconds, so repeat sweeps of the same network skip
+the pass.
+"""
+import ipaddress
+import subprocess
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import as_completed
+
+from django.conf import settings
+
+from .nmap_runner import NMAP_BIN, READ_CHUNK, NmapError, NmapStreamParser, address_family, family_args, host_address, row_sort_key
+from .planner import _get_pool, split_targets
+
+SUBNET_PREFIX = {4: 24, 6: 120}
+# IPv6 blocks larger than this can't be swept address by address; they are passed through
+MAX_V6_ADDRESSES = 2 ** 16
+PING_PROBES = ["-PE", "-PP", "-PS22,80,443,3389", "-PA80,443", "-PR"]
+# ICMP timestamp and ARP are IPv4-only (nmap uses neighbor discovery on local IPv6 links)
+PING_PROBES_V6 = ["-PE", "-PS22,80,443,3389", "-PA80,443"]
+DISCOVERY_GROUP = 8  # subnets per nmap run: a failed run only loses this many
+DISCOVERY_TIMEOUT = 600  # per run
+
+
+class DiscoveryCache:
+    """LRU + TTL cache: subnet -> live addresses. Thread-safe."""
+
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # subnet -> (stored_at, live addresses)
+        self._lock = threading.Lock()
+
+    def ttl(self):
+        return getattr(settings, "NETWORK_DISCOVERY_TTL", 900)
+
+    def get(self, subnet):
+        with self._lock:
+            entry = self._data.get(subnet)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl():
+                del self._data[subnet]
+                return None
+            self._data.move_to_end(subnet)
+            return entry[1]
+
+    def put(self, subnet, live):
+        with self._lock:
+            self._data[subnet] = (time.monotonic(), tuple(live))
+            self._data.move_to_end(subnet)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = DiscoveryCache()
+
+
+def discovery_units(ip):
+    """
+    (subnets to discover, targets passed through as-is). Subnets are the
+    cache keys: /24 blocks (/120 for IPv6), single addresses, or nmap range
+    strings. Hostnames and huge IPv6 blocks are passed through.
+    """
+    subnets, passthrough = [], []
+    for t in split_targets(ip):
+        try:
+            net = ipaddress.ip_network(t, strict=False)
+        except ValueError:
+            if any(c.isalpha() for c in t.replace(":", "")):
+                passthrough.append(t)  # hostname
+            else:
+                subnets.append(t)  # 10.0.0.1-20 style range
+            continue
+        prefix = SUBNET_PREFIX[net.version]
+        if net.version == 6 and net.num_addresses > MAX_V6_ADDRESSES:
+            passthrough.append(t)
+        elif net.prefixlen >= prefix:
+            subnets.append(str(net))
+        else:
+            subnets.extend(str(sub) for sub in net.subnets(new_prefix=prefix))
+    return subnets, passthrough
+
+
+def _subnet_of(address, subnets):
+    try:
+        addr = ipaddress.ip_address(address)
+    except ValueError:
+        return None
+    net = ipaddress.ip_network(f"{address}/{SUBNET_PREFIX[addr.version]}", strict=False)
+    key = str(net)
+    if key in subnets:
+        return key
+    # smaller blocks / single addresses / range strings
+    for s in subnets:
+        try:
+            if addr in ipaddress.ip_network(s, strict=False):
+                return s
+        except ValueError:
+            continue
+    return None
+
+
+def _subnet_size(subnet):
+    try:
+        return ipaddress.ip_network(subnet, strict=False).num_addresses
+    except ValueError:
+        return None  # range string: completeness can't be told from the output
+
+
+def ping_sweep_args(subnets):
+    """nmap argv for one discovery run; subnets must share an address family."""
+    # -v: down hosts are written too, which is how a cut-off run's finished subnets are known
+    family = family_args(subnets)
+    probes = PING_PROBES_V6 if family else PING_PROBES
+    return [NMAP_BIN, *family, "-sn", "-n", "-v", "-T4", *probes, "-oX", "-", *subnets]
+
+
+def discovery_groups(subnets):
+    """
+    Subnets -> nmap runs: networks DISCOVERY_GROUP at a time, in order (neighbouring
+    blocks per run) and one address family per run; range strings each on their own,
+    as their hosts can't be matched back to them by address.
+    """
+    by_family = {}
+    for s in subnets:
+        if "/" in s:
+            by_family.setdefault(address_family(s), []).append(s)
+    groups = []
+    for networks in by_family.values():
+        groups += [networks[i:i + DISCOVERY_GROUP] for i in range(0, len(networks), DISCOVERY_GROUP)]
+    return groups + [[s] for s in subnets if "/" not in s]
+
+
+def _ping_sweep(subnets):
+    """
+    Run nmap -sn over subnets. Returns ({subnet: [live addresses]}, [finished
+    subnets], error or None). On failure, subnets nmap reported every address
+    of still count as finished.
+    """
+    live = {s: [] for s in subnets}
+    reported = dict.fromkeys(subnets, 0)
+    wanted = set(subnets)
+
+    def on_host(host):
+        address = host_address(host)
+        subnet = subnets[0] if len(subnets) == 1 else _subnet_of(address, wanted)
+        if subnet is None:
+            return
+        reported[subnet] += 1
+        status = host.find("status")
+        if status is None or status.get("state") == "up":
+            live[subnet].append(address)
+
+    def finished_subnets():
+        sizes = {s: _subnet_size(s) for s in subnets}
+        return [s for s in subnets if sizes[s] is not None and reported[s] >= sizes[s]]
+
+    args = ping_sweep_args(subnets)
+    parser = NmapStreamParser(on_host)
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr)
+        except FileNotFoundError:
+            raise NmapError("nmap is not installed on the scanner host")
+        killed = []
+
+        def kill():
+            killed.append(True)
+            proc.kill()
+
+        timer = threading.Timer(DISCOVERY_TIMEOUT, kill)
+        timer.start()
+        try:
+            for chunk in iter(lambda: proc.stdout.read1(READ_CHUNK), b""):
+                parser.feed(chunk)
+            returncode = proc.wait()
+            if killed:
+                return live, finished_subnets(), f"timed out after {DISCOVERY_TIMEOUT}s"
+            if returncode != 0:
+                stderr.seek(0)
+                return live, finished_subnets(), f"nmap failed: {stderr.read().decode(errors='replace')}"
+            parser.close()
+        except ET.ParseError as e:
+            proc.kill()
+            proc.wait()
+            return live, finished_subnets(), f"could not parse nmap output: {e}"
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+    return live, list(subnets), None
+
+
+def discover_hosts(ip):
+    """
+    Live targets of a scan's ip field: discovered addresses plus any
+    passed-through targets. Returns (targets, stats).
+    """
+    subnets, passthrough = discovery_units(ip)
+    live, todo = [], []
+    for subnet in subnets:
+        cached = _cache.get(subnet)
+        if cached is None:
+            todo.append(subnet)
+        else:
+            live.extend(cached)
+
+    failed = 0
+    if todo:
+        groups = discovery_groups(todo)
+        pool = _get_pool()
+        futures = {pool.submit(_ping_sweep, group): group for group in groups}
+        for fut in as_completed(futures):
+            try:
+                found, finished, _error = fut.result()
+            except NmapError:
+                found, finished = {}, []
+            finished = set(finished)
+            for subnet in futures[fut]:
+                if subnet in finished:
+                    _cache.put(subnet, found[subnet])
+                    live.extend(found[subnet])
+                else:
+                    # cut off part-way: port-scan it whole rather than miss hosts
+                    failed += 1
+                    passthrough.append(subnet)
+
+    live.sort(key=lambda a: row_sort_key({"host": a, "port": "-"}))
+    stats = {"subnets": len(subnets), "cached": len(subnets) - len(todo), "failed": failed, "live": len(live)}
+    return live + passthrough, stats
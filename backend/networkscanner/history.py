@@ -0,0 +1,61 @@
+# backend/networkscanner/history.py
+"""
+Per-user network scan history (replaces the list kept in request.session).
+
+Entries only reference the scan and carry summary counts, so starting a
+scan is one small INSERT instead of rewriting the whole session row, and
+the history endpoint is an index range scan on (user | session, created_at).
+
+Anonymous history is tied to the session cookie: only record_scan creates
+a session, and clients must send the cookie back (fetch with
+credentials: "include") for their entries to be found again.
+"""
+from .models import NetworkScanHistory, NetworkScanPort
+
+HISTORY_LIMIT = 20
+
+
+def _owner(request, create=False):
+    """
+    Filter kwargs for the requester's entries: the user, or the session of an
+    anonymous client. None for an anonymous client without a session unless
+    create is set.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return {"user": user}
+    if not request.session.session_key:
+        if not create:
+            return None
+        request.session.save()  # once per anonymous client, to get a key
+    return {"user": None, "session_key": request.session.session_key}
+
+
+def record_scan(request, scan):
+    return NetworkScanHistory.objects.create(scan=scan, ip=scan.ip, ports=scan.ports, status=scan.status,
+                                             **_owner(request, create=True))
+
+
+def update_summary(scan):
+    """Copy the final status and counts of a finished scan onto its history entries."""
+    NetworkScanHistory.objects.filter(scan=scan).update(
+        status=scan.status,
+        host_count=scan.hosts.count(),
+        open_port_count=NetworkScanPort.objects.filter(scan=scan, state="open").count(),
+    )
+
+
+def recent_history(request, limit=HISTORY_LIMIT):
+    owner = _owner(request)
+    if owner is None:
+        return []  # no session yet, so nothing recorded for this client
+    entries = (
+        NetworkScanHistory.objects.filter(**owner)
+        .order_by("-created_at")
+        .values("scan_id", "ip", "ports", "status", "host_count", "open_port_count", "created_at")[:limit]
+    )
+    # oldest first, as the session list was
+    return [
+        dict(e, timestamp=e.pop("created_at").strftime("%Y-%m-%d %H:%M:%S"))
+        for e in reversed(list(entries))
+    ]
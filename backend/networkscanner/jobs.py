@@ -0,0 +1,260 @@
+# backend/networkscanner/jobs.py
+"""
+Background worker pool for network scans.
+
+scan_network only creates the NetworkScan row and queues it here; nmap runs
+on one of NETWORK_SCAN_WORKERS pool threads and the row carries status /
+progress / error for clients polling scan status. Each host is saved to the
+NetworkScanHost / NetworkScanPort tables the moment nmap finishes it, so
+results show up while the scan is still running.
+
+The pool lives in the web server process: NETWORK_SCAN_WORKERS is per
+process, so N WSGI workers run up to N x NETWORK_SCAN_WORKERS scans. Jobs
+don't survive the process. Each scan records the "host:pid" that queued
+it, and recover_orphaned_scans() (run when a process starts handling scans,
+then at most every RECOVER_INTERVAL seconds) marks scans whose process is
+gone as errored, so clients stop polling them. Only processes on the same
+host can be checked.
+"""
+import datetime
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .connect_scan import run_connect_scan
+from .cve_index import annotate_rows
+from .diff import baseline_for, compute_diff, full_sweep_reason, last_full_sweep, open_ports, reprobe_plan
+from .discovery import discover_hosts
+from .history import update_summary
+from .models import NetworkScan
+from .nmap_runner import NmapError
+from .planner import run_sharded
+from .results import save_host_rows
+
+_pool = None
+_pool_lock = threading.Lock()
+_jobs_lock = threading.Lock()
+_queued = set()
+_running = set()
+_recover_lock = threading.Lock()
+_last_recover = None
+
+# how often pending / running scans are checked for a dead owner process
+RECOVER_INTERVAL = 60.0
+# scans older than this without an owner were never queued (legacy rows, crash before submit)
+UNOWNED_GRACE = datetime.timedelta(minutes=5)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=max(1, getattr(settings, "NETWORK_SCAN_WORKERS", 4)),
+                thread_name_prefix="network-scan",
+            )
+        return _pool
+
+
+def update_progress(scan, stage, status):
+    # keep only the latest entry for a stage
+    prog = [p for p in scan.progress if p.get("stage") != stage]
+    prog.append({"stage": stage, "status": status, "ts": time.time()})
+    scan.progress = prog
+    scan.save(update_fields=["progress"])
+
+
+# how often the host counter in progress is written while nmap runs
+PROGRESS_INTERVAL = 2.0
+
+
+def _host_saver(scan, stage="nmap"):
+    state = {"hosts": 0, "last": 0.0}
+
+    def on_host(address, rows):
+        if scan.version_detection:
+            annotate_rows(rows)
+        save_host_rows(scan, address, rows)
+        state["hosts"] += 1
+        now = time.monotonic()
+        if now - state["last"] >= PROGRESS_INTERVAL:
+            state["last"] = now
+            update_progress(scan, stage, f"running ({state['hosts']} hosts done)")
+
+    return on_host
+
+
+def _sweep(scan, targets, ports, stage="nmap"):
+    """Run the scan's engine (sharded nmap or the connect scanner) into its tables. Returns failed shard descriptions."""
+    update_progress(scan, stage, "running")
+
+    def shard_done(done, total):
+        update_progress(scan, "shards", f"{done}/{total}")
+
+    if scan.engine == "connect":
+        run_connect_scan(targets, ports, on_host=_host_saver(scan, stage))
+        update_progress(scan, stage, "done")
+        return []
+
+    options = {"version_detection": scan.version_detection}
+    _, failures = run_sharded(targets, ports, on_host=_host_saver(scan, stage), on_shard_done=shard_done, options=options)
+    update_progress(scan, stage, "done")
+    return failures
+
+
+def _full_sweep(scan, stage="nmap"):
+    """Sweep the scan's whole target, after a host discovery pass when enabled."""
+    targets = scan.ip
+    if scan.discovery:
+        update_progress(scan, "discovery", "running")
+        live, stats = discover_hosts(scan.ip)
+        update_progress(scan, "discovery", "done ({live} live, {cached}/{subnets} subnets cached)".format(**stats))
+        if not live:
+            return []
+        targets = " ".join(live)
+    return _sweep(scan, targets, scan.ports, stage)
+
+
+def _run_diff(scan):
+    """Quick re-probe of the baseline's open ports, then a full sweep only if needed."""
+    baseline = baseline_for(scan)
+    baseline_open = open_ports(baseline) if baseline else {}
+    plan = reprobe_plan(baseline_open)
+    failures, quick = [], None
+    if baseline is not None and plan is not None:
+        failures += _sweep(scan, plan[0], plan[1], stage="reprobe")
+        quick = compute_diff(baseline_open, open_ports(scan), scope=baseline_open.keys())
+
+    reason = full_sweep_reason(baseline, quick, last_full_sweep(scan))
+    if reason is None:
+        diff = dict(quick, full_sweep=False, reason="no changes on baseline ports")
+    else:
+        failures += _full_sweep(scan)
+        diff = dict(compute_diff(baseline_open, open_ports(scan)), full_sweep=True, reason=reason)
+    diff["baseline_id"] = baseline.id if baseline else None
+
+    scan.baseline = baseline
+    scan.diff = diff
+    scan.save(update_fields=["baseline", "diff"])
+    return failures
+
+
+def _run_job(scan_id):
+    with _jobs_lock:
+        _queued.discard(scan_id)
+        _running.add(scan_id)
+    close_old_connections()
+    try:
+        try:
+            scan = NetworkScan.objects.get(id=scan_id)
+        except NetworkScan.DoesNotExist:
+            return
+
+        scan.status = "running"
+        scan.started_at = timezone.now()
+        scan.save(update_fields=["status", "started_at"])
+        update_progress(scan, "queued", "done")
+
+        try:
+            if scan.mode == "diff":
+                failures = _run_diff(scan)
+            else:
+                failures = _full_sweep(scan)
+            scan.status = "finished"
+            if failures:
+                scan.error = f"{len(failures)} shard(s) failed: " + "; ".join(failures)
+        except NmapError as e:
+            scan.status = "error"
+            scan.error = str(e)
+            update_progress(scan, "nmap", "error")
+        except Exception as e:
+            scan.status = "error"
+            scan.error = str(e)
+
+        scan.finished_at = timezone.now()
+        scan.save(update_fields=["status", "error", "finished_at"])
+        update_summary(scan)
+    finally:
+        close_old_connections()
+        with _jobs_lock:
+            _running.discard(scan_id)
+
+
+def worker_id():
+    # read on every call: pre-forking servers import this module before forking
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _is_orphaned(scan, now):
+    if not scan.worker:
+        return now - scan.created_at > UNOWNED_GRACE
+    host, _, pid = scan.worker.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False  # another machine's process: can't tell
+    if int(pid) == os.getpid():
+        with _jobs_lock:
+            return scan.id not in _queued and scan.id not in _running
+    return not _process_alive(int(pid))
+
+
+def recover_orphaned_scans(force=False):
+    """
+    Mark pending / running scans whose worker process has exited as errored.
+    Throttled to once per RECOVER_INTERVAL unless force. Returns the number marked.
+    """
+    global _last_recover
+    with _recover_lock:
+        now_mono = time.monotonic()
+        if not force and _last_recover is not None and now_mono - _last_recover < RECOVER_INTERVAL:
+            return 0
+        _last_recover = now_mono
+
+    now = timezone.now()
+    orphaned = [
+        scan for scan in NetworkScan.objects.filter(status__in=("pending", "running")).only("id", "worker", "created_at")
+        if _is_orphaned(scan, now)
+    ]
+    for scan in orphaned:
+        # status filter again: the scan may have finished since it was read
+        updated = NetworkScan.objects.filter(id=scan.id, status__in=("pending", "running")).update(
+            status="error", finished_at=now,
+            error="Scan interrupted: the scanner process running it stopped (server restart). Start it again.",
+        )
+        if updated:
+            update_summary(NetworkScan.objects.get(id=scan.id))
+    return len(orphaned)
+
+
+def submit_scan(scan_id):
+    """Queue a pending NetworkScan for execution. Returns immediately."""
+    recover_orphaned_scans()
+    with _jobs_lock:
+        _queued.add(scan_id)
+    NetworkScan.objects.filter(id=scan_id).update(worker=worker_id())
+    _get_pool().submit(_run_job, scan_id)
+
+
+def queue_stats():
+    """This process's pool; other server processes have their own."""
+    with _jobs_lock:
+        return {
+            "workers": max(1, getattr(settings, "NETWORK_SCAN_WORKERS", 4)),
+            "queued": len(_queued),
+            "running": len(_running),
+        }
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from networkscanner.cve_index import build_index, source_files
+
+
+class Command(BaseCommand):
+    help = "Compile NVD JSON / CSV CVE data into the mmap-able CPE -> CVE index used by network scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", nargs="?", default=None,
+                            help="File or directory of NVD CVE API 2.0 JSON (.json/.json.gz) or CSV files "
+                                 "(default: NETWORK_CVE_SOURCE)")
+        parser.add_argument("--output", default=None, help="Index file to write (default: NETWORK_CVE_INDEX)")
+
+    def handle(self, *args, **opts):
+        source = opts["source"] or str(getattr(settings, "NETWORK_CVE_SOURCE", ""))
+        output = opts["output"] or str(getattr(settings, "NETWORK_CVE_INDEX", ""))
+        if not source or not output:
+            raise CommandError("Set NETWORK_CVE_SOURCE / NETWORK_CVE_INDEX or pass source and --output")
+        files = source_files(source)
+        if not files:
+            raise CommandError(f"No CVE data files found in {source}")
+
+        products, entries = build_index(files, output)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {entries} CPE ranges for {products} products from {len(files)} file(s) -> {output}"
+        ))
+        self.stdout.write("Restart the scanner workers to load the new index.")
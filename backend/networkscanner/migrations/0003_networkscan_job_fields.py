@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0002_networkscan_url_alter_networkscan_ip_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkscan',
+            name='error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='networkscan',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='networkscan',
+            name='progress',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='networkscan',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0003_networkscan_job_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkScanHost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=255)),
+                ('rows', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('scan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hosts', to='networkscanner.networkscan')),
+            ],
+        ),
+    ]
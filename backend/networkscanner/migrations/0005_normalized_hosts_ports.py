@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _port_objs(NetworkScanPort, scan_id, host, rows):
+    out = []
+    for r in rows:
+        if not str(r.get("port", "")).isdigit():
+            continue  # "-" placeholder: host up, no ports listed
+        out.append(NetworkScanPort(
+            scan_id=scan_id, host=host, port=int(r["port"]),
+            state=r.get("status") or "-", service=(r.get("service") or "-")[:100],
+        ))
+    return out
+
+
+def backfill_hosts_ports(apps, schema_editor):
+    """Move per-host rows (and results of older scans) into the normalized tables."""
+    NetworkScan = apps.get_model("networkscanner", "NetworkScan")
+    NetworkScanHost = apps.get_model("networkscanner", "NetworkScanHost")
+    NetworkScanPort = apps.get_model("networkscanner", "NetworkScanPort")
+
+    # hosts saved while streaming; port-sharded scans can have one row per shard
+    keep = {}
+    for host in NetworkScanHost.objects.order_by("id").iterator():
+        key = (host.scan_id, host.address)
+        first = keep.setdefault(key, host)
+        NetworkScanPort.objects.bulk_create(_port_objs(NetworkScanPort, host.scan_id, first, host.rows or []))
+        if first.pk != host.pk:
+            host.delete()
+
+    # older scans only have the results JSON
+    for scan in NetworkScan.objects.filter(hosts__isnull=True).exclude(results=[]).iterator():
+        by_host = {}
+        for r in scan.results or []:
+            by_host.setdefault(r.get("host") or "-", []).append(r)
+        for address, rows in by_host.items():
+            host = NetworkScanHost.objects.create(scan=scan, address=address[:255], rows=[])
+            NetworkScanPort.objects.bulk_create(_port_objs(NetworkScanPort, scan.id, host, rows))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0004_networkscanhost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkScanPort',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('port', models.PositiveIntegerField()),
+                ('protocol', models.CharField(default='tcp', max_length=10)),
+                ('state', models.CharField(max_length=20)),
+                ('service', models.CharField(default='-', max_length=100)),
+                ('host', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ports', to='networkscanner.networkscanhost')),
+                ('scan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='port_rows', to='networkscanner.networkscan')),
+            ],
+        ),
+        migrations.RunPython(backfill_hosts_ports, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='networkscanhost',
+            name='rows',
+        ),
+        migrations.AlterField(
+            model_name='networkscanhost',
+            name='address',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='networkscanhost',
+            constraint=models.UniqueConstraint(fields=('scan', 'address'), name='networkscanhost_scan_address'),
+        ),
+        migrations.AddIndex(
+            model_name='networkscanport',
+            index=models.Index(fields=['port', 'state'], name='networkscan_port_4e9f3f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkscanport',
+            index=models.Index(fields=['state'], name='networkscan_state_38adc2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='networkscanport',
+            index=models.Index(fields=['service'], name='networkscan_service_df2975_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_ports(apps, schema_editor):
+    """Keep the newest row per (host, port, protocol) before the unique constraint goes on."""
+    NetworkScanPort = apps.get_model("networkscanner", "NetworkScanPort")
+    dupes = (
+        NetworkScanPort.objects.values("host_id", "port", "protocol")
+        .annotate(n=Count("id"), keep=Max("id")).filter(n__gt=1)
+    )
+    for d in dupes:
+        NetworkScanPort.objects.filter(
+            host_id=d["host_id"], port=d["port"], protocol=d["protocol"], id__lt=d["keep"],
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0005_normalized_hosts_ports'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkscan',
+            name='baseline',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='diff_scans', to='networkscanner.networkscan'),
+        ),
+        migrations.AddField(
+            model_name='networkscan',
+            name='diff',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='networkscan',
+            name='mode',
+            field=models.CharField(default='full', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='networkscan',
+            index=models.Index(fields=['ip', 'status'], name='networkscan_ip_28512e_idx'),
+        ),
+        migrations.RunPython(drop_duplicate_ports, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='networkscanport',
+            constraint=models.UniqueConstraint(fields=('host', 'port', 'protocol'), name='networkscanport_host_port'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0006_networkscan_diff_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkscan',
+            name='version_detection',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='networkscanport',
+            name='cpe',
+            field=models.CharField(default='-', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='networkscanport',
+            name='cve',
+            field=models.CharField(default='-', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='networkscanport',
+            name='max_cvss',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='networkscanport',
+            name='product',
+            field=models.CharField(default='-', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='networkscanport',
+            name='version',
+            field=models.CharField(default='-', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='networkscanport',
+            name='vulnerable',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
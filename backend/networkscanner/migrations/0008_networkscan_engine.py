@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0007_version_detection_cves'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkscan',
+            name='engine',
+            field=models.CharField(default='nmap', max_length=10),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0008_networkscan_engine'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkScanHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(blank=True, default='', max_length=40)),
+                ('ip', models.CharField(max_length=255)),
+                ('ports', models.CharField(max_length=50)),
+                ('status', models.CharField(default='pending', max_length=50)),
+                ('host_count', models.PositiveIntegerField(default=0)),
+                ('open_port_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('scan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history_entries', to='networkscanner.networkscan')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='network_scan_history', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='networkscan_user_id_9f4e7d_idx'), models.Index(fields=['session_key', '-created_at'], name='networkscan_session_93dbb1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0009_networkscanhistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkscan',
+            name='discovery',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networkscanner', '0010_networkscan_discovery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkscan',
+            name='worker',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='networkscan',
+            index=models.Index(fields=['status'], name='networkscan_status_87731a_idx'),
+        ),
+    ]
@@ -1,9 +1,88 @@
+from django.conf import settings
 from django.db import models
 
 class NetworkScan(models.Model):
     ip = models.CharField(max_length=255)
     ports = models.CharField(max_length=50)
-    results = models.JSONField(default=list)  # or alerts = models.JSONField(default=list)
+    results = models.JSONField(default=list)  # legacy: rows now live in NetworkScanHost / NetworkScanPort
     url = models.URLField(default="")  # <- Set default here
+    status = models.CharField(max_length=50, default="pending")  # pending | running | finished | error
+    mode = models.CharField(max_length=10, default="full")  # full | diff
+    version_detection = models.BooleanField(default=False)  # nmap -sV + CVE matching
+    engine = models.CharField(max_length=10, default="nmap")  # nmap | connect (in-process asyncio scanner)
+    discovery = models.BooleanField(default=False)  # ping sweep first, port-scan live hosts only
+    worker = models.CharField(max_length=100, blank=True, default="")  # "host:pid" of the process running the job
+    baseline = models.ForeignKey("self", null=True, blank=True, on_delete=models.SET_NULL, related_name="diff_scans")
+    diff = models.JSONField(null=True, blank=True)
+    progress = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ip", "status"]),  # diff mode: last finished scan of a target
+            models.Index(fields=["status"]),  # orphaned pending / running scans after a restart
+        ]
+
+
+class NetworkScanHost(models.Model):
+    """One host of a scan, saved as soon as nmap finishes it (partial results while running)."""
+    scan = models.ForeignKey(NetworkScan, on_delete=models.CASCADE, related_name="hosts")
+    address = models.CharField(max_length=255, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scan", "address"], name="networkscanhost_scan_address"),
+        ]
+
+
+class NetworkScanPort(models.Model):
+    """One port row of a scan ("which hosts have 3389 open" is an index lookup on this table)."""
+    scan = models.ForeignKey(NetworkScan, on_delete=models.CASCADE, related_name="port_rows")
+    host = models.ForeignKey(NetworkScanHost, on_delete=models.CASCADE, related_name="ports")
+    port = models.PositiveIntegerField()
+    protocol = models.CharField(max_length=10, default="tcp")
+    state = models.CharField(max_length=20)
+    service = models.CharField(max_length=100, default="-")
+    # version detection (-sV) and CVE matching
+    product = models.CharField(max_length=200, default="-")
+    version = models.CharField(max_length=100, default="-")
+    cpe = models.CharField(max_length=255, default="-")
+    vulnerable = models.BooleanField(default=False, db_index=True)
+    cve = models.CharField(max_length=500, default="-")
+    max_cvss = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["port", "state"]),
+            models.Index(fields=["state"]),
+            models.Index(fields=["service"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["host", "port", "protocol"], name="networkscanport_host_port"),
+        ]
+
+
+class NetworkScanHistory(models.Model):
+    """
+    Recent scans of one user (or, for anonymous clients, one session): a
+    reference to the scan plus summary counts filled in when it finishes.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name="network_scan_history")
+    session_key = models.CharField(max_length=40, blank=True, default="")
+    scan = models.ForeignKey(NetworkScan, on_delete=models.CASCADE, related_name="history_entries")
+    ip = models.CharField(max_length=255)
+    ports = models.CharField(max_length=50)
     status = models.CharField(max_length=50, default="pending")
+    host_count = models.PositiveIntegerField(default=0)
+    open_port_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["session_key", "-created_at"]),
+        ]
@@ -0,0 +1,262 @@
+# backend/networkscanner/nmap_runner.py
+"""
+Helpers for running nmap and turning its XML output into result rows.
+
+nmap's XML is parsed incrementally while the process is still writing it:
+every <host> is turned into rows and handed to the caller as soon as it
+closes, then dropped from the tree, so memory stays flat on large sweeps.
+
+Row shape (what the frontend table and PDF report read):
+  {"host", "port", "status", "service", "vulnerable", "cve"}
+"""
+import ipaddress
+import subprocess
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+
+from .timing import TimingController
+
+NMAP_BIN = "nmap"
+READ_CHUNK = 64 * 1024
+# longer target lists (e.g. live hosts from discovery) go through -iL, not argv
+MAX_ARGV_TARGETS = 512
+
+
+class NmapError(Exception):
+    """nmap exited non-zero, produced no output, or timed out."""
+
+
+def norm(val, is_bool=False):
+    if is_bool: return bool(val)
+    if val is None: return "-"
+    s = str(val).strip()
+    return "-" if s == "" or s.lower() in ("n/a", "unknown") else s
+
+
+def port_count(ports):
+    """Number of ports in an nmap port spec like '22,80,8000-8100' (best effort)."""
+    count = 0
+    for part in str(ports).split(","):
+        part = part.strip().split(":")[-1]  # drop T:/U: prefixes
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, end = part.split("-", 1)
+                count += max(1, int(end or 65535) - int(start or 1) + 1)
+            else:
+                int(part)
+                count += 1
+        except ValueError:
+            count += 1
+    return max(1, count)
+
+
+def address_family(target):
+    """6 for IPv6 addresses / networks, 4 for everything else (IPv4, nmap ranges, hostnames)."""
+    try:
+        return ipaddress.ip_network(target.strip("[]"), strict=False).version
+    except ValueError:
+        return 4
+
+
+def family_args(targets):
+    """["-6"] for IPv6 targets, [] for IPv4. nmap can't mix families in one run."""
+    families = {address_family(t) for t in targets}
+    if len(families) > 1:
+        raise NmapError("IPv4 and IPv6 targets must be scanned in separate nmap runs")
+    return ["-6"] if families == {6} else []
+
+
+def build_nmap_args(targets, ports, options=None):
+    """
+    options: {"version_detection": bool, "timing": [nmap timing args],
+              "target_file": path read with -iL instead of targets}
+    targets are always passed (also with target_file) so the address family is known.
+    """
+    options = options or {}
+    if isinstance(targets, str):
+        targets = targets.split()
+    args = [NMAP_BIN, *family_args(targets), *(options.get("timing") or ["-T4", "--min-rate", "500"])]
+    if options.get("version_detection"):
+        args.append("-sV")
+    if options.get("target_file"):
+        return args + ["-p", ports, "-oX", "-", "-iL", options["target_file"]]
+    return args + ["-p", ports, "-oX", "-", *targets]
+
+
+def host_address(host):
+    """Address of a <host> element (IPv4/IPv6 preferred over MAC)."""
+    fallback = None
+    for addr in host.iter("address"):
+        if addr.get("addrtype") in ("ipv4", "ipv6"):
+            return norm(addr.get("addr"))
+        fallback = fallback or addr.get("addr")
+    return norm(fallback)
+
+
+def host_rows(host):
+    """Result rows for one <host> element."""
+    host_addr = host_address(host)
+    ports_node = host.findall("ports/port")
+    if not ports_node:
+        return [{"host": host_addr, "port": "-", "status": "-", "service": "-", "vulnerable": False, "cve": "-"}]
+    rows = []
+    for port in ports_node:
+        state = port.find("state")
+        service = port.find("service")
+        if service is None:
+            service = ET.Element("service")
+        rows.append({
+            "host": host_addr,
+            "port": norm(port.get("portid")),
+            "protocol": port.get("protocol") or "tcp",
+            "status": norm(state.get("state") if state is not None else None),
+            "service": norm(service.get("name")),
+            # filled by -sV (version detection)
+            "product": norm(service.get("product")),
+            "version": norm(service.get("version")),
+            "cpe": norm(service.findtext("cpe")),
+            "vulnerable": False,
+            "cve": "-"
+        })
+    return rows
+
+
+def row_sort_key(r):
+    """Order rows by host (numerically for IPs) then port."""
+    try:
+        addr = ipaddress.ip_address(r["host"])
+        host = (0, addr.version, int(addr), "")
+    except ValueError:
+        host = (1, 0, 0, r["host"])
+    return host + (int(r["port"]) if str(r["port"]).isdigit() else -1,)
+
+
+class NmapStreamParser:
+    """
+    Feed nmap XML in arbitrary chunks; on_host(element) is called for every
+    completed <host>, on_progress(attrs) for every <taskprogress> report
+    (--stats-every). Finished elements are removed from the tree.
+    """
+
+    def __init__(self, on_host, on_progress=None):
+        self.on_host = on_host
+        self.on_progress = on_progress
+        self.hosts = 0
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+
+    def feed(self, data):
+        self._parser.feed(data)
+        self._drain()
+
+    def close(self):
+        self._parser.close()
+        self._drain()
+
+    def _drain(self):
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+            if elem.tag == "host":
+                self.hosts += 1
+                self.on_host(elem)
+                # the parser still holds any element it is building, so this is safe
+                self._root.clear()
+            elif elem.tag == "taskprogress":
+                if self.on_progress is not None:
+                    self.on_progress(elem.attrib)
+                self._root.clear()
+
+
+def parse_nmap_xml(xml_text):
+    rows = []
+    parser = NmapStreamParser(lambda host: rows.extend(host_rows(host)))
+    parser.feed(xml_text)
+    parser.close()
+    return rows
+
+
+def run_nmap(targets, ports, on_host=None, options=None):
+    """
+    Run nmap and parse its output as it arrives. on_host(address, rows) is
+    called for each host as soon as nmap finishes it. Returns all rows, or
+    [] when on_host is given (rows are only handed to on_host, so memory
+    stays flat however many hosts the scan covers).
+    options are passed to build_nmap_args; timing and the deadline come
+    from the target network's adaptive profile (see timing.py).
+    Raises NmapError.
+    """
+    options = dict(options or {})
+    target_list = targets.split() if isinstance(targets, str) else list(targets)
+    controller = TimingController(target_list, port_count(ports), options.get("version_detection", False))
+    options["timing"] = controller.args()
+    rows = []
+
+    def handle(host):
+        controller.observe_host(host)
+        host_result = host_rows(host)
+        if on_host is not None:
+            on_host(host_address(host), host_result)
+        else:
+            rows.extend(host_result)
+
+    parser = NmapStreamParser(handle, on_progress=controller.observe_progress)
+    with tempfile.TemporaryFile() as stderr, tempfile.NamedTemporaryFile("w", suffix=".txt") as target_file:
+        if len(target_list) > MAX_ARGV_TARGETS:
+            target_file.write("\n".join(target_list))
+            target_file.flush()
+            options["target_file"] = target_file.name
+        try:
+            proc = subprocess.Popen(build_nmap_args(targets, ports, options), stdout=subprocess.PIPE, stderr=stderr)
+        except FileNotFoundError:
+            raise NmapError("nmap is not installed on the scanner host")
+
+        # the deadline moves with nmap's progress reports, so poll instead of a fixed Timer
+        killed = []
+        finished = threading.Event()
+
+        def watch():
+            while not finished.wait(1.0):
+                reason = controller.expired()
+                if reason:
+                    killed.append(reason)
+                    proc.kill()
+                    return
+
+        watchdog = threading.Thread(target=watch, name="nmap-watchdog", daemon=True)
+        watchdog.start()
+        got_output = False
+        try:
+            for chunk in iter(lambda: proc.stdout.read1(READ_CHUNK), b""):
+                got_output = got_output or bool(chunk.strip())
+                parser.feed(chunk)
+            returncode = proc.wait()
+        except ET.ParseError as e:
+            proc.kill()
+            proc.wait()
+            raise NmapError(f"Could not parse nmap output: {e}")
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        finally:
+            finished.set()
+            proc.stdout.close()
+
+        if killed:
+            controller.finish(ok=False)
+            raise NmapError(f"Nmap {killed[0]}")
+        if returncode != 0 or not got_output:
+            stderr.seek(0)
+            raise NmapError(f"Nmap failed: {stderr.read().decode(errors='replace')}")
+        try:
+            parser.close()
+        except ET.ParseError as e:
+            raise NmapError(f"Could not parse nmap output: {e}")
+    controller.finish(ok=True)
+    return rows
@@ -0,0 +1,199 @@
+# backend/networkscanner/planner.py
+"""
+Scan planner: splits one network scan into shards that run as separate
+nmap processes in parallel. Streaming callers (on_host) get each host as
+its shard finishes it; otherwise the shards' rows are merged back together.
+
+Targets are split first (CIDR blocks into smaller subnets, target lists
+spread over shards); when there are fewer target shards than workers, the
+port range is split too. All jobs share one shard pool sized to the CPU
+count, so concurrent scans can't oversubscribe the box.
+"""
+import ipaddress
+import math
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .nmap_runner import NmapError, address_family, row_sort_key, run_nmap
+
+# don't split below this many addresses / ports per shard: extra nmap
+# startups would cost more than the parallelism gains
+MIN_HOSTS_PER_SHARD = 256
+MIN_PORTS_PER_SHARD = 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shard_workers():
+    return max(1, getattr(settings, "NETWORK_SCAN_SHARD_WORKERS", None) or os.cpu_count() or 1)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=shard_workers(), thread_name_prefix="nmap-shard")
+        return _pool
+
+
+def split_targets(ip):
+    """'10.0.0.0/24, host.example 10.0.1.5' -> ['10.0.0.0/24', 'host.example', '10.0.1.5']"""
+    return [t for t in re.split(r"[\s,]+", str(ip)) if t]
+
+
+def _target_units(targets, wanted):
+    """
+    (target, address_count) units, with CIDR blocks cut into subnets so there
+    are at least `wanted` units when the address space allows it.
+    """
+    networks, units = [], []
+    for t in targets:
+        try:
+            net = ipaddress.ip_network(t, strict=False)
+        except ValueError:
+            units.append((t, 1))  # hostname or nmap range syntax: keep whole
+            continue
+        networks.append((t, net))
+
+    total = sum(net.num_addresses for _, net in networks)
+    for t, net in networks:
+        per_net = max(1, math.ceil(wanted * net.num_addresses / max(1, total)))
+        new_prefix = net.prefixlen
+        max_prefix = net.max_prefixlen - int(math.log2(MIN_HOSTS_PER_SHARD))
+        while 2 ** (new_prefix - net.prefixlen) < per_net and new_prefix < max_prefix:
+            new_prefix += 1
+        if new_prefix == net.prefixlen:
+            units.append((t, net.num_addresses))
+        else:
+            units.extend((str(sub), sub.num_addresses) for sub in net.subnets(new_prefix=new_prefix))
+    return units
+
+
+def _pack(units, bins):
+    """Greedy largest-first bin packing of units into at most `bins` target lists."""
+    bins = max(1, min(bins, len(units)))
+    packed = [[0, []] for _ in range(bins)]
+    for target, size in sorted(units, key=lambda u: -u[1]):
+        slot = min(packed, key=lambda b: b[0])
+        slot[0] += size
+        slot[1].append(target)
+    return [targets for _, targets in packed if targets]
+
+
+def port_ranges(ports):
+    """'1-1024,3389' -> [(1, 1024), (3389, 3389)], or None if the spec can't be split."""
+    ranges = []
+    for part in str(ports).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        m = re.fullmatch(r"(\d*)-(\d*)|(\d+)", part)
+        if not m:
+            return None  # protocol prefixes, service names, ...
+        if m.group(3):
+            ranges.append((int(m.group(3)), int(m.group(3))))
+        else:
+            ranges.append((int(m.group(1) or 1), int(m.group(2) or 65535)))
+    return ranges or None
+
+
+def _split_ports(ports, parts):
+    ranges = port_ranges(ports)
+    if ranges is None or parts <= 1:
+        return [ports]
+    total = sum(end - start + 1 for start, end in ranges)
+    parts = max(1, min(parts, total // MIN_PORTS_PER_SHARD))
+    if parts <= 1:
+        return [ports]
+
+    per_part = math.ceil(total / parts)
+    specs, current, room = [], [], per_part
+    for start, end in ranges:
+        while start <= end:
+            take = min(room, end - start + 1)
+            current.append(f"{start}-{start + take - 1}" if take > 1 else str(start))
+            start += take
+            room -= take
+            if room == 0:
+                specs.append(",".join(current))
+                current, room = [], per_part
+    if current:
+        specs.append(",".join(current))
+    return specs
+
+
+def plan_shards(ip, ports, workers=None):
+    """
+    Returns [(targets, port_spec), ...]; a single shard means "run nmap as before".
+    """
+    workers = workers or shard_workers()
+    targets = split_targets(ip) or [ip]
+    # nmap scans one address family per run (-6 for IPv6), so families never share a shard
+    by_family = {}
+    for t in targets:
+        by_family.setdefault(address_family(t), []).append(t)
+    target_shards = []
+    for family_targets in by_family.values():
+        target_shards += _pack(_target_units(family_targets, workers), workers)
+    port_shards = _split_ports(ports, math.ceil(workers / len(target_shards)))
+    return [(t, p) for t in target_shards for p in port_shards]
+
+
+def _merge(rows):
+    """
+    Combine shard rows: drop "no ports" placeholder rows for hosts another
+    shard found ports on, and order by host then port.
+    """
+    with_ports = {r["host"] for r in rows if r["port"] != "-"}
+    merged = [r for r in rows if r["port"] != "-" or r["host"] not in with_ports]
+
+    return sorted(merged, key=row_sort_key)
+
+
+def _run_shard(targets, ports, on_host, options):
+    try:
+        return run_nmap(targets, ports, on_host=on_host, options=options)
+    finally:
+        close_old_connections()
+
+
+def run_sharded(ip, ports, on_host=None, on_shard_done=None, options=None):
+    """
+    Run a scan as parallel nmap shards. Returns (rows, failures) where
+    failures lists "<targets> <ports>: error" for shards that failed. With
+    on_host, rows go only to on_host and rows is [].
+    Raises NmapError when every shard failed.
+    """
+    shards = plan_shards(ip, ports)
+    if len(shards) == 1:
+        return run_nmap(shards[0][0], shards[0][1], on_host=on_host, options=options), []
+
+    lock = threading.Lock()
+
+    def locked_on_host(address, rows):
+        with lock:
+            on_host(address, rows)
+
+    pool = _get_pool()
+    shard_on_host = locked_on_host if on_host is not None else None
+    futures = {pool.submit(_run_shard, t, p, shard_on_host, options): (t, p) for t, p in shards}
+    rows, failures = [], []
+    for done, fut in enumerate(as_completed(futures), 1):
+        targets, shard_ports = futures[fut]
+        try:
+            rows.extend(fut.result())
+        except NmapError as e:
+            failures.append(f"{' '.join(targets)} -p {shard_ports}: {e}")
+        if on_shard_done is not None:
+            with lock:
+                on_shard_done(done, len(shards))
+
+    if len(failures) == len(shards):
+        raise NmapError("; ".join(failures))
+    return (_merge(rows) if on_host is None else []), failures
@@ -0,0 +1,55 @@
+# backend/networkscanner/results.py
+"""
+Read/write network scan rows in the normalized NetworkScanHost /
+NetworkScanPort tables, in the row shape the frontend and PDF use.
+"""
+from .models import NetworkScanHost, NetworkScanPort
+from .nmap_runner import row_sort_key
+
+UPSERT_FIELDS = ["state", "service", "product", "version", "cpe", "vulnerable", "cve", "max_cvss"]
+
+
+def save_host_rows(scan, address, rows):
+    """
+    Persist one host's rows. Port-sharded scans report a host once per shard
+    (they share one host row); a port seen twice in one scan keeps the latest state.
+    """
+    host, _ = NetworkScanHost.objects.get_or_create(scan=scan, address=address[:255])
+    NetworkScanPort.objects.bulk_create([
+        NetworkScanPort(
+            scan=scan, host=host, port=int(r["port"]), protocol=r.get("protocol", "tcp"),
+            state=r["status"], service=r["service"][:100],
+            product=r.get("product", "-")[:200], version=r.get("version", "-")[:100], cpe=r.get("cpe", "-")[:255],
+            vulnerable=r.get("vulnerable", False), cve=r.get("cve", "-")[:500], max_cvss=r.get("max_cvss"),
+        )
+        for r in rows if str(r["port"]).isdigit()
+    ], update_conflicts=True, unique_fields=["host", "port", "protocol"], update_fields=UPSERT_FIELDS)
+    return host
+
+
+ROW_FIELDS = ("host_id", "port", "protocol", "state", "service", "product", "version", "cpe", "vulnerable", "cve", "max_cvss")
+
+
+def port_row(address, values):
+    return {
+        "host": address, "port": str(values["port"]), "protocol": values["protocol"],
+        "status": values["state"], "service": values["service"],
+        "product": values["product"], "version": values["version"], "cpe": values["cpe"],
+        "vulnerable": values["vulnerable"], "cve": values["cve"], "max_cvss": values["max_cvss"],
+    }
+
+
+def scan_rows(scan):
+    """All rows of a scan (works while it is still running), ordered by host and port."""
+    hosts = dict(scan.hosts.values_list("id", "address"))
+    if not hosts:
+        return list(scan.results or [])  # scans saved before the normalized tables
+
+    rows, seen = [], set()
+    for values in scan.port_rows.values(*ROW_FIELDS):
+        rows.append(port_row(hosts[values["host_id"]], values))
+        seen.add(values["host_id"])
+    for host_id, address in hosts.items():
+        if host_id not in seen:
+            rows.append({"host": address, "port": "-", "status": "-", "service": "-", "vulnerable": False, "cve": "-"})
+    return sorted(rows, key=row_sort_key)
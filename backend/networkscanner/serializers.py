@@ -2,6 +2,10 @@ from rest_framework import serializers
 from .models import NetworkScan
 
 class NetworkScanSerializer(serializers.ModelSerializer):
+    # filled by past_network_scans' annotations; rows come from results/<id>/
+    host_count = serializers.IntegerField(read_only=True, default=0)
+    open_port_count = serializers.IntegerField(read_only=True, default=0)
+
     class Meta:
         model = NetworkScan
-        fields = ["id", "ip", "ports", "results", "status", "created_at"]  # include id
+        fields = ["id", "ip", "ports", "status", "created_at", "finished_at", "host_count", "open_port_count"]  # include id
@@ -1,3 +1,85 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.test import SimpleTestCase, TestCase
+
+from .cve_index import CVEIndex, build_index
+from .discovery import discovery_groups, discovery_units, ping_sweep_args
+from .nmap_runner import NmapError, address_family, build_nmap_args
+from .planner import plan_shards
+
+CSV_FIELDS = ["vendor", "product", "version", "version_start_including", "version_start_excluding",
+              "version_end_including", "version_end_excluding", "cve", "cvss"]
+
+
+class CVEIndexLookupTests(SimpleTestCase):
+    def build(self, rows):
+        tmp = tempfile.mkdtemp()
+        source = os.path.join(tmp, "cves.csv")
+        with open(source, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(dict(dict.fromkeys(CSV_FIELDS, ""), **row))
+        out = os.path.join(tmp, "index.bin")
+        build_index([source], out)
+        return CVEIndex(out)
+
+    def test_exact_and_range_entries_for_same_cve_are_reported_once(self):
+        index = self.build([
+            {"vendor": "openbsd", "product": "openssh", "version": "7.4", "cve": "CVE-2018-15473", "cvss": "5.3"},
+            {"vendor": "openbsd", "product": "openssh", "version": "*", "version_end_including": "7.7",
+             "cve": "CVE-2018-15473", "cvss": "5.3"},
+            {"vendor": "openbsd", "product": "openssh", "version": "*", "version_start_including": "7.0",
+             "version_end_excluding": "7.5", "cve": "CVE-2017-X", "cvss": "7.0"},
+        ])
+        self.assertEqual(index.lookup("openbsd", "openssh", "7.4"), [("CVE-2017-X", 7.0), ("CVE-2018-15473", 5.3)])
+
+    def test_overlapping_ranges_keep_highest_score(self):
+        index = self.build([
+            {"vendor": "apache", "product": "http_server", "version": "*", "version_end_excluding": "2.4.50",
+             "cve": "CVE-2021-41773", "cvss": "7.5"},
+            {"vendor": "apache", "product": "http_server", "version": "*", "version_start_including": "2.4.49",
+             "version_end_including": "2.4.49", "cve": "CVE-2021-41773", "cvss": "9.8"},
+        ])
+        self.assertEqual(index.lookup("apache", "http_server", "2.4.49"), [("CVE-2021-41773", 9.8)])
+
+
+class AddressFamilyArgsTests(SimpleTestCase):
+    def test_ipv6_port_scan_gets_dash_6(self):
+        args = build_nmap_args(["2001:db8::/120"], "22,80")
+        self.assertEqual(args[1], "-6")
+        self.assertNotIn("-6", build_nmap_args(["10.0.0.0/24"], "22,80"))
+
+    def test_ipv6_ping_sweep_gets_dash_6_and_v6_probes(self):
+        args = ping_sweep_args(["2001:db8::/120", "2001:db8::100/120"])
+        self.assertEqual(args[1], "-6")
+        self.assertNotIn("-PR", args)
+        self.assertNotIn("-PP", args)
+        self.assertNotIn("-6", ping_sweep_args(["10.0.0.0/24"]))
+
+    def test_families_never_share_a_run(self):
+        subnets, _ = discovery_units("10.0.0.0/23 2001:db8::/119")
+        for group in discovery_groups(subnets):
+            self.assertEqual(len({address_family(s) for s in group}), 1)
+        for targets, _ports in plan_shards("10.0.0.0/24 2001:db8::1 10.0.1.5", "80", workers=1):
+            self.assertEqual(len({address_family(t) for t in targets}), 1)
+        with self.assertRaises(NmapError):
+            build_nmap_args(["10.0.0.1", "2001:db8::1"], "80")
+
+
+class AnonymousHistoryTests(TestCase):
+    def test_reading_history_creates_no_session(self):
+        response = self.client.get("/api/networkscanner/history/")
+        self.assertEqual(response.json(), {"history": []})
+        self.assertFalse(Session.objects.exists())
+
+    def test_scans_of_a_session_show_up_in_its_history(self):
+        with mock.patch("networkscanner.views.submit_scan"):
+            self.client.post("/api/networkscanner/scan/", {"ip": "192.0.2.7", "ports": "80"}, content_type="application/json")
+        self.assertEqual(Session.objects.count(), 1)
+        history = self.client.get("/api/networkscanner/history/").json()["history"]
+        self.assertEqual([e["ip"] for e in history], ["192.0.2.7"])
@@ -0,0 +1,305 @@
+# backend/networkscanner/timing.py
+"""
+Adaptive nmap timing.
+
+Every nmap run used to get -T4 --min-rate 500 and a deadline based on the
+port count alone. Instead, each target network (a /24, a /64 or a
+hostname) keeps a TimingProfile fed back from the runs that touched it:
+
+- host RTTs reported by nmap (<times srtt rttvar>) set the RTT timeouts
+- runs that finish cleanly raise the send rate and parallelism by a fixed
+  step for the next run (a bigger step on fast LANs)
+- runs that time out, stall, or have hosts hit --host-timeout halve them
+  and add retries, so fragile links see fewer dropped probes (AIMD)
+
+A run over several networks uses the most cautious of their profiles and
+feeds its outcome back into each of them. Profiles live in the process
+(one set per server process) and start from the defaults after a restart.
+
+While nmap runs, the <taskprogress> elements it writes every
+--stats-every interval move the deadline: a scan that is making progress
+but needs longer than planned gets extended (up to
+NETWORK_SCAN_MAX_TIMEOUT), and one that stops reporting is killed early.
+"""
+import ipaddress
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+STATS_INTERVAL = 5  # seconds between <taskprogress> reports
+STALL_TIMEOUT = 300  # no progress report or finished host for this long -> stalled
+HOSTGROUP = 64  # hosts nmap works on in parallel (roughly, at -T4)
+
+DEFAULT_RATE = 500  # the old fixed --min-rate
+MIN_RATE, MAX_RATE = 50, 5000
+MIN_PARALLELISM, MAX_PARALLELISM = 8, 256
+DEFAULT_RTT_TIMEOUT = 1.0
+MAX_RETRIES = 6
+MAX_PROFILES = 4096
+# additive increase per clean run: (rate, parallelism), fast LANs (srtt < 10ms) / others
+FAST_STEP = (500, 32)
+SLOW_STEP = (100, 8)
+
+
+class Timing:
+    """nmap timing options for one run."""
+
+    def __init__(self, rate=DEFAULT_RATE, parallelism=None, rtt_timeout=None, retries=None, fragile=False):
+        self.rate = rate
+        self.parallelism = parallelism
+        self.rtt_timeout = rtt_timeout
+        self.retries = retries
+        self.fragile = fragile
+
+    def args(self):
+        if self.fragile:
+            # a cap instead of a floor: let nmap back off further if it sees drops
+            args = ["-T3", "--max-rate", str(self.rate)]
+        else:
+            args = ["-T4", "--min-rate", str(self.rate)]
+        if self.parallelism:
+            args += ["--max-parallelism" if self.fragile else "--min-parallelism", str(self.parallelism)]
+        if self.rtt_timeout:
+            ms = int(self.rtt_timeout * 1000)
+            args += ["--initial-rtt-timeout", f"{max(50, ms // 2)}ms", "--max-rtt-timeout", f"{max(100, ms)}ms"]
+        if self.retries is not None:
+            args += ["--max-retries", str(self.retries)]
+        return args
+
+    def effective_rtt_timeout(self):
+        return self.rtt_timeout or DEFAULT_RTT_TIMEOUT
+
+    def effective_retries(self):
+        return self.retries if self.retries is not None else 2
+
+
+class TimingProfile:
+    """What past runs observed on one network."""
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.rate = DEFAULT_RATE
+        self.parallelism = None
+        self.retries = None
+        self.fragile = False
+
+    def sample_rtt(self, srtt, rttvar):
+        if self.srtt is None:
+            self.srtt, self.rttvar = srtt, rttvar
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * max(rttvar, abs(self.srtt - srtt))
+            self.srtt = 0.875 * self.srtt + 0.125 * srtt
+
+    def timing(self):
+        rtt_timeout = None
+        if self.srtt is not None:
+            rtt_timeout = min(10.0, max(0.1, (self.srtt + 4 * self.rttvar) * 2))
+        return Timing(self.rate, self.parallelism, rtt_timeout, self.retries, self.fragile)
+
+    def succeeded(self):
+        """Clean run: probe harder next time (additive increase)."""
+        fast = self.srtt is not None and self.srtt < 0.01
+        rate_step, parallelism_step = FAST_STEP if fast else SLOW_STEP
+        self.rate = min(MAX_RATE, self.rate + rate_step)
+        self.parallelism = min(MAX_PARALLELISM, (self.parallelism or 32) + parallelism_step)
+        if self.retries is not None:
+            self.retries = self.retries - 1 if self.retries > 2 else None
+        self.fragile = self.retries is not None  # until the extra retries are worked off
+
+    def struggled(self):
+        """Timeout, stall or host timeouts: back off (multiplicative decrease)."""
+        self.rate = max(MIN_RATE, self.rate // 2)
+        self.parallelism = max(MIN_PARALLELISM, (self.parallelism or 32) // 2)
+        self.retries = min(MAX_RETRIES, (self.retries if self.retries is not None else 2) + 1)
+        self.fragile = True
+
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def network_key(target):
+    """'10.1.2.3' / '10.1.2.0/28' -> '10.1.2.0/24'; IPv6 -> its /64; hostnames as-is."""
+    try:
+        net = ipaddress.ip_network(target, strict=False)
+    except ValueError:
+        m = re.match(r"(\d+\.\d+\.\d+)\.", target)  # 10.0.0.1-20 style ranges
+        return f"{m.group(1)}.0/24" if m else target.lower()
+    prefix = 24 if net.version == 4 else 64
+    if net.prefixlen > prefix:
+        net = net.supernet(new_prefix=prefix)
+    return str(net)
+
+
+def combine_timings(timings):
+    """The most cautious of several networks' timings: lowest rate, longest waits, most retries."""
+    def pick(values, fn):
+        values = [v for v in values if v is not None]
+        return fn(values) if values else None
+
+    return Timing(
+        rate=min(t.rate for t in timings),
+        parallelism=pick((t.parallelism for t in timings), min),
+        rtt_timeout=pick((t.rtt_timeout for t in timings), max),
+        retries=pick((t.retries for t in timings), max),
+        fragile=any(t.fragile for t in timings),
+    )
+
+
+def _get_profile(key):
+    with _profiles_lock:
+        profile = _profiles.get(key)
+        if profile is None:
+            profile = _profiles[key] = TimingProfile()
+            if len(_profiles) > MAX_PROFILES:
+                _profiles.popitem(last=False)
+        else:
+            _profiles.move_to_end(key)
+        return profile
+
+
+def host_count(targets):
+    """Addresses covered by nmap targets (best effort for range syntax)."""
+    count = 0
+    for t in targets:
+        try:
+            count += ipaddress.ip_network(t, strict=False).num_addresses
+            continue
+        except ValueError:
+            pass
+        octets = t.split(".")
+        if len(octets) == 4 and all(re.fullmatch(r"[\d,\-*]+", o) for o in octets):
+            count += math.prod(_octet_count(o) for o in octets)
+        else:
+            count += 1
+    return max(1, count)
+
+
+def _octet_count(octet):
+    """'1-20' -> 20, '1,5,7' -> 3, '*' -> 256."""
+    if octet == "*":
+        return 256
+    total = 0
+    for part in octet.split(","):
+        start, dash, end = part.partition("-")
+        total += int(end or 255) - int(start or 0) + 1 if dash else 1
+    return max(1, total)
+
+
+def plan_deadline(hosts, ports, timing, version_detection=False):
+    """Seconds nmap should need: hosts x ports probes at the planned rate plus RTT waits per host group."""
+    probes = hosts * ports
+    seconds = 30 + 1.5 * probes / timing.rate
+    seconds += math.ceil(hosts / HOSTGROUP) * (timing.effective_retries() + 1) * timing.effective_rtt_timeout()
+    if version_detection:
+        seconds *= 3  # -sV probes every open port with service fingerprints
+    return min(max_deadline(), int(seconds))
+
+
+def max_deadline():
+    return getattr(settings, "NETWORK_SCAN_MAX_TIMEOUT", 4 * 3600)
+
+
+class TimingController:
+    """
+    Timing and deadline for one nmap run; fed by the parser while nmap runs
+    and written back to the network's profile when it ends.
+    """
+
+    def __init__(self, targets, ports, version_detection=False):
+        self.keys = list(dict.fromkeys(network_key(t) for t in targets)) or [""]
+        self.profiles = {key: _get_profile(key) for key in self.keys}
+        self._networks = []  # (network, key) for matching host RTTs to profiles
+        for key in self.keys:
+            try:
+                self._networks.append((ipaddress.ip_network(key, strict=False), key))
+            except ValueError:
+                pass  # hostname
+        with _profiles_lock:
+            self.timing = combine_timings([p.timing() for p in self.profiles.values()])
+        self.hosts = host_count(targets)
+        self.deadline = plan_deadline(self.hosts, ports, self.timing, version_detection)
+        # a single unresponsive host shouldn't hold up the rest of the run
+        self.host_timeout = max(120, 2 * plan_deadline(1, ports, self.timing, version_detection))
+        self.started = time.monotonic()
+        self.last_activity = self.started
+        self.host_timeouts = 0
+        self._rtts = []
+        self._lock = threading.Lock()
+
+    def args(self):
+        return self.timing.args() + ["--host-timeout", f"{self.host_timeout}s", "--stats-every", f"{STATS_INTERVAL}s"]
+
+    def observe_host(self, host):
+        """A finished <host> element: record its RTT and whether it hit --host-timeout."""
+        with self._lock:
+            self.last_activity = time.monotonic()
+            if host.get("timedout") == "true":
+                self.host_timeouts += 1
+            times = host.find("times")
+            if times is not None and times.get("srtt"):
+                try:
+                    # nmap reports microseconds
+                    sample = (int(times.get("srtt")) / 1e6, int(times.get("rttvar") or 0) / 1e6)
+                except ValueError:
+                    return
+                self._rtts.append((self._key_of(host), sample))
+
+    def _key_of(self, host):
+        """Profile key of a <host> element's network; None for hosts of hostname targets."""
+        if len(self.keys) == 1:
+            return self.keys[0]
+        for addr in host.iter("address"):
+            try:
+                ip = ipaddress.ip_address(addr.get("addr"))
+            except ValueError:
+                continue
+            for net, key in self._networks:
+                if ip.version == net.version and ip in net:
+                    return key
+        return None
+
+    def observe_progress(self, attrs):
+        """A <taskprogress> report: extend the deadline if nmap says it needs longer."""
+        with self._lock:
+            self.last_activity = time.monotonic()
+            try:
+                percent = float(attrs.get("percent") or 0)
+                etc = int(attrs.get("etc") or 0)
+            except ValueError:
+                return
+            if percent <= 0 or not etc:
+                return
+            # etc is an epoch timestamp; give it 50% slack
+            needed = time.monotonic() - self.started + max(0, etc - time.time()) * 1.5
+            if needed > self.deadline:
+                self.deadline = min(max_deadline(), int(needed))
+
+    def expired(self):
+        """'timed out' / 'stalled' once nmap should be killed, else None."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self.started > self.deadline:
+                return f"timed out after {self.deadline}s"
+            if now - self.last_activity > STALL_TIMEOUT:
+                return f"stalled (no progress for {STALL_TIMEOUT}s)"
+            return None
+
+    def finish(self, ok):
+        """Feed the run's outcome back into the profile of every network it covered."""
+        network_keys = {key for _, key in self._networks}
+        hostname_profiles = [p for key, p in self.profiles.items() if key not in network_keys]
+        with _profiles_lock:
+            for key, (srtt, rttvar) in self._rtts:
+                for profile in [self.profiles[key]] if key is not None else hostname_profiles:
+                    profile.sample_rtt(srtt, rttvar)
+            for profile in self.profiles.values():
+                if ok and not self.host_timeouts:
+                    profile.succeeded()
+                else:
+                    profile.struggled()
@@ -1,10 +1,17 @@
 from django.urls import path
-from .views import scan_network, download_pdf_report, get_scan_history, past_network_scans
+from .views import (
+    scan_network, scan_status, scan_results, download_pdf_report, get_scan_history, past_network_scans,
+    network_hosts, network_ports,
+)
 
 urlpatterns = [
     path("scan/", scan_network, name="scan_network"),
+    path("status/<int:scan_id>/", scan_status, name="network_scan_status"),
+    path("results/<int:scan_id>/", scan_results, name="network_scan_results"),
     path("download-pdf/<int:scan_id>/", download_pdf_report, name="download_pdf_report"),  # require scan_id
     path("history/", get_scan_history, name="get_scan_history"),
     path("past/", past_network_scans, name="past_network_scans"),
+    path("hosts/", network_hosts, name="network_hosts"),
+    path("ports/", network_ports, name="network_ports"),
 ]
 
@@ -2,93 +2,90 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 from django.http import FileResponse
-from datetime import datetime
-import subprocess, xmltodict, io
+import io
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from .models import NetworkScan
+from django.core.paginator import Paginator
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import NetworkScan, NetworkScanHost, NetworkScanPort
 from .serializers import NetworkScanSerializer
+from .connect_scan import choose_engine
+from .history import recent_history, record_scan
+from .jobs import recover_orphaned_scans, submit_scan, queue_stats
+from .results import scan_rows
 
 # ---- Network Scan ----
 @csrf_exempt
 @api_view(["POST"])
 def scan_network(request):
+    """
+    Queue an nmap scan and return its id right away.
+    Poll status/<scan_id>/ and fetch results/<scan_id>/ once it is finished.
+    """
     ip = request.data.get("ip") or "127.0.0.1"
     ports = request.data.get("ports") or "1-1024"
+    # "diff": compare with the last finished scan of this ip, re-probing its open ports first
+    mode = (request.data.get("mode") or "full").lower()
+    if mode not in ("full", "diff"):
+        return Response({"error": "mode must be 'full' or 'diff'"}, status=400)
 
-    def norm(val, is_bool=False):
-        if is_bool: return bool(val)
-        if val is None: return "-"
-        s = str(val).strip()
-        return "-" if s == "" or s.lower() in ("n/a", "unknown") else s
+    # nmap -sV plus matching against the local CVE index (fills vulnerable / cve)
+    version_detection = str(request.data.get("service_versions", "")).lower() in ("1", "true", "yes")
+    # ping / ARP / TCP-ACK sweep first and port-scan only the live hosts (sparse networks)
+    discovery = str(request.data.get("discovery", "")).lower() in ("1", "true", "yes")
 
-    # Calculate timeout
-    port_count = 1
-    if "-" in str(ports):
-        try:
-            start, end = map(int, ports.split("-"))
-            port_count = max(1, end - start + 1)
-        except: pass
-    timeout_val = 60 + int(port_count / 500) * 30
+    # "connect": in-process asyncio scanner for small port lists; "auto" picks it when it fits,
+    # SYN / version scans always go to nmap
+    requested_engine = (request.data.get("engine") or "auto").lower()
+    if requested_engine not in ("auto", "nmap", "connect"):
+        return Response({"error": "engine must be 'auto', 'nmap' or 'connect'"}, status=400)
+    engine = choose_engine(ip, ports, requested_engine, version_detection)
+
+    new_scan = NetworkScan.objects.create(
+        ip=ip, ports=ports, mode=mode, version_detection=version_detection, engine=engine,
+        discovery=discovery, status="pending",
+        progress=[{"stage": "queued", "status": "pending"}],
+    )
+    # history entry first: a fast job may finish and update its summary before the response goes out
+    record_scan(request, new_scan)
+    submit_scan(new_scan.id)
+
+    return Response({"scan_id": new_scan.id, "status": "pending", "mode": mode, "engine": engine}, status=202)
+
+
+@api_view(["GET"])
+def scan_status(request, scan_id):
+    recover_orphaned_scans()  # so a scan lost in a restart reports an error instead of "running" forever
+    try:
+        scan = NetworkScan.objects.only("id", "status", "mode", "engine", "progress", "error", "created_at", "started_at", "finished_at").get(id=scan_id)
+    except NetworkScan.DoesNotExist:
+        return Response({"error": "not found"}, status=404)
+    return Response({
+        "scan_id": scan.id,
+        "status": scan.status,
+        "mode": scan.mode,
+        "engine": scan.engine,
+        "progress": scan.progress,
+        "error": scan.error,
+        "created_at": scan.created_at,
+        "started_at": scan.started_at,
+        "finished_at": scan.finished_at,
+        "queue": queue_stats(),
+    })
 
-    nmap_args = ["nmap", "-T4", "--min-rate", "500", "-p", ports, "-oX", "-", ip]
 
+@api_view(["GET"])
+def scan_results(request, scan_id):
     try:
-        result = subprocess.run(nmap_args, capture_output=True, text=True, timeout=timeout_val)
-        if result.returncode != 0 or not result.stdout.strip():
-            return Response({"error": f"Nmap failed: {result.stderr}"}, status=500)
-
-        xml_output = xmltodict.parse(result.stdout)
-        hosts = xml_output.get("nmaprun", {}).get("host")
-        if isinstance(hosts, dict): hosts = [hosts]
-        scan_results = []
-
-        if hosts:
-            for host in hosts:
-                host_addr = norm(host.get("address", {}).get("@addr"))
-                ports_node = host.get("ports", {}).get("port", [])
-                if isinstance(ports_node, dict): ports_node = [ports_node]
-                if not ports_node:
-                    scan_results.append({
-                        "host": host_addr, "port": "-", "status": "-", "service": "-", "vulnerable": False, "cve": "-"
-                    })
-                    continue
-                for port in ports_node:
-                    scan_results.append({
-                        "host": host_addr,
-                        "port": norm(port.get("@portid")),
-                        "status": norm(port.get("state", {}).get("@state")),
-                        "service": norm(port.get("service", {}).get("@name")),
-                        "vulnerable": False,
-                        "cve": "-"
-                    })
-
-        # Save history in session for immediate frontend display
-        history = request.session.get("scan_history", [])
-        new_entry = {
-            "ip": ip, "ports": ports,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "results": scan_results
-        }
-        history.append(new_entry)
-        request.session["scan_history"] = history[-20:]
-        request.session["scan_results"] = scan_results
-
-        # Save in DB
-        new_scan = NetworkScan.objects.create(ip=ip, ports=ports, results=scan_results, status="finished")
-
-        return Response({
-    "results": scan_results,
-    "history": history[-20:],
-    "scan_id": new_scan.id  # <-- Add this line
-})
-
-
-
-    except subprocess.TimeoutExpired:
-        return Response({"error": f"Nmap timed out after {timeout_val}s"}, status=500)
-    except Exception as e:
-        return Response({"error": str(e)}, status=500)
+        scan = NetworkScan.objects.get(id=scan_id)
+    except NetworkScan.DoesNotExist:
+        return Response({"error": "not found"}, status=404)
+    # while running this is the hosts nmap has finished so far
+    return Response({
+        "scan_id": scan.id, "status": scan.status, "error": scan.error,
+        "mode": scan.mode, "diff": scan.diff, "results": scan_rows(scan),
+    })
 
 
 
@@ -108,7 +105,7 @@ def download_pdf_report(request, scan_id):
     """
     try:
         scan = NetworkScan.objects.get(id=scan_id)
-        rows = scan.results  # assuming results is JSONField with list of dicts
+        rows = scan_rows(scan)
     except NetworkScan.DoesNotExist:
         rows = []
 
@@ -183,16 +180,142 @@ def download_pdf_report(request, scan_id):
     buffer.seek(0)
     return FileResponse(buffer, as_attachment=True, filename=f"network_scan_report_{scan_id}.pdf")
 
-# ---- Session History ----
+# ---- History ----
 @api_view(["GET"])
 def get_scan_history(request):
-    history = request.session.get("scan_history", []) or []
-    return Response({"history": history})
+    return Response({"history": recent_history(request)})
+
+
+# ---- Paging helper for list endpoints ----
+def _paginate(request, qs, default_size=50, max_size=500):
+    """
+    ?page=N&page_size=M -> (rows of that page, paging metadata). Raises ValueError on bad params.
+    """
+    page = int(request.GET.get("page", 1))
+    page_size = min(int(request.GET.get("page_size", default_size)), max_size)
+    if page < 1 or page_size < 1:
+        raise ValueError("page and page_size must be positive")
+    paginator = Paginator(qs, page_size)
+    rows = list(paginator.page(page).object_list) if page <= paginator.num_pages else []
+    return rows, {
+        "count": paginator.count,
+        "page": page,
+        "page_size": page_size,
+        "num_pages": paginator.num_pages,
+        "has_next": page < paginator.num_pages,
+    }
 
 
 # ---- Past scans from DB ----
 @api_view(["GET"])
 def past_network_scans(request):
-    scans = NetworkScan.objects.filter(status="finished").order_by('-created_at')
-    serializer = NetworkScanSerializer(scans, many=True)
-    return Response(serializer.data)
+    """
+    GET /api/networkscanner/past/?page=1&page_size=50
+    Scan metadata plus host / open-port counts; rows are fetched per scan via results/<id>/.
+    """
+    host_count = (
+        NetworkScanHost.objects.filter(scan=OuterRef("pk"))
+        .values("scan").annotate(c=Count("id")).values("c")
+    )
+    open_ports = (
+        NetworkScanPort.objects.filter(scan=OuterRef("pk"), state="open")
+        .values("scan").annotate(c=Count("id")).values("c")
+    )
+    scans = (
+        NetworkScan.objects.filter(status="finished")
+        .defer("results", "progress")
+        .annotate(
+            host_count=Coalesce(Subquery(host_count, output_field=IntegerField()), 0),
+            open_port_count=Coalesce(Subquery(open_ports, output_field=IntegerField()), 0),
+        )
+        .order_by("-created_at", "-id")
+    )
+    try:
+        rows, meta = _paginate(request, scans)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    return Response(dict(meta, results=NetworkScanSerializer(rows, many=True).data))
+
+
+# ---- Indexed host / port lookups across scans ----
+@api_view(["GET"])
+def network_ports(request):
+    """
+    GET /api/networkscanner/ports/?port=3389&state=open&service=&address=&scan_id=&vulnerable=&page=1
+    e.g. "which hosts have 3389 open" -> ?port=3389&state=open
+    """
+    qs = NetworkScanPort.objects.all()
+    try:
+        if request.GET.get("port"):
+            qs = qs.filter(port=int(request.GET["port"]))
+        if request.GET.get("scan_id"):
+            qs = qs.filter(scan_id=int(request.GET["scan_id"]))
+    except ValueError:
+        return Response({"error": "port and scan_id must be integers"}, status=400)
+    if request.GET.get("state"):
+        qs = qs.filter(state=request.GET["state"])
+    if request.GET.get("service"):
+        qs = qs.filter(service=request.GET["service"])
+    if request.GET.get("address"):
+        qs = qs.filter(host__address=request.GET["address"])
+    if request.GET.get("vulnerable"):
+        qs = qs.filter(vulnerable=request.GET["vulnerable"].lower() in ("1", "true", "yes"))
+
+    qs = qs.order_by("-scan_id", "host_id", "port").values(
+        "scan_id", "host__address", "port", "protocol", "state", "service",
+        "product", "version", "vulnerable", "cve", "max_cvss", "scan__created_at",
+    )
+    try:
+        rows, meta = _paginate(request, qs, default_size=100, max_size=1000)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    results = [{
+        "scan_id": r["scan_id"],
+        "host": r["host__address"],
+        "port": r["port"],
+        "protocol": r["protocol"],
+        "status": r["state"],
+        "service": r["service"],
+        "product": r["product"],
+        "version": r["version"],
+        "vulnerable": r["vulnerable"],
+        "cve": r["cve"],
+        "max_cvss": r["max_cvss"],
+        "scanned_at": r["scan__created_at"],
+    } for r in rows]
+    return Response(dict(meta, results=results))
+
+
+@api_view(["GET"])
+def network_hosts(request):
+    """
+    GET /api/networkscanner/hosts/?address=10.0.0.5&scan_id=&page=1
+    Hosts seen by scans, newest first, with their open ports.
+    """
+    qs = NetworkScanHost.objects.all()
+    if request.GET.get("address"):
+        qs = qs.filter(address=request.GET["address"])
+    if request.GET.get("scan_id"):
+        try:
+            qs = qs.filter(scan_id=int(request.GET["scan_id"]))
+        except ValueError:
+            return Response({"error": "scan_id must be an integer"}, status=400)
+    qs = qs.order_by("-scan_id", "id").values("id", "scan_id", "address", "created_at")
+    try:
+        rows, meta = _paginate(request, qs, default_size=100, max_size=1000)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    open_ports = {}
+    for host_id, port in (
+        NetworkScanPort.objects.filter(host_id__in=[r["id"] for r in rows], state="open")
+        .order_by("port").values_list("host_id", "port")
+    ):
+        open_ports.setdefault(host_id, []).append(port)
+    results = [{
+        "scan_id": r["scan_id"],
+        "host": r["address"],
+        "open_ports": open_ports.get(r["id"], []),
+        "scanned_at": r["created_at"],
+    } for r in rows]
+    return Response(dict(meta, results=results))
@@ -0,0 +1,226 @@
+# backend/scan_utils/http_client.py
+"""
+Shared HTTP client for the scanners' probes (domainscanner, AIA fetches in
+sslscanner, ...).
+
+Module-level requests.get() builds a new connection pool per call, so every
+probe paid a fresh TCP + TLS handshake. Here all probes share one pool
+manager:
+
+- bounded pools per host (HTTP_POOL_MAXSIZE connections, callers block
+  when a host's pool is exhausted instead of opening more)
+- keep-alive: connections go back to the pool after each response
+- HTTP/2 through httpx + h2 (both in requirements.txt; HTTP_CLIENT_HTTP2
+  turns it off); otherwise requests/urllib3 over HTTP/1.1
+
+requests.Session is not thread-safe (cookies, adapters dict), so each
+thread gets its own Session; they all mount the same HTTPAdapter, whose
+urllib3 PoolManager is. httpx.Client is thread-safe and shared directly.
+httpx only has a global connection limit, so in HTTP/2 mode a semaphore
+per origin holds each host to HTTP_POOL_MAXSIZE requests in flight.
+
+pool_stats() reports utilisation for sizing bulk audits.
+"""
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    import httpx
+    HAS_HTTP2 = True
+except Exception:
+    HAS_HTTP2 = False
+
+POOL_CONNECTIONS = 100  # hosts with a pool
+POOL_MAXSIZE = 10  # connections per host
+DEFAULT_TIMEOUT = 5
+USER_AGENT = "VaptManagement-Scanner/1.0"
+
+_lock = threading.Lock()
+_adapter = None
+_httpx_client = None
+_local = threading.local()
+_origin_slots = {}  # origin -> [semaphore, callers holding or waiting]; HTTP/2 mode only
+_httpx_counts = {"requests": 0, "connections_opened": 0}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def use_http2():
+    return HAS_HTTP2 and _setting("HTTP_CLIENT_HTTP2", True)
+
+
+def _get_adapter():
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(
+                pool_connections=_setting("HTTP_POOL_CONNECTIONS", POOL_CONNECTIONS),
+                pool_maxsize=_setting("HTTP_POOL_MAXSIZE", POOL_MAXSIZE),
+                pool_block=True,
+                max_retries=0,
+            )
+        return _adapter
+
+
+def _get_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = _get_adapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        _local.session = session
+    return session
+
+
+def _get_httpx_client():
+    global _httpx_client
+    with _lock:
+        if _httpx_client is None:
+            maxsize = _setting("HTTP_POOL_MAXSIZE", POOL_MAXSIZE)
+            hosts = _setting("HTTP_POOL_CONNECTIONS", POOL_CONNECTIONS)
+            _httpx_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=maxsize * hosts, max_keepalive_connections=maxsize * hosts),
+                headers={"User-Agent": USER_AGENT},
+            )
+        return _httpx_client
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _acquire_origin(origin):
+    with _lock:
+        slot = _origin_slots.get(origin)
+        if slot is None:
+            slot = _origin_slots[origin] = [threading.BoundedSemaphore(_setting("HTTP_POOL_MAXSIZE", POOL_MAXSIZE)), 0]
+        slot[1] += 1
+    slot[0].acquire()
+    return slot
+
+
+def _release_origin(origin, slot):
+    slot[0].release()
+    with _lock:
+        slot[1] -= 1
+        if slot[1] == 0:
+            del _origin_slots[origin]
+
+
+def _trace(event, info):
+    # httpcore trace hook: one "connect_tcp.complete" per new connection
+    if event == "connection.connect_tcp.complete":
+        with _lock:
+            _httpx_counts["connections_opened"] += 1
+
+
+def _httpx_request(method, url, timeout, follow_redirects, **kwargs):
+    origin = _origin(url)
+    slot = _acquire_origin(origin)
+    try:
+        with _lock:
+            _httpx_counts["requests"] += 1
+        extensions = dict(kwargs.pop("extensions", None) or {}, trace=_trace)
+        return _get_httpx_client().request(method, url, timeout=timeout, follow_redirects=follow_redirects,
+                                           extensions=extensions, **kwargs)
+    finally:
+        _release_origin(origin, slot)
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, follow_redirects=True, **kwargs):
+    """
+    Pooled request. Returns a requests.Response or httpx.Response; both have
+    status_code, headers (case-insensitive), content, text and url.
+    Raises the backend's exceptions (requests.RequestException / httpx.HTTPError).
+    """
+    if use_http2():
+        return _httpx_request(method, url, timeout, follow_redirects, **kwargs)
+    return _get_session().request(method, url, timeout=timeout, allow_redirects=follow_redirects, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def head(url, **kwargs):
+    kwargs.setdefault("follow_redirects", False)
+    return request("HEAD", url, **kwargs)
+
+
+def http_version(resp):
+    """'HTTP/2', 'HTTP/1.1', ... for a response from request()."""
+    version = getattr(resp, "http_version", None)  # httpx
+    if version:
+        return version
+    raw = getattr(resp, "raw", None)
+    return {10: "HTTP/1.0", 11: "HTTP/1.1", 20: "HTTP/2"}.get(getattr(raw, "version", None), "HTTP/1.1")
+
+
+def header_items(resp):
+    """
+    Response headers as (name, value) pairs with repeated headers (Set-Cookie)
+    kept separate; resp.headers of requests joins them with commas.
+    """
+    raw_headers = getattr(getattr(resp, "raw", None), "headers", None)
+    if hasattr(raw_headers, "iteritems"):  # requests: urllib3 HTTPHeaderDict
+        return list(raw_headers.iteritems())
+    if hasattr(resp.headers, "multi_items"):  # httpx
+        return list(resp.headers.multi_items())
+    return list(resp.headers.items())
+
+
+def _urllib3_stats():
+    pools = _adapter.poolmanager.pools if _adapter is not None else None
+    hosts, in_use, idle, opened, requests_sent = 0, 0, 0, 0, 0
+    if pools is not None:
+        with pools.lock:
+            entries = list(pools._container.values())
+        for pool in entries:
+            hosts += 1
+            queued = list(pool.pool.queue) if pool.pool is not None else []
+            idle += sum(1 for conn in queued if conn is not None)
+            in_use += pool.pool.maxsize - len(queued) if pool.pool is not None else 0
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+    return {"hosts": hosts, "in_use": in_use, "idle": idle, "connections_opened": opened, "requests": requests_sent}
+
+
+def _httpx_stats():
+    hosts, in_use, idle = set(), 0, 0
+    if _httpx_client is not None:
+        pool = getattr(_httpx_client._transport, "_pool", None)
+        for conn in list(getattr(pool, "connections", None) or []):
+            origin = getattr(conn, "_origin", None)
+            hosts.add(str(origin))
+            if conn.is_idle():
+                idle += 1
+            else:
+                in_use += 1
+    with _lock:
+        counts = dict(_httpx_counts)
+    return dict(counts, hosts=len(hosts), in_use=in_use, idle=idle)
+
+
+def pool_stats():
+    """Pool utilisation: hosts with a pool, connections in use / idle, connection reuse ratio."""
+    maxsize = _setting("HTTP_POOL_MAXSIZE", POOL_MAXSIZE)
+    data = {
+        "backend": "httpx (HTTP/2)" if use_http2() else "requests (HTTP/1.1)",
+        "max_hosts": _setting("HTTP_POOL_CONNECTIONS", POOL_CONNECTIONS),
+        "max_per_host": maxsize,
+    }
+    data.update(_httpx_stats() if use_http2() else _urllib3_stats())
+    if data["requests"]:
+        data["reuse_ratio"] = round(1 - data["connections_opened"] / data["requests"], 3)
+    return data
@@ -0,0 +1,21 @@
+# backend/scan_utils/rate_limit.py
+"""
+Pacing for asyncio probes (connect scans, DNS brute-forcing, ...).
+"""
+import asyncio
+
+
+class RateLimiter:
+    """Spaces attempts at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_at = 0.0
+
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        at = max(now, self.next_at)
+        self.next_at = at + self.interval
+        if at > now:
+            await asyncio.sleep(at - now)
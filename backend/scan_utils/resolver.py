@@ -0,0 +1,295 @@
+# backend/scan_utils/resolver.py
+"""
+Shared async DNS resolver for the scanners (sslscanner, domainscanner, ...).
+
+- A and AAAA are queried in parallel
+- answers are cached for their record TTL. This needs dnspython (listed in
+  requirements.txt); without it lookups go through getaddrinfo on the loop's
+  default thread pool, which gives no TTL, so DEFAULT_TTL is used then
+- dnspython doesn't read the hosts file, so /etc/hosts names (localhost,
+  lab machines) are answered from it first
+- NXDOMAIN / empty answers are cached for NEGATIVE_TTL
+- concurrent lookups of the same name share one in-flight query
+
+Sync code (Django views, thread pools) calls resolve(); async code awaits
+resolve_async(). Both use the same process-wide cache.
+"""
+import asyncio
+import ipaddress
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+    HAS_DNSPYTHON = True
+except Exception:
+    HAS_DNSPYTHON = False
+
+DEFAULT_TTL = 300
+NEGATIVE_TTL = 60
+MIN_TTL = 5
+MAX_TTL = 3600
+QUERY_TIMEOUT = 5.0
+CACHE_SIZE = 50000
+HOSTS_FILE = "/etc/hosts"
+
+# getaddrinfo errors meaning "name exists, but not for this address family"
+_NO_RECORDS_OF_FAMILY = {
+    getattr(socket, name) for name in ("EAI_NODATA", "EAI_ADDRFAMILY") if hasattr(socket, name)
+}
+
+
+class ResolveError(Exception):
+    """Name could not be resolved (NXDOMAIN, no A/AAAA records, or lookup failure)."""
+
+
+class NotFound(ResolveError):
+    """The name definitively has no addresses (NXDOMAIN / no A or AAAA records), as opposed to a failed lookup."""
+
+
+def load_hosts_file(path=HOSTS_FILE):
+    """{name: [addresses]} from a hosts file, IPv4 first; {} if it can't be read."""
+    entries = {}
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as fh:
+            for line in fh:
+                fields = line.split("#", 1)[0].split()
+                if len(fields) < 2:
+                    continue
+                try:
+                    address = str(ipaddress.ip_address(fields[0].split("%", 1)[0]))
+                except ValueError:
+                    continue
+                for name in fields[1:]:
+                    addrs = entries.setdefault(name.rstrip(".").lower(), [])
+                    if address not in addrs:
+                        addrs.append(address)
+    except OSError:
+        return {}
+    for addrs in entries.values():
+        addrs.sort(key=lambda a: ":" in a)
+    return entries
+
+
+class DNSCache:
+    """
+    Thread-safe LRU of host -> (expires_at, addresses | None). None = negative entry.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, host):
+        """Returns (found, addresses). addresses is None for a cached negative answer."""
+        with self._lock:
+            entry = self._data.get(host)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[host]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(host)
+            if entry[1] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry[1]
+
+    def put(self, host, addresses, ttl):
+        with self._lock:
+            self._data[host] = (time.monotonic() + ttl, addresses)
+            self._data.move_to_end(host)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+class AsyncResolver:
+    def __init__(self, cache=None, timeout=QUERY_TIMEOUT):
+        self.cache = cache or DNSCache()
+        self.timeout = timeout
+        self._inflight = {}  # (loop id, host) -> asyncio.Task
+        self._dns = None
+        self._hosts = {}
+        self._hosts_mtime = None
+        if HAS_DNSPYTHON:
+            try:
+                self._dns = dns.asyncresolver.Resolver()
+            except Exception:
+                # no usable resolv.conf: fall back to getaddrinfo
+                self._dns = None
+
+    async def resolve(self, host):
+        """
+        All addresses for host, IPv4 first. Raises NotFound for names without
+        addresses, ResolveError for failed lookups.
+        """
+        host = (host or "").strip().rstrip(".").lower()
+        if not host:
+            raise ResolveError("empty hostname")
+        try:
+            return [str(ipaddress.ip_address(host.strip("[]")))]
+        except ValueError:
+            pass
+
+        if self._dns is not None:
+            listed = self._hosts_entry(host)
+            if listed:
+                return list(listed)
+
+        found, addresses = self.cache.get(host)
+        if found:
+            if addresses is None:
+                raise NotFound(f"{host}: no such host (cached)")
+            return list(addresses)
+
+        loop = asyncio.get_running_loop()
+        key = (id(loop), host)
+        task = self._inflight.get(key)
+        if task is None:
+            task = loop.create_task(self._lookup(host))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        # shield: a cancelled caller must not cancel the lookup other callers wait on
+        addresses = await asyncio.shield(task)
+        if addresses is None:
+            raise NotFound(f"{host}: no such host")
+        return list(addresses)
+
+    def _hosts_entry(self, host):
+        """Addresses for host from the hosts file, re-read when it changes."""
+        try:
+            mtime = os.stat(HOSTS_FILE).st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self._hosts_mtime:
+            self._hosts = load_hosts_file() if mtime is not None else {}
+            self._hosts_mtime = mtime
+        return self._hosts.get(host)
+
+    async def _lookup(self, host):
+        """Query A + AAAA together and cache the outcome. Returns addresses or None (negative)."""
+        results = await asyncio.gather(
+            self._query(host, socket.AF_INET), self._query(host, socket.AF_INET6),
+            return_exceptions=True,
+        )
+        addresses, ttls, nxdomain, errors = [], [], False, []
+        for res in results:
+            if isinstance(res, Exception):
+                errors.append(res)
+                continue
+            addrs, ttl, nx = res
+            if addrs:
+                addresses.extend(addrs)
+                ttls.append(ttl)
+            nxdomain = nxdomain or nx
+
+        if addresses:
+            self.cache.put(host, addresses, max(MIN_TTL, min(MAX_TTL, min(ttls))))
+            return addresses
+        if errors and not nxdomain:
+            # transient failure: don't cache, let the next caller retry
+            raise errors[0]
+        self.cache.put(host, None, NEGATIVE_TTL)
+        return None
+
+    async def _query(self, host, family):
+        """-> (addresses, ttl, nxdomain). Transient failures raise ResolveError (not cached)."""
+        if self._dns is not None:
+            rdtype = "A" if family == socket.AF_INET else "AAAA"
+            try:
+                answer = await self._dns.resolve(host, rdtype, lifetime=self.timeout)
+                return [r.address for r in answer], answer.rrset.ttl, False
+            except dns.resolver.NXDOMAIN:
+                return [], NEGATIVE_TTL, True
+            except dns.resolver.NoAnswer:
+                return [], NEGATIVE_TTL, False
+            except dns.exception.DNSException as e:
+                raise ResolveError(f"{host}: {e}")
+
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(host, None, family=family, type=socket.SOCK_STREAM), self.timeout
+            )
+        except socket.gaierror as e:
+            if e.errno == socket.EAI_NONAME:
+                return [], NEGATIVE_TTL, True
+            if e.errno in _NO_RECORDS_OF_FAMILY:
+                return [], NEGATIVE_TTL, False
+            raise ResolveError(f"{host}: {e}")
+        except asyncio.TimeoutError:
+            raise ResolveError(f"{host}: lookup timed out")
+
+        seen = []
+        for info in infos:
+            addr = info[4][0]
+            if addr not in seen:
+                seen.append(addr)
+        return seen, DEFAULT_TTL, False
+
+
+RESOLVER = AsyncResolver()
+
+# Background loop so sync callers share one resolver/cache/in-flight table
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="dns-resolver", daemon=True).start()
+        return _loop
+
+
+async def resolve_async(host):
+    return await RESOLVER.resolve(host)
+
+
+def resolve(host, timeout=None):
+    """Blocking wrapper for sync code. Returns [addresses], IPv4 first. Raises ResolveError."""
+    fut = asyncio.run_coroutine_threadsafe(RESOLVER.resolve(host), _background_loop())
+    try:
+        return fut.result(timeout or QUERY_TIMEOUT * 2)
+    except TimeoutError:
+        fut.cancel()
+        raise ResolveError(f"{host}: lookup timed out")
+
+
+def resolve_many(hosts, timeout=None):
+    """
+    Resolve many names concurrently. Returns {host: [addresses] | ResolveError}.
+    """
+    async def _all():
+        results = await asyncio.gather(*(RESOLVER.resolve(h) for h in hosts), return_exceptions=True)
+        return dict(zip(hosts, results))
+
+    fut = asyncio.run_coroutine_threadsafe(_all(), _background_loop())
+    return fut.result(timeout)
+
+
+def resolver_stats():
+    return dict(RESOLVER.cache.stats(), backend="dnspython" if RESOLVER._dns is not None else "getaddrinfo")
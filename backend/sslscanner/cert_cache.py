@@ -0,0 +1,71 @@
+# backend/sslscanner/cert_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def cert_fingerprint(der_bytes) -> str:
+    """SHA-256 hex digest of the DER bytes (same value browsers show)."""
+    return hashlib.sha256(der_bytes).hexdigest()
+
+
+class CertParseCache:
+    """
+    LRU + TTL cache of parsed certificate fields keyed by DER fingerprint.
+    Shared CDN / wildcard certs show up on hundreds of hosts in a sweep,
+    so we only pay for x509 loading + extension walk once per cert.
+    Thread-safe: bulk sweeps call it from many pool workers.
+    """
+
+    def __init__(self, maxsize=4096, ttl=6 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # fingerprint -> (stored_at, parsed)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, fingerprint):
+        with self._lock:
+            entry = self._data.get(fingerprint)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._data[fingerprint]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(fingerprint)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, fingerprint, parsed):
+        with self._lock:
+            self._data[fingerprint] = (time.monotonic(), parsed)
+            self._data.move_to_end(fingerprint)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# process-wide instance used by views._parse_cert_with_cryptography
+CERT_CACHE = CertParseCache()
@@ -0,0 +1,265 @@
+# backend/sslscanner/chain.py
+"""
+Certificate chain validation for the SSL scanner.
+
+The probes handshake with CERT_NONE (we want to inspect broken servers too),
+so the served chain is validated offline here against a trust store that is
+parsed once per process. Intermediates fetched via AIA and parsed certs are
+cached, and so is the verdict per chain, so bulk sweeps over shared CDN
+chains only pay for verification once.
+
+Trust bundle: $SSL_TRUST_BUNDLE, else certifi, else the system OpenSSL bundle.
+"""
+import datetime
+import hashlib
+import os
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from scan_utils import http_client
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives.asymmetric import dsa, rsa
+    from cryptography.x509.oid import ExtensionOID, AuthorityInformationAccessOID
+    from cryptography.x509.verification import PolicyBuilder, Store, VerificationError
+    HAS_VERIFIER = True
+except Exception:
+    HAS_VERIFIER = False
+
+try:
+    import certifi
+except Exception:
+    certifi = None
+
+AIA_TIMEOUT = 3.0
+VERDICT_TTL = 3600
+WEAK_SIGNATURE_HASHES = ("md5", "sha1")
+MIN_KEY_BITS = 2048
+
+_store_lock = threading.Lock()
+_store = None
+_store_info = {}
+
+_aia_lock = threading.Lock()
+_aia_cache = OrderedDict()  # caIssuers URL -> [x509.Certificate]
+
+_verdict_lock = threading.Lock()
+_verdicts = OrderedDict()  # chain fingerprints -> (stored_at, result)
+
+
+def _trust_bundle_path():
+    path = os.getenv("SSL_TRUST_BUNDLE")
+    if path:
+        return path
+    if certifi is not None:
+        return certifi.where()
+    paths = ssl.get_default_verify_paths()
+    return paths.cafile or paths.openssl_cafile
+
+
+def trust_store():
+    """
+    Parsed trust anchors, loaded once per process. Returns (Store, info dict).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = _trust_bundle_path()
+            with open(path, "rb") as fh:
+                roots = x509.load_pem_x509_certificates(fh.read())
+            _store = Store(roots)
+            _store_info.update({"path": path, "roots": len(roots), "loaded_at": time.time()})
+        return _store, dict(_store_info)
+
+
+@lru_cache(maxsize=4096)
+def _load_der(der):
+    return x509.load_der_x509_certificate(der)
+
+
+def peer_chain_der(ss):
+    """
+    DER certs the server sent (leaf first) from an open SSLSocket, or None when
+    the runtime can't expose them (Python < 3.10) or the session was resumed.
+    """
+    getter = getattr(ss, "get_unverified_chain", None)
+    if getter is None:
+        getter = getattr(getattr(ss, "_sslobj", None), "get_unverified_chain", None)
+    if getter is None:
+        return None
+    try:
+        chain = getter()
+    except Exception:
+        return None
+    if not chain:
+        return None
+    # 3.13+ returns DER bytes; the 3.10-3.12 private API returns _ssl.Certificate
+    return [c if isinstance(c, bytes) else c.public_bytes(ssl._ssl.ENCODING_DER) for c in chain]
+
+
+def _verify_subject(leaf):
+    """
+    Name the chain is verified for. We take it from the leaf itself so this step
+    only judges the chain; host mismatch is reported by _generate_vulns.
+    """
+    try:
+        names = leaf.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        dns_names = names.get_values_for_type(x509.DNSName)
+        if dns_names:
+            return x509.DNSName(dns_names[0].replace("*.", "wildcard.", 1))
+        ips = names.get_values_for_type(x509.IPAddress)
+        if ips:
+            return x509.IPAddress(ips[0])
+    except x509.ExtensionNotFound:
+        pass
+    return None
+
+
+def _aia_issuers(cert):
+    """Issuer certs named in cert's AIA caIssuers URLs (cached per URL)."""
+    try:
+        aia = cert.extensions.get_extension_for_oid(ExtensionOID.AUTHORITY_INFORMATION_ACCESS).value
+    except x509.ExtensionNotFound:
+        return []
+
+    out = []
+    for desc in aia:
+        if desc.access_method != AuthorityInformationAccessOID.CA_ISSUERS:
+            continue
+        url = desc.access_location.value
+        with _aia_lock:
+            cached = _aia_cache.get(url)
+        if cached is None:
+            cached = []
+            try:
+                resp = http_client.get(url, timeout=AIA_TIMEOUT)
+                if resp.status_code == 200:
+                    body = resp.content
+                    if body.lstrip().startswith(b"-----BEGIN"):
+                        cached = x509.load_pem_x509_certificates(body)
+                    else:
+                        cached = [x509.load_der_x509_certificate(body)]
+            except Exception:
+                cached = []
+            with _aia_lock:
+                _aia_cache[url] = cached
+                while len(_aia_cache) > 1024:
+                    _aia_cache.popitem(last=False)
+        out.extend(cached)
+    return out
+
+
+def _key_bits(cert):
+    key = cert.public_key()
+    if isinstance(key, (rsa.RSAPublicKey, dsa.DSAPublicKey)):
+        return key.key_size
+    return None
+
+
+def _finding(vid, priority, desc, suggestion):
+    return {"id": vid, "priority": priority, "desc": desc, "suggestion": suggestion}
+
+
+def validate_chain(chain_der, leaf_der=None):
+    """
+    Validate the served chain (leaf first). When the handshake couldn't expose
+    the chain, leaf_der alone is checked and missing intermediates can't be judged.
+
+    Returns {"trusted", "chain_length", "served_chain", "path", "error", "findings": [...]}.
+    """
+    if not HAS_VERIFIER:
+        return {"trusted": None, "error": "cryptography verifier unavailable", "findings": []}
+
+    served = bool(chain_der)
+    chain_der = list(chain_der or ([leaf_der] if leaf_der else []))
+    if not chain_der:
+        return {"trusted": None, "error": "no certificate", "findings": []}
+
+    key = (served,) + tuple(hashlib.sha256(d).hexdigest() for d in chain_der)
+    with _verdict_lock:
+        hit = _verdicts.get(key)
+        if hit is not None and time.monotonic() - hit[0] < VERDICT_TTL:
+            return hit[1]
+
+    result = _validate(chain_der, served)
+    with _verdict_lock:
+        _verdicts[key] = (time.monotonic(), result)
+        while len(_verdicts) > 4096:
+            _verdicts.popitem(last=False)
+    return result
+
+
+def _validate(chain_der, served):
+    certs = [_load_der(d) for d in chain_der]
+    leaf, intermediates = certs[0], certs[1:]
+    store, _ = trust_store()
+    findings = []
+    result = {
+        "trusted": False,
+        "chain_length": len(certs),
+        "served_chain": served,
+        "path": [],
+        "error": None,
+        "findings": findings,
+    }
+
+    subject = _verify_subject(leaf)
+    if subject is None:
+        result["error"] = "leaf has no SAN to verify against"
+        findings.append(_finding("CHAIN-UNTRUSTED", "high", "Certificate chain could not be validated (no SAN)",
+                                 "Reissue the certificate with SAN entries"))
+        return result
+
+    verifier = (
+        PolicyBuilder().store(store)
+        .time(datetime.datetime.now(datetime.timezone.utc))
+        .build_server_verifier(subject)
+    )
+
+    path = None
+    try:
+        path = verifier.verify(leaf, intermediates)
+    except VerificationError as e:
+        result["error"] = str(e)
+        # maybe the server just forgot an intermediate: try completing via AIA
+        fetched = _aia_issuers(intermediates[-1] if intermediates else leaf)
+        if fetched:
+            try:
+                path = verifier.verify(leaf, intermediates + fetched)
+                if served:
+                    findings.append(_finding(
+                        "CHAIN-MISSING-INTERMEDIATE", "medium",
+                        "Server does not send the full certificate chain (intermediate fetched via AIA)",
+                        "Configure the server to send its intermediate certificate(s)",
+                    ))
+            except VerificationError:
+                path = None
+
+    if path is None:
+        findings.append(_finding("CHAIN-UNTRUSTED", "high",
+                                 f"Certificate chain does not validate against trusted roots ({result['error']})",
+                                 "Use a certificate issued by a publicly trusted CA and serve the full chain"))
+    else:
+        result["trusted"] = True
+        result["error"] = None
+        result["path"] = [c.subject.rfc4514_string() for c in path]
+
+    # Weak signatures / keys on everything except trust anchors (their self-signature doesn't matter)
+    checked = path[:-1] if path else certs
+    for cert in checked:
+        name = cert.subject.rfc4514_string()
+        algo = cert.signature_hash_algorithm
+        if algo is not None and algo.name in WEAK_SIGNATURE_HASHES:
+            findings.append(_finding("CHAIN-WEAK-SIGNATURE", "high",
+                                     f"{name} is signed with {algo.name.upper()}",
+                                     "Reissue with a SHA-256 (or stronger) signature"))
+        bits = _key_bits(cert)
+        if bits is not None and bits < MIN_KEY_BITS:
+            findings.append(_finding("CHAIN-WEAK-KEY", "high",
+                                     f"{name} uses a {bits}-bit key",
+                                     f"Use at least {MIN_KEY_BITS}-bit RSA or an ECDSA key"))
+    return result
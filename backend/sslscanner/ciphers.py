@@ -0,0 +1,241 @@
+# backend/sslscanner/ciphers.py
+"""
+Cipher-suite enumeration for the SSL scanner.
+
+Instead of one handshake per candidate suite, each handshake offers a whole
+set and lets the server pick; the chosen suite is removed and the rest is
+offered again until the server refuses. That costs (accepted + 1) handshakes
+per set, and a set the server doesn't like at all is pruned in one go.
+Candidates are split by key exchange (and halved when large) so the chains
+run in parallel, for every supported protocol version at once.
+
+Only suites the local OpenSSL build can offer are testable. TLS 1.3 suites
+can't be restricted through Python's ssl module, so for TLS 1.3 we report
+the negotiated suite only.
+"""
+import math
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+
+# PSK/SRP suites need pre-shared credentials, a scanner can never complete them
+_SKIP_KEA = ("psk", "srp")
+# halve candidate groups bigger than this so more chains run side by side
+_SPLIT_AT = 12
+# handshake chains run at once against one host
+MAX_PARALLEL = 32
+
+_VERSIONS = {}
+if hasattr(ssl, "TLSVersion"):
+    _VERSIONS = {
+        "TLSv1.3": ssl.TLSVersion.TLSv1_3,
+        "TLSv1.2": ssl.TLSVersion.TLSv1_2,
+        "TLSv1.1": ssl.TLSVersion.TLSv1_1,
+        "TLSv1.0": ssl.TLSVersion.TLSv1,
+    }
+
+# (marker in OpenSSL suite name, priority, reason), first match wins
+WEAK_CIPHER_RULES = [
+    ("NULL", "high", "no encryption (NULL cipher)"),
+    ("EXP", "high", "export-grade cipher"),
+    ("ADH", "high", "anonymous key exchange (no server authentication)"),
+    ("AECDH", "high", "anonymous key exchange (no server authentication)"),
+    ("RC4", "high", "RC4 stream cipher"),
+    ("MD5", "high", "MD5-based MAC"),
+    ("DES-CBC3", "medium", "3DES (64-bit block, Sweet32)"),
+    ("DES-CBC", "high", "single DES"),
+    ("IDEA", "medium", "IDEA (64-bit block)"),
+]
+
+
+@lru_cache(maxsize=None)
+def candidate_suites(version_label):
+    """
+    OpenSSL suite names the local library can offer for a protocol version,
+    grouped by key exchange: {kea: [names]}. Built once per process.
+    """
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.set_ciphers("ALL:COMPLEMENTOFALL:@SECLEVEL=0")
+
+    groups = {}
+    for c in ctx.get_ciphers():
+        proto = c.get("protocol")
+        kea = c.get("kea") or "kx-unknown"
+        if proto == "TLSv1.3" or any(x in kea for x in _SKIP_KEA):
+            continue
+        # TLS1.2-only suites (AEAD / SHA256+) can't be negotiated on 1.0/1.1
+        if version_label in ("TLSv1.0", "TLSv1.1") and proto == "TLSv1.2":
+            continue
+        if c.get("auth") == "auth-null":
+            kea = f"{kea}-anon"
+        groups.setdefault(kea, []).append(c["name"])
+    return groups
+
+
+def _split(names):
+    if len(names) <= _SPLIT_AT:
+        return [names]
+    mid = len(names) // 2
+    return _split(names[:mid]) + _split(names[mid:])
+
+
+def _handshake(host, port, server_hostname, ver_obj, names, timeout):
+    """
+    One handshake offering exactly `names` at a pinned version.
+    Returns the suite name the server picked, or None if it refused them all.
+    """
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    ctx.minimum_version = ctx.maximum_version = ver_obj
+    if names is not None:
+        try:
+            ctx.set_ciphers(":".join(names) + ":@SECLEVEL=0")
+        except ssl.SSLError:
+            return None
+
+    s = None
+    ss = None
+    try:
+        s = socket.create_connection((host, port), timeout=timeout)
+        ss = ctx.wrap_socket(s, server_hostname=server_hostname)
+        return ss.cipher()[0]
+    except (OSError, ssl.SSLError):
+        return None
+    finally:
+        try:
+            if ss:
+                ss.close()
+            elif s:
+                s.close()
+        except Exception:
+            pass
+
+
+def _chain(host, port, server_hostname, ver_obj, names, timeout, stop_at):
+    """
+    Elimination loop over one candidate set. Returns (accepted_in_server_order, handshakes, complete).
+    """
+    remaining = list(names)
+    accepted = []
+    handshakes = 0
+    while remaining:
+        left = stop_at - time.monotonic()
+        if left <= 0:
+            return accepted, handshakes, False
+        picked = _handshake(host, port, server_hostname, ver_obj, remaining, min(timeout, left))
+        handshakes += 1
+        if picked is None or picked not in remaining:
+            break
+        accepted.append(picked)
+        remaining.remove(picked)
+    return accepted, handshakes, True
+
+
+def enumerate_ciphers(host, port, versions, server_hostname=None, timeout=3.0, deadline=10.0, max_parallel=None):
+    """
+    Enumerate accepted suites for each supported protocol version (labels like 'TLSv1.2').
+    `host` may be a pre-resolved address; SNI uses server_hostname (defaults to host).
+    max_parallel caps simultaneous handshakes against the host (bulk sweeps);
+    the deadline is stretched to match, as in the version probe.
+
+    Returns:
+      {"TLSv1.2": {"accepted": [...], "handshakes": n, "complete": bool, "server_preference": bool|None}, ...}
+    """
+    server_hostname = server_hostname or host
+    stop_at = time.monotonic() + deadline
+
+    jobs = []
+    for label in versions:
+        ver_obj = _VERSIONS.get(label)
+        if ver_obj is None:
+            continue
+        if label == "TLSv1.3":
+            jobs.append((label, None))
+            continue
+        for names in candidate_suites(label).values():
+            for part in _split(names):
+                jobs.append((label, part))
+
+    out = {label: {"accepted": [], "handshakes": 0, "complete": True, "server_preference": None}
+           for label, _ in jobs}
+    if not jobs:
+        return out
+
+    workers = min(MAX_PARALLEL, len(jobs))
+    if max_parallel and max_parallel < workers:
+        stop_at += deadline * (math.ceil(workers / max_parallel) - 1)
+        workers = max_parallel
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {}
+    for label, names in jobs:
+        ver_obj = _VERSIONS[label]
+        if names is None:
+            fut = pool.submit(_handshake, host, port, server_hostname, ver_obj, None, timeout)
+        else:
+            fut = pool.submit(_chain, host, port, server_hostname, ver_obj, names, timeout, stop_at)
+        futures[fut] = (label, names)
+
+    done, not_done = wait(futures, timeout=max(0.0, stop_at - time.monotonic()) + timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for fut, (label, names) in futures.items():
+        entry = out[label]
+        if fut not in done:
+            entry["complete"] = False
+            continue
+        try:
+            res = fut.result()
+        except Exception:
+            entry["complete"] = False
+            continue
+        if names is None:
+            entry["handshakes"] += 1
+            if res:
+                entry["accepted"].append(res)
+            continue
+        accepted, handshakes, complete = res
+        entry["accepted"].extend(accepted)
+        entry["handshakes"] += handshakes
+        entry["complete"] = entry["complete"] and complete
+
+    # Does the server enforce its own order? Offer its top two reversed and see which it takes.
+    for label, entry in out.items():
+        if label == "TLSv1.3" or len(entry["accepted"]) < 2 or time.monotonic() >= stop_at:
+            continue
+        first, second = entry["accepted"][0], entry["accepted"][1]
+        picked = _handshake(host, port, server_hostname, _VERSIONS[label], [second, first], timeout)
+        entry["handshakes"] += 1
+        if picked is not None:
+            entry["server_preference"] = picked == first
+
+    return out
+
+
+def cipher_findings(enumeration):
+    """
+    Vulnerability dicts (same shape as views._generate_vulns) for weak accepted suites.
+    """
+    vulns = []
+    for label, entry in enumeration.items():
+        for name in entry.get("accepted", []):
+            for marker, priority, reason in WEAK_CIPHER_RULES:
+                # match whole dash-separated tokens; export suites are EXP-*/EXP1024-*
+                if f"-{marker}-" in f"-{name}-" or (marker == "EXP" and name.startswith("EXP")):
+                    vulns.append({
+                        "id": "CIPHER-WEAK",
+                        "priority": priority,
+                        "desc": f"Weak cipher enabled on {label}: {name} ({reason})",
+                        "suggestion": "Disable weak ciphers",
+                    })
+                    break
+        if entry.get("accepted") and entry.get("server_preference") is False:
+            vulns.append({
+                "id": "CIPHER-NO-SERVER-ORDER",
+                "priority": "low",
+                "desc": f"Server follows client cipher order on {label}",
+                "suggestion": "Enable server cipher preference",
+            })
+    return vulns
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sslscanner', '0002_sslscan_result_json_alter_sslscan_pdf_report'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sslscan',
+            index=models.Index(fields=['domain', 'status', '-scan_date'], name='sslscanner__domain_19f32a_idx'),
+        ),
+    ]
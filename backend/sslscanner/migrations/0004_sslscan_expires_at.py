@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:59
+
+import datetime
+import ssl
+
+from django.db import migrations, models
+
+
+def _parse_expiry(value):
+    """ISO strings (our result_json) or OpenSSL 'Jan  1 00:00:00 2026 GMT' strings."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            dt = datetime.datetime.utcfromtimestamp(ssl.cert_time_to_seconds(value))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt
+
+
+def backfill_expires_at(apps, schema_editor):
+    SSLScan = apps.get_model("sslscanner", "SSLScan")
+    batch = []
+    for scan in SSLScan.objects.filter(expires_at__isnull=True).only("id", "expiry_date", "result_json").iterator():
+        result = scan.result_json if isinstance(scan.result_json, dict) else {}
+        scan.expires_at = _parse_expiry(result.get("valid_to") or scan.expiry_date)
+        if scan.expires_at is not None:
+            batch.append(scan)
+        if len(batch) >= 1000:
+            SSLScan.objects.bulk_update(batch, ["expires_at"])
+            batch = []
+    if batch:
+        SSLScan.objects.bulk_update(batch, ["expires_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sslscanner', '0003_sslscan_domain_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sslscan',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sslscanner', '0004_sslscan_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sslscan',
+            name='pdf_sha256',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sslscanner', '0005_sslscan_pdf_sha256'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sslscan',
+            index=models.Index(fields=['domain', '-id'], name='sslscanner__domain_9fde5d_idx'),
+        ),
+    ]
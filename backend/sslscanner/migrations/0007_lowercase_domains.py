@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_domains(apps, schema_editor):
+    """Single scans kept the domain's case, so Example.com had its own history and baselines."""
+    SSLScan = apps.get_model("sslscanner", "SSLScan")
+    SSLScan.objects.exclude(domain=Lower("domain")).update(domain=Lower("domain"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sslscanner', '0006_sslscan_domain_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_domains, migrations.RunPython.noop),
+    ]
@@ -5,10 +5,20 @@ class SSLScan(models.Model):
     scan_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=50)
     expiry_date = models.CharField(max_length=100, null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)  # typed copy of cert notAfter
     issuer = models.CharField(max_length=255, null=True, blank=True)
     tls_version = models.CharField(max_length=100, null=True, blank=True)
-    pdf_report = models.TextField(null=True, blank=True)
+    pdf_report = models.TextField(null=True, blank=True)  # legacy base64 PDFs (pre report_store)
+    pdf_sha256 = models.CharField(max_length=64, null=True, blank=True)  # report_store digest
     result_json = models.JSONField(null=True, blank=True)  # <-- built-in JSONField
 
+    class Meta:
+        indexes = [
+            # latest scan per domain (incremental baselines)
+            models.Index(fields=["domain", "status", "-scan_date"]),
+            # expiring/: "no newer scan of this domain" anti-join on (domain, id > ...)
+            models.Index(fields=["domain", "-id"]),
+        ]
+
     def __str__(self):
         return f"{self.domain} ({self.scan_date.strftime('%Y-%m-%d %H:%M:%S')})"
@@ -0,0 +1,34 @@
+# backend/sslscanner/report_store.py
+"""
+Content-addressed storage for SSL PDF reports.
+
+Reports live on disk under MEDIA_ROOT/ssl_reports/<aa>/<sha256>.pdf and the
+SSLScan row only keeps the digest. Identical reports are stored once.
+"""
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+REPORT_DIR = "ssl_reports"
+
+
+def report_path(digest: str) -> str:
+    return f"{REPORT_DIR}/{digest[:2]}/{digest}.pdf"
+
+
+def save_report(pdf_bytes: bytes) -> str:
+    """Store the PDF (no-op if already there) and return its SHA-256 hex digest."""
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    path = report_path(digest)
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(pdf_bytes))
+    return digest
+
+
+def open_report(digest: str):
+    """Open a stored report for streaming. Raises FileNotFoundError if it's gone."""
+    path = report_path(digest)
+    if not default_storage.exists(path):
+        raise FileNotFoundError(path)
+    return default_storage.open(path, "rb")
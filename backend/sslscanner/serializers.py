@@ -1,7 +1,27 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import SSLScan
 
 class SSLScanSerializer(serializers.ModelSerializer):
+    """
+    History listing: metadata only. Report bytes are fetched lazily via report_url.
+    """
+    report_url = serializers.SerializerMethodField()
+
     class Meta:
         model = SSLScan
-        fields = '__all__'  # returns result_json + pdf_report + other fields
+        fields = [
+            "id", "domain", "scan_date", "status", "expiry_date", "expires_at",
+            "issuer", "tls_version", "report_url",
+        ]
+
+    def get_report_url(self, obj):
+        # listings annotate has_legacy_pdf so the deferred base64 column is never loaded
+        has_legacy = getattr(obj, "has_legacy_pdf", None)
+        if has_legacy is None:
+            has_legacy = bool(obj.pdf_report)
+        if not (obj.pdf_sha256 or has_legacy):
+            return None
+        url = reverse("ssl_scan_report", args=[obj.id])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
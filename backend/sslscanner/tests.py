@@ -1,3 +1,29 @@
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import SSLScan
+from .views import _normalize_domain
+
+
+class DomainNormalizationTests(TestCase):
+    def test_domains_are_lower_cased(self):
+        self.assertEqual(_normalize_domain("https://Example.COM/path"), "example.com")
+        self.assertEqual(_normalize_domain(" Example.com:8443 "), "example.com:8443")
+
+    def test_incremental_scan_finds_baseline_for_mixed_case_input(self):
+        baseline = SSLScan.objects.create(
+            domain="example.com", status="success", tls_version="TLSv1.3",
+            result_json={"domain": "example.com", "valid_to": "2030-01-01T00:00:00", "issuer": "Test CA"},
+        )
+        check = {"unchanged": True, "fingerprint_sha256": "ab" * 32, "tls_version": "TLSv1.3"}
+        with mock.patch("sslscanner.views._check_unchanged", return_value=check) as check_unchanged, \
+                mock.patch("sslscanner.views._run_ssl_probe") as probe:
+            response = self.client.post("/api/sslscanner/scan/", {"domain": "Example.COM", "incremental": "true"},
+                                        content_type="application/json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()["unchanged"])
+        self.assertEqual(response.json()["baseline_id"], baseline.id)
+        check_unchanged.assert_called_once()
+        probe.assert_not_called()
+        self.assertEqual(SSLScan.objects.get(id=response.json()["scan_id"]).domain, "example.com")
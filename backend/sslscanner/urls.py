@@ -3,5 +3,9 @@ from . import views
 
 urlpatterns = [
     path("scan/", views.scan_ssl, name="scan_ssl"),  # your main scanner
+    path("scan/bulk/", views.scan_ssl_bulk, name="scan_ssl_bulk"),
     path("history/", views.get_scan_history, name="ssl_scan_history"),
+    path("report/<int:scan_id>/", views.download_scan_report, name="ssl_scan_report"),
+    path("expiring/", views.expiring_certificates, name="ssl_expiring_certificates"),
+    path("cert-cache/", views.cert_cache_stats, name="ssl_cert_cache_stats"),
 ]
@@ -5,10 +5,17 @@ import datetime
 import traceback
 import io
 import base64
+import json
+import math
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import StreamingHttpResponse
 
 # Try to import cryptography
 try:
@@ -19,21 +26,151 @@ try:
 except Exception:
     HAS_CRYPTO = False
 
+from scan_utils.resolver import resolve, ResolveError
+
+from .cert_cache import CERT_CACHE, cert_fingerprint
+from .ciphers import enumerate_ciphers, cipher_findings
+from .report_store import save_report, open_report
+from .chain import peer_chain_der, validate_chain, trust_store
+
 # PDF libraries
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 
+# Total wall-clock budget for one host: cert fetch and version probes share it
+SSL_PROBE_DEADLINE = 6.0
+
+# Shared client contexts + TLS sessions for resumption (see _run_ssl_probe_reuse)
+SSL_SESSION_CACHE_SIZE = 10000
+_CTX_LOCK = threading.Lock()
+_CLIENT_CONTEXTS = {}
+_SESSION_LOCK = threading.Lock()
+_TLS_SESSIONS = OrderedDict()  # (host, port, version label) -> ssl.SSLSession
+
+# Bulk sweep limits (scan_ssl_bulk)
+SSL_BULK_MAX_DOMAINS = 20000
+SSL_BULK_DEFAULT_CONCURRENCY = 32
+SSL_BULK_MAX_CONCURRENCY = 256
+
 
 def _normalize_domain(raw: str) -> str:
+    """'https://Example.com/x' -> 'example.com' (lower-cased: history and baselines are keyed on it)."""
     if not isinstance(raw, str):
         return ""
     domain = raw.strip()
     if "://" in domain:
         domain = domain.split("://", 1)[1]
     domain = domain.split("/", 1)[0]
-    return domain
+    return domain.lower()
+
+
+def _split_host_port(domain: str, default_port: int = 443):
+    """
+    'example.com:8443' -> ('example.com', 8443). Bare IPv6 literals are left alone.
+    """
+    host, sep, port = domain.rpartition(":")
+    if sep and host and ":" not in host and port.isdigit():
+        return host, int(port)
+    return domain, default_port
+
+
+def _resolve_addresses(domain: str, port: int = 443):
+    """
+    Host -> [(family, sockaddr), ...], IPv4 first, via the shared cached resolver.
+    Raises ConnectionError when resolution fails.
+    """
+    try:
+        addresses = resolve(domain)
+    except ResolveError as e:
+        raise ConnectionError(f"DNS lookup failed: {e}")
+
+    out = []
+    for ip in addresses:
+        if ":" in ip:
+            out.append((socket.AF_INET6, (ip, port, 0, 0)))
+        else:
+            out.append((socket.AF_INET, (ip, port)))
+    return out
+
+
+def _connect_first(addrs, timeout):
+    """
+    Plain TCP connect to the first address that answers. Returns the socket.
+    """
+    last_exc = None
+    for af, sa in addrs:
+        sock = socket.socket(af, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(sa)
+            return sock
+        except OSError as e:
+            last_exc = e
+            sock.close()
+    raise ConnectionError(f"Could not connect to target ({last_exc})")
+
+
+def _client_context(ver_obj=None):
+    """
+    Process-wide no-verify client context, one per pinned TLS version
+    (None = library default range). Sharing contexts avoids rebuilding them
+    per handshake and is required for session resumption.
+    """
+    with _CTX_LOCK:
+        ctx = _CLIENT_CONTEXTS.get(ver_obj)
+        if ctx is None:
+            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+            if ver_obj is not None and hasattr(ctx, "minimum_version"):
+                ctx.minimum_version = ctx.maximum_version = ver_obj
+                if ver_obj < ssl.TLSVersion.TLSv1_2:
+                    # OpenSSL 3 refuses TLS1.0/1.1 at the default security level,
+                    # which would hide servers that still accept them
+                    try:
+                        ctx.set_ciphers("DEFAULT:@SECLEVEL=0")
+                    except ssl.SSLError:
+                        pass
+            _CLIENT_CONTEXTS[ver_obj] = ctx
+        return ctx
+
+
+def _tls_handshake(family, sockaddr, domain, ctx, timeout, session_key=None):
+    """
+    Connect to an already-resolved address and handshake, offering the cached
+    TLS session for session_key if we have one. Returns the open SSLSocket
+    (caller closes). The new session is stored back for the next probe.
+    """
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    session = _get_tls_session(session_key) if session_key else None
+    try:
+        sock.connect(sockaddr)
+        ss = ctx.wrap_socket(sock, server_hostname=domain, session=session)
+    except Exception:
+        sock.close()
+        raise
+    if session_key and ss.session is not None:
+        _store_tls_session(session_key, ss.session)
+    return ss
+
+
+def _get_tls_session(key):
+    with _SESSION_LOCK:
+        session = _TLS_SESSIONS.get(key)
+        if session is not None:
+            _TLS_SESSIONS.move_to_end(key)
+        return session
+
+
+def _store_tls_session(key, session):
+    with _SESSION_LOCK:
+        _TLS_SESSIONS[key] = session
+        _TLS_SESSIONS.move_to_end(key)
+        while len(_TLS_SESSIONS) > SSL_SESSION_CACHE_SIZE:
+            _TLS_SESSIONS.popitem(last=False)
 
 
 def _connect_and_get_der(domain: str, port: int = 443, timeout: float = 6.0):
@@ -41,43 +178,32 @@ def _connect_and_get_der(domain: str, port: int = 443, timeout: float = 6.0):
     Try to connect (IPv4/IPv6) and return (der_bytes, tls_version).
     Raises ConnectionError on failure with last exception message.
     """
-    last_exc = None
-    try:
-        infos = socket.getaddrinfo(domain, port, proto=socket.IPPROTO_TCP)
-    except Exception as e:
-        raise ConnectionError(f"DNS/getaddrinfo failed: {e}")
+    der, tls_version, _ = _connect_and_get_chain(domain, port, timeout)
+    return der, tls_version
+
 
-    for af, socktype, proto, canonname, sa in infos:
-        sock = None
+def _connect_and_get_chain(domain: str, port: int = 443, timeout: float = 6.0):
+    """
+    Like _connect_and_get_der but also returns the served chain:
+    (leaf_der, tls_version, chain_der_list_or_None).
+    """
+    last_exc = None
+    for af, sa in _resolve_addresses(domain, port):
         ss = None
         try:
-            sock = socket.socket(af, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            ss = ctx.wrap_socket(sock, server_hostname=domain)
-            ss.connect(sa)
+            ss = _tls_handshake(af, sa, domain, _client_context(), timeout)
             der = ss.getpeercert(binary_form=True)
             tls_version = ss.version()
-            try:
-                ss.close()
-            except Exception:
-                pass
-            return der, tls_version
+            return der, tls_version, peer_chain_der(ss)
         except Exception as e:
             last_exc = e
+            continue
+        finally:
             try:
                 if ss:
                     ss.close()
             except Exception:
                 pass
-            try:
-                if sock:
-                    sock.close()
-            except Exception:
-                pass
-            continue
 
     raise ConnectionError(f"Could not connect to target ({last_exc})")
 
@@ -87,7 +213,13 @@ def _parse_cert_with_cryptography(der_bytes):
     Returns parsed info including original datetime objects under keys:
       - not_before_dt, not_after_dt
     and ISO strings under not_before, not_after.
+    Results are cached by DER fingerprint (see cert_cache.CERT_CACHE).
     """
+    fingerprint = cert_fingerprint(der_bytes)
+    cached = CERT_CACHE.get(fingerprint)
+    if cached is not None:
+        return dict(cached, san=list(cached["san"]))
+
     cert = x509.load_der_x509_certificate(der_bytes, default_backend())
 
     # Subject CN (if exists)
@@ -121,7 +253,7 @@ def _parse_cert_with_cryptography(der_bytes):
     except Exception:
         san = []
 
-    return {
+    parsed = {
         "subject_cn": subject_cn,
         "issuer": issuer_name,
         "not_before_dt": not_before_dt,
@@ -129,8 +261,13 @@ def _parse_cert_with_cryptography(der_bytes):
         "not_before": not_before_dt.isoformat(),
         "not_after": not_after_dt.isoformat(),
         "san": san,
-        "raw_cert": cert,
+        "self_signed": cert.issuer == cert.subject,
+        "fingerprint_sha256": fingerprint,
+        # the cert object itself isn't cached (memory); consumers use self_signed
+        "raw_cert": None,
     }
+    CERT_CACHE.put(fingerprint, parsed)
+    return dict(parsed, san=list(san))
 
 
 def _parse_cert_fallback(pycert):
@@ -168,49 +305,222 @@ def _parse_cert_fallback(pycert):
     }
 
 
-def _check_supported_tls_versions(domain: str, port: int = 443, timeout: float = 3.0):
+def _tls_version_candidates():
     """
-    Try to connect forcing specific TLS versions (best-effort). Returns list like ['TLSv1.3','TLSv1.2'].
+    Versions we try to force, newest first, as (ssl.TLSVersion | None, label) pairs.
     """
-    supported = []
-    candidates = []
     if hasattr(ssl, "TLSVersion"):
         tv = ssl.TLSVersion
-        candidates = [
+        return [
             (tv.TLSv1_3, "TLSv1.3"),
             (tv.TLSv1_2, "TLSv1.2"),
             (tv.TLSv1_1, "TLSv1.1"),
             (tv.TLSv1, "TLSv1.0"),
         ]
-    else:
-        # older Python fallback: we'll still attempt a normal connect (best-effort)
-        candidates = [(None, "TLSv1.2"), (None, "TLSv1.1"), (None, "TLSv1.0")]
+    # older Python fallback: we'll still attempt a normal connect (best-effort)
+    return [(None, "TLSv1.2"), (None, "TLSv1.1"), (None, "TLSv1.0")]
 
-    for ver_obj, label in candidates:
+
+def _probe_tls_version(domain: str, port: int, ver_obj, timeout: float) -> bool:
+    """
+    One handshake with min/max pinned to ver_obj. True if the server accepted it.
+    """
+    s = None
+    ss = None
+    try:
+        s = _connect_first(_resolve_addresses(domain, port), timeout)
+        ss = _client_context(ver_obj).wrap_socket(s, server_hostname=domain)
+        # if handshake succeeds, consider label supported
+        return True
+    except Exception:
+        return False
+    finally:
         try:
-            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            if ver_obj is not None and hasattr(ctx, "minimum_version"):
-                ctx.minimum_version = ctx.maximum_version = ver_obj
-            s = socket.create_connection((domain, port), timeout=timeout)
-            ss = ctx.wrap_socket(s, server_hostname=domain)
-            # if handshake succeeds, consider label supported
-            ss.close()
-            supported.append(label)
+            if ss:
+                ss.close()
+            elif s:
+                s.close()
         except Exception:
-            continue
+            pass
 
-    # keep order and uniqueness
-    seen = set()
-    out = []
-    for v in supported:
-        if v not in seen:
-            seen.add(v)
-            out.append(v)
+
+def _probe_tls_version_at(family, sockaddr, domain, port, ver_obj, label, timeout):
+    """
+    Forced-version handshake against a pre-resolved address, resuming the
+    session from our last probe of this (host, port, version) when possible.
+    Returns (accepted, resumed).
+    """
+    ss = None
+    try:
+        ss = _tls_handshake(family, sockaddr, domain, _client_context(ver_obj), timeout, (domain, port, label))
+        return True, ss.session_reused
+    except Exception:
+        return False, False
+    finally:
+        if ss:
+            try:
+                ss.close()
+            except Exception:
+                pass
+
+
+def _fan_out(calls, deadline: float, max_workers=None):
+    """
+    Run {key: (fn, args)} concurrently and wait at most `deadline` seconds in total.
+    Returns {key: result_or_exception} for the calls that finished in time;
+    stragglers are abandoned (their sockets time out on their own).
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, min(len(calls), max_workers or len(calls))))
+    futures = {pool.submit(fn, *args): key for key, (fn, args) in calls.items()}
+    done, _ = wait(futures, timeout=deadline)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    out = {}
+    for fut in done:
+        try:
+            out[futures[fut]] = fut.result()
+        except Exception as e:
+            out[futures[fut]] = e
     return out
 
 
+def _check_supported_tls_versions(domain: str, port: int = 443, timeout: float = 3.0):
+    """
+    Try to connect forcing specific TLS versions (best-effort). Returns list like ['TLSv1.3','TLSv1.2'].
+    All candidates are probed in parallel, so this costs one timeout at most.
+    """
+    candidates = _tls_version_candidates()
+    calls = {label: (_probe_tls_version, (domain, port, ver_obj, timeout)) for ver_obj, label in candidates}
+    out = _fan_out(calls, timeout)
+
+    # keep candidate order and uniqueness
+    supported = []
+    for _, label in candidates:
+        if out.get(label) is True and label not in supported:
+            supported.append(label)
+    return supported
+
+
+def _run_ssl_probe(domain: str, port: int = 443, deadline: float = SSL_PROBE_DEADLINE, max_parallel=None):
+    """
+    Certificate fetch + every forced-version handshake, all in flight at once
+    under one shared deadline (~1 RTT when the host is healthy, one timeout
+    when it is not).
+
+    max_parallel caps simultaneous handshakes against this host (bulk sweeps);
+    the overall budget then grows by one deadline per extra round.
+
+    Returns dict: der, chain_der, tls_version, supported_tls_versions, error.
+    """
+    candidates = _tls_version_candidates()
+    calls = {"cert": (_connect_and_get_chain, (domain, port, deadline))}
+    for ver_obj, label in candidates:
+        calls[label] = (_probe_tls_version, (domain, port, ver_obj, deadline))
+
+    budget = deadline
+    if max_parallel:
+        budget = deadline * math.ceil(len(calls) / max_parallel)
+    out = _fan_out(calls, budget, max_workers=max_parallel)
+
+    probe = {"der": None, "chain_der": None, "tls_version": None, "supported_tls_versions": [], "error": None}
+    cert = out.get("cert")
+    if isinstance(cert, tuple):
+        probe["der"], probe["tls_version"], probe["chain_der"] = cert
+    elif isinstance(cert, Exception):
+        probe["error"] = str(cert)
+    else:
+        probe["error"] = f"Timed out after {deadline:g}s"
+
+    probe["supported_tls_versions"] = [label for _, label in candidates if out.get(label) is True]
+    return probe
+
+
+def _run_ssl_probe_reuse(domain: str, port: int = 443, deadline: float = SSL_PROBE_DEADLINE, max_parallel=None):
+    """
+    Handshake-frugal variant of _run_ssl_probe for large estates:
+      - DNS is resolved once and the first address that answers is reused for every probe
+      - the default handshake (cert fetch) runs first; the version it negotiated
+        counts as supported, so that forced probe is skipped
+      - every handshake offers the TLS session cached from our previous probe of
+        the same host/version, so re-scans mostly do abbreviated handshakes
+        (TLS1.3 tickets arrive after the handshake and are only cached if the
+        server sent them in time)
+    Same return shape as _run_ssl_probe plus address, handshakes and resumed counters.
+    """
+    started = time.monotonic()
+    probe = {
+        "der": None, "chain_der": None, "tls_version": None, "supported_tls_versions": [], "error": None,
+        "address": None, "handshakes": 0, "resumed": 0,
+    }
+
+    try:
+        addrs = _resolve_addresses(domain, port)
+    except ConnectionError as e:
+        probe["error"] = str(e)
+        return probe
+
+    # 1) cert fetch, walking the resolved addresses until one answers
+    target = None
+    last_exc = None
+    for family, sockaddr in addrs:
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            break
+        ss = None
+        probe["handshakes"] += 1
+        try:
+            ss = _tls_handshake(family, sockaddr, domain, _client_context(), remaining, (domain, port, "default"))
+            probe["der"] = ss.getpeercert(binary_form=True)
+            probe["chain_der"] = peer_chain_der(ss)  # None when the session was resumed
+            probe["tls_version"] = ss.version()
+            probe["resumed"] += int(ss.session_reused)
+            target = (family, sockaddr)
+            break
+        except Exception as e:
+            last_exc = e
+        finally:
+            if ss:
+                try:
+                    ss.close()
+                except Exception:
+                    pass
+
+    if target is None:
+        probe["error"] = f"Could not connect to target ({last_exc or f'timed out after {deadline:g}s'})"
+        return probe
+    probe["address"] = target[1][0]
+
+    # 2) remaining forced-version probes against the same address, in parallel
+    candidates = _tls_version_candidates()
+    calls = {}
+    remaining = max(0.5, deadline - (time.monotonic() - started))
+    for ver_obj, label in candidates:
+        if label != probe["tls_version"]:
+            calls[label] = (_probe_tls_version_at, (target[0], target[1], domain, port, ver_obj, label, remaining))
+
+    budget = remaining
+    if max_parallel and calls:
+        budget = remaining * math.ceil(len(calls) / max_parallel)
+    out = _fan_out(calls, budget, max_workers=max_parallel) if calls else {}
+
+    probe["handshakes"] += len(calls)
+    for _, label in candidates:
+        res = out.get(label)
+        if label == probe["tls_version"]:
+            probe["supported_tls_versions"].append(label)
+        elif isinstance(res, tuple) and res[0]:
+            probe["supported_tls_versions"].append(label)
+            probe["resumed"] += int(res[1])
+    return probe
+
+
+# probe_mode -> engine ("parallel": fastest wall clock, "reuse": fewest full handshakes)
+SSL_PROBE_MODES = {
+    "parallel": _run_ssl_probe,
+    "reuse": _run_ssl_probe_reuse,
+}
+
+
 def _generate_vulns(parsed_cert, supported_tls_versions, domain):
     """
     Robust vulnerability derivation:
@@ -259,12 +569,14 @@ def _generate_vulns(parsed_cert, supported_tls_versions, domain):
         # sometimes CN-only certs are older and not ideal
         vulns.append({"id": "CERT-NO-SAN", "priority": "low", "desc": "Certificate uses CN but has no SAN entries", "suggestion": "Reissue with SAN"})
 
-    # self-signed detection (if cryptography raw_cert present)
+    # self-signed detection (cached flag, or cryptography raw_cert if present)
     raw = parsed_cert.get("raw_cert")
     try:
-        if raw is not None:
-            if raw.issuer == raw.subject:
-                vulns.append({"id": "CERT-SELF-SIGNED", "priority": "high", "desc": "Certificate appears to be self-signed", "suggestion": "Use CA-signed certificate"})
+        self_signed = parsed_cert.get("self_signed")
+        if self_signed is None and raw is not None:
+            self_signed = raw.issuer == raw.subject
+        if self_signed:
+            vulns.append({"id": "CERT-SELF-SIGNED", "priority": "high", "desc": "Certificate appears to be self-signed", "suggestion": "Use CA-signed certificate"})
     except Exception:
         pass
 
@@ -300,7 +612,8 @@ LOGO_RIGHT_PATH = "/Users/darshitayar/Desktop/VaptManagement /frontend/src/asset
 def _generate_pdf(domain, parsed, tls_version, supported_versions, vulns):
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
-        buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40
+        buffer, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=40, bottomMargin=40,
+        invariant=1,  # no timestamps/random IDs -> identical reports dedupe in report_store
     )
     styles = getSampleStyleSheet()
     normal = styles["Normal"]
@@ -392,55 +705,118 @@ def _generate_pdf(domain, parsed, tls_version, supported_versions, vulns):
     return buffer
 
 
+def _enumerate_for_probe(host, port, probe, max_parallel=None):
+    """
+    Cipher enumeration over the versions the probe found, against one resolved address.
+    max_parallel caps simultaneous handshakes against the host, as for the probe.
+    """
+    address = probe.get("address") or _resolve_addresses(host, port)[0][1][0]
+    return enumerate_ciphers(address, port, probe["supported_tls_versions"], server_hostname=host,
+                             max_parallel=max_parallel)
+
+
+def _build_ssl_result(domain, probe, ciphers=None):
+    """
+    Turn a _run_ssl_probe() result into (parsed_cert, readable_result).
+    ciphers: optional enumerate_ciphers() output, adds per-version suites + weak-cipher findings.
+    """
+    if HAS_CRYPTO:
+        parsed = _parse_cert_with_cryptography(probe["der"])
+    else:
+        # CERT_NONE handshakes don't expose the decoded dict, so this is mostly empty
+        parsed = _parse_cert_fallback({})
+
+    supported_versions = probe["supported_tls_versions"]
+    vulns = _generate_vulns(parsed, supported_versions, domain)
+    if ciphers is not None:
+        vulns.extend(cipher_findings(ciphers))
+
+    chain = None
+    if HAS_CRYPTO:
+        try:
+            chain = dict(validate_chain(probe.get("chain_der"), probe["der"]))
+        except Exception as e:
+            chain = {"trusted": None, "error": f"chain validation failed: {e}", "findings": []}
+        vulns.extend(chain.pop("findings", []))
+
+    readable_result = {
+        "domain": domain,
+        "issuer": parsed.get("issuer"),
+        "subject": parsed.get("subject_cn"),
+        "subject_alt_names": parsed.get("san"),
+        "fingerprint_sha256": parsed.get("fingerprint_sha256"),
+        "valid_from": parsed.get("not_before"),
+        "valid_to": parsed.get("not_after"),
+        "tls_version": probe["tls_version"],
+        "supported_tls_versions": supported_versions,
+        "vulnerabilities": vulns
+    }
+    if ciphers is not None:
+        readable_result["ciphers"] = ciphers
+    if chain is not None:
+        readable_result["chain"] = chain
+    return parsed, readable_result
+
+
 @api_view(["POST"])
 def scan_ssl(request):
-    import json
-    import base64
-    import traceback
     try:
         domain_raw = request.data.get("domain", "")
         if not domain_raw:
             return Response({"error": "Domain required"}, status=400)
 
-        domain = domain_raw.strip()
+        domain = _normalize_domain(domain_raw)
+        if not domain:
+            return Response({"error": "Invalid domain"}, status=400)
 
-        # --- Mock certificate parsing for example ---
-        parsed = {
-            "issuer": "Let's Encrypt",
-            "subject_cn": domain,
-            "not_before": "2025-01-01",
-            "not_after": "2026-01-01",
-            "san": [domain, f"www.{domain}"]
-        }
-        tls_version = "TLS 1.3"
-        supported_versions = ["TLS 1.0", "TLS 1.1", "TLS 1.2", "TLS 1.3"]
-        vulns = [
-            {"priority": "high", "desc": "Weak cipher enabled", "suggestion": "Disable weak ciphers"}
-        ]
+        probe_fn = SSL_PROBE_MODES.get(request.data.get("probe_mode") or "parallel")
+        if probe_fn is None:
+            return Response({"error": f"probe_mode must be one of {sorted(SSL_PROBE_MODES)}"}, status=400)
+
+        host, port = _split_host_port(domain)
+
+        # --- Incremental: one handshake, compare with the last full scan ---
+        if str(request.data.get("incremental", "false")).lower() in ("1", "true", "yes"):
+            baseline = _latest_baselines([domain]).get(domain)
+            if baseline is not None:
+                check = _check_unchanged(host, port, baseline)
+                if check["unchanged"]:
+                    heartbeat = save_unchanged_heartbeat(domain, baseline, check)
+                    return Response({
+                        "unchanged": True,
+                        "scan_id": heartbeat.id,
+                        "baseline_id": baseline.id,
+                        "result": baseline.result_json,
+                    })
+
+        # --- Probe: cert fetch + version sweep ---
+        probe = probe_fn(host, port)
+        if probe["der"] is None:
+            return Response({"error": f"SSL probe failed: {probe['error']}"}, status=502)
+
+        with_ciphers = str(request.data.get("ciphers", "false")).lower() in ("1", "true", "yes")
+        ciphers = _enumerate_for_probe(host, port, probe) if with_ciphers else None
+        parsed, readable_result = _build_ssl_result(host, probe, ciphers)
+        readable_result["domain"] = domain
 
         # --- Generate PDF ---
-        # --- Generate PDF ---
-        pdf_buffer = _generate_pdf(domain, parsed, tls_version, supported_versions, vulns)
-        pdf_base64 = base64.b64encode(pdf_buffer.getvalue()).decode("utf-8")
-
-        # --- Full readable result ---
-        readable_result = {
-            "domain": domain,
-            "issuer": parsed.get("issuer"),
-            "subject": parsed.get("subject_cn"),
-            "subject_alt_names": parsed.get("san"),
-            "valid_from": parsed.get("not_before"),
-            "valid_to": parsed.get("not_after"),
-            "tls_version": tls_version,
-            "supported_tls_versions": supported_versions,
-            "vulnerabilities": vulns
-        }
+        pdf_buffer = _generate_pdf(
+            domain, parsed, readable_result["tls_version"],
+            readable_result["supported_tls_versions"], readable_result["vulnerabilities"]
+        )
+        pdf_bytes = pdf_buffer.getvalue()
+        pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
 
-        # --- Save history ---
-        save_scan_history(domain, "success", readable_result, pdf_base64)
+        # --- Save history (PDF goes to the report store, row keeps the digest) ---
+        scan = save_scan_history(domain, "success", readable_result, pdf_bytes, parsed.get("not_after_dt"))
 
         # Return response with PDF for immediate download
-        return Response({"result": readable_result, "pdf_base64": pdf_base64})
+        return Response({
+            "result": readable_result,
+            "pdf_base64": pdf_base64,
+            "scan_id": scan.id,
+            "report_url": request.build_absolute_uri(reverse("ssl_scan_report", args=[scan.id])),
+        })
 
 
     except Exception as exc:
@@ -448,26 +824,321 @@ def scan_ssl(request):
         return Response({"error": f"Unexpected error: {exc}"}, status=500)
 
 
+from django.db.models import BooleanField, Case, Exists, Max, OuterRef, Value, When
+from django.http import FileResponse
+from django.urls import reverse
+from django.utils import timezone
+
 from .models import SSLScan
 from .serializers import SSLScanSerializer
 
+def _to_expires_at(value):
+    """
+    Cert notAfter (datetime or ISO string, naive = UTC) -> aware datetime for SSLScan.expires_at.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime.datetime):
+        return None
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, datetime.timezone.utc)
+    return value
+
+
 # 🧠 After your scan function successfully completes
-def save_scan_history(domain, status, result_dict, pdf_base64):
-    SSLScan.objects.create(
+def save_scan_history(domain, status, result_dict, pdf_bytes=None, not_after_dt=None):
+    return SSLScan.objects.create(
         domain=domain,
         status=status,
         expiry_date=result_dict.get("valid_to"),
+        expires_at=_to_expires_at(not_after_dt or result_dict.get("valid_to")),
         issuer=result_dict.get("issuer"),
         tls_version=result_dict.get("tls_version"),
-        pdf_report=pdf_base64,          # store PDF as base64
+        pdf_sha256=save_report(pdf_bytes) if pdf_bytes else None,  # bytes live in report_store
         result_json=result_dict          # store full result
     )
 
 
 
+def _latest_baselines(domains):
+    """
+    {domain: SSLScan} with the newest full ("success") scan per domain.
+    Two indexed queries per chunk, no matter how much history there is.
+    """
+    out = {}
+    for i in range(0, len(domains), 500):
+        chunk = domains[i:i + 500]
+        ids = (
+            SSLScan.objects.filter(domain__in=chunk, status="success")
+            .values("domain")
+            .annotate(last_id=Max("id"))
+            .values_list("last_id", flat=True)
+        )
+        for scan in SSLScan.objects.filter(id__in=list(ids)).only("id", "domain", "expires_at", "result_json"):
+            out[scan.domain] = scan
+    return out
+
+
+def _check_unchanged(host, port, baseline):
+    """
+    Fetch just the leaf cert (single handshake) and compare fingerprint + negotiated
+    version with the baseline scan. Connection errors count as "changed".
+    """
+    try:
+        der, tls_version = _connect_and_get_der(host, port, SSL_PROBE_DEADLINE)
+    except ConnectionError as e:
+        return {"unchanged": False, "error": str(e)}
+
+    fingerprint = cert_fingerprint(der)
+    previous = baseline.result_json or {}
+    return {
+        "unchanged": (
+            previous.get("fingerprint_sha256") == fingerprint
+            and previous.get("tls_version") == tls_version
+        ),
+        "fingerprint_sha256": fingerprint,
+        "tls_version": tls_version,
+    }
+
+
+def save_unchanged_heartbeat(domain, baseline, check):
+    """
+    Lightweight history row: no PDF, no vulns, just a pointer to the full scan it matched.
+    """
+    previous = baseline.result_json or {}
+    return SSLScan.objects.create(
+        domain=domain,
+        status="unchanged",
+        expiry_date=previous.get("valid_to"),
+        expires_at=baseline.expires_at or _to_expires_at(previous.get("valid_to")),
+        issuer=previous.get("issuer"),
+        tls_version=check["tls_version"],
+        pdf_report=None,
+        result_json={
+            "unchanged": True,
+            "baseline_id": baseline.id,
+            "fingerprint_sha256": check["fingerprint_sha256"],
+            "tls_version": check["tls_version"],
+            "valid_to": previous.get("valid_to"),
+        },
+    )
+
+
 # 🔍 API to get past scans
 @api_view(["GET"])
 def get_scan_history(request):
-    scans = SSLScan.objects.all().order_by("-scan_date")[:20]  # last 20 scans
-    serializer = SSLScanSerializer(scans, many=True)
+    scans = (
+        SSLScan.objects.defer("pdf_report", "result_json")
+        .annotate(has_legacy_pdf=Case(
+            When(pdf_report__isnull=False, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ))
+        .order_by("-scan_date")[:20]  # last 20 scans
+    )
+    serializer = SSLScanSerializer(scans, many=True, context={"request": request})
     return Response(serializer.data)
+
+
+# 📄 Lazy PDF download for a stored scan
+@api_view(["GET"])
+def download_scan_report(request, scan_id):
+    scan = SSLScan.objects.filter(id=scan_id).only("id", "domain", "pdf_sha256").first()
+    if scan is None:
+        return Response({"error": "Scan not found"}, status=404)
+
+    filename = f"ssl_report_{scan.domain}_{scan.id}.pdf"
+    if scan.pdf_sha256:
+        try:
+            return FileResponse(open_report(scan.pdf_sha256), as_attachment=True, filename=filename,
+                                content_type="application/pdf")
+        except FileNotFoundError:
+            return Response({"error": "Report file missing"}, status=404)
+
+    # rows written before report_store keep base64 in pdf_report
+    legacy = SSLScan.objects.filter(id=scan_id).values_list("pdf_report", flat=True).first()
+    if not legacy:
+        return Response({"error": "No report for this scan"}, status=404)
+    return FileResponse(io.BytesIO(base64.b64decode(legacy)), as_attachment=True, filename=filename,
+                        content_type="application/pdf")
+
+
+def _read_bulk_domains(request):
+    """
+    Domains for a bulk sweep, from either:
+      - JSON/form "domains": list, or newline/comma separated string
+      - uploaded "file": one domain per line, '#' starts a comment
+    Normalized, de-duplicated, input order kept.
+    """
+    raw = []
+    upload = request.FILES.get("file")
+    if upload is not None:
+        for line in upload.read().decode("utf-8", errors="ignore").splitlines():
+            raw.append(line.split("#", 1)[0])
+    else:
+        domains = request.data.get("domains") or []
+        if isinstance(domains, str):
+            domains = domains.replace(",", "\n").splitlines()
+        raw.extend(domains)
+
+    out = []
+    seen = set()
+    for item in raw:
+        domain = _normalize_domain(item)
+        if domain and domain not in seen:
+            seen.add(domain)
+            out.append(domain)
+    return out
+
+
+def _bulk_scan_one(domain, per_host, probe_fn=_run_ssl_probe, with_ciphers=False, baseline=None):
+    host, port = _split_host_port(domain)
+    if baseline is not None:
+        check = _check_unchanged(host, port, baseline)
+        if check["unchanged"]:
+            return {"domain": domain, "status": "unchanged", "baseline_id": baseline.id, "check": check}
+
+    probe = probe_fn(host, port, max_parallel=per_host)
+    if probe["der"] is None:
+        return {"domain": domain, "status": "error", "error": probe["error"]}
+    ciphers = _enumerate_for_probe(host, port, probe, max_parallel=per_host) if with_ciphers else None
+    _, readable_result = _build_ssl_result(host, probe, ciphers)
+    readable_result["domain"] = domain
+    return {"domain": domain, "status": "success", "result": readable_result}
+
+
+def _bulk_ssl_stream(domains, concurrency, per_host, save, probe_fn=_run_ssl_probe, with_ciphers=False,
+                     incremental=False):
+    """
+    Yield one NDJSON line per domain as soon as its probe finishes, then a summary line.
+    DB access happens here (the response thread), not in the pool workers.
+    """
+    started = time.time()
+    counts = {"success": 0, "unchanged": 0, "error": 0}
+    baselines = _latest_baselines(domains) if incremental else {}
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        futures = {
+            pool.submit(_bulk_scan_one, d, per_host, probe_fn, with_ciphers, baselines.get(d)): d
+            for d in domains
+        }
+        for fut in as_completed(futures):
+            try:
+                row = fut.result()
+            except Exception as e:
+                row = {"domain": futures[fut], "status": "error", "error": str(e)}
+            counts[row["status"]] += 1
+            try:
+                if save and row["status"] == "success":
+                    save_scan_history(row["domain"], "success", row["result"], None)
+                elif row["status"] == "unchanged":
+                    check = row.pop("check")
+                    if save:
+                        save_unchanged_heartbeat(row["domain"], baselines[row["domain"]], check)
+            except Exception as db_e:
+                row["db_error"] = str(db_e)
+            yield json.dumps(row, default=str) + "\n"
+    finally:
+        # client went away or we're done: drop anything still queued
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    yield json.dumps({
+        "summary": {
+            "total": len(domains),
+            "success": counts["success"],
+            "unchanged": counts["unchanged"],
+            "error": counts["error"],
+            "elapsed_seconds": round(time.time() - started, 2),
+        }
+    }) + "\n"
+
+
+# 📦 Bulk SSL sweep, streamed back as NDJSON
+@api_view(["POST"])
+def scan_ssl_bulk(request):
+    """
+    POST /api/sslscanner/scan/bulk/
+    Body: { "domains": [...], "concurrency": 32, "per_host": 5, "save": true,
+            "probe_mode": "parallel", "ciphers": false, "incremental": false }
+      or multipart with "file" (one domain per line) + the same optional fields.
+    concurrency = hosts probed at once, per_host = simultaneous handshakes per host.
+    No PDFs are generated; each line is {"domain", "status", "result" | "error"}.
+    With incremental, hosts whose cert + negotiated version match their last full
+    scan come back as status "unchanged" after a single handshake.
+    """
+    domains = _read_bulk_domains(request)
+    if not domains:
+        return Response({"error": "No domains supplied"}, status=400)
+    if len(domains) > SSL_BULK_MAX_DOMAINS:
+        return Response({"error": f"Too many domains (max {SSL_BULK_MAX_DOMAINS})"}, status=400)
+
+    try:
+        concurrency = int(request.data.get("concurrency") or SSL_BULK_DEFAULT_CONCURRENCY)
+        per_host = int(request.data.get("per_host") or len(_tls_version_candidates()) + 1)
+    except (TypeError, ValueError):
+        return Response({"error": "concurrency and per_host must be integers"}, status=400)
+    concurrency = max(1, min(concurrency, SSL_BULK_MAX_CONCURRENCY, len(domains)))
+    per_host = max(1, per_host)
+
+    save = str(request.data.get("save", "true")).lower() not in ("0", "false", "no")
+    with_ciphers = str(request.data.get("ciphers", "false")).lower() in ("1", "true", "yes")
+    incremental = str(request.data.get("incremental", "false")).lower() in ("1", "true", "yes")
+
+    probe_fn = SSL_PROBE_MODES.get(request.data.get("probe_mode") or "parallel")
+    if probe_fn is None:
+        return Response({"error": f"probe_mode must be one of {sorted(SSL_PROBE_MODES)}"}, status=400)
+
+    response = StreamingHttpResponse(
+        _bulk_ssl_stream(domains, concurrency, per_host, save, probe_fn, with_ciphers, incremental),
+        content_type="application/x-ndjson",
+    )
+    response["X-Accel-Buffering"] = "no"  # let proxies pass lines through as they come
+    return response
+
+
+# ⏳ Certificates expiring soon, across every scanned domain
+@api_view(["GET"])
+def expiring_certificates(request):
+    """
+    GET /api/sslscanner/expiring/?days=30&include_expired=false&limit=500
+    Uses only each domain's newest scan, via a range scan on the expires_at index
+    plus an indexed "no newer scan for this domain" check, so history size doesn't matter.
+    """
+    try:
+        days = int(request.GET.get("days", 30))
+        limit = min(int(request.GET.get("limit", 500)), 5000)
+    except ValueError:
+        return Response({"error": "days and limit must be integers"}, status=400)
+    include_expired = request.GET.get("include_expired", "false").lower() in ("1", "true", "yes")
+
+    now = timezone.now()
+    qs = SSLScan.objects.filter(expires_at__lte=now + datetime.timedelta(days=days))
+    if not include_expired:
+        qs = qs.filter(expires_at__gte=now)
+
+    newer = SSLScan.objects.filter(domain=OuterRef("domain"), id__gt=OuterRef("id"), expires_at__isnull=False)
+    rows = (
+        qs.filter(~Exists(newer))
+        .order_by("expires_at")
+        .values("id", "domain", "expires_at", "issuer", "status", "scan_date")[:limit]
+    )
+
+    data = []
+    for r in rows:
+        r["days_left"] = (r["expires_at"] - now).days
+        data.append(r)
+    return Response({"days": days, "count": len(data), "results": data})
+
+
+# 📊 Certificate parse cache stats (hit rate for bulk sweeps)
+@api_view(["GET"])
+def cert_cache_stats(request):
+    data = CERT_CACHE.stats()
+    try:
+        data["trust_store"] = trust_store()[1]
+    except Exception as e:
+        data["trust_store"] = {"error": str(e)}
+    return Response(data)
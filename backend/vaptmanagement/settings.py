@@ -154,6 +154,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded / generated files (SSL PDF reports, see sslscanner/report_store.py)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -173,3 +177,30 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# Network scanner: max nmap jobs running at once (the rest wait in the queue). The pool lives in
+# each server process, so with N WSGI workers up to N x NETWORK_SCAN_WORKERS scans run at once
+NETWORK_SCAN_WORKERS = config("NETWORK_SCAN_WORKERS", default=4, cast=int)
+# nmap processes running at once across all scans (a big scan is split into shards); default = CPU count
+NETWORK_SCAN_SHARD_WORKERS = config("NETWORK_SCAN_SHARD_WORKERS", default=0, cast=int) or None
+# diff-mode scans still do a full sweep when the baseline is older than this
+NETWORK_DIFF_FULL_SWEEP_DAYS = config("NETWORK_DIFF_FULL_SWEEP_DAYS", default=7, cast=int)
+# CVE data for service version matching: build the index with `manage.py build_cve_index`
+NETWORK_CVE_SOURCE = config("NETWORK_CVE_SOURCE", default=str(BASE_DIR / "data" / "nvd"))
+NETWORK_CVE_INDEX = config("NETWORK_CVE_INDEX", default=str(BASE_DIR / "data" / "cve_index.bin"))
+# in-process connect scanner: max concurrent connection attempts / attempts per second per host
+CONNECT_SCAN_SOCKET_BUDGET = config("CONNECT_SCAN_SOCKET_BUDGET", default=512, cast=int)
+CONNECT_SCAN_HOST_RATE = config("CONNECT_SCAN_HOST_RATE", default=200, cast=int)
+# hard cap on one nmap run; the adaptive deadline (hosts x ports x RTT) is extended up to this
+NETWORK_SCAN_MAX_TIMEOUT = config("NETWORK_SCAN_MAX_TIMEOUT", default=4 * 3600, cast=int)
+# host discovery results are reused per subnet for this many seconds
+NETWORK_DISCOVERY_TTL = config("NETWORK_DISCOVERY_TTL", default=900, cast=int)
+# shared HTTP client for probes (scan_utils/http_client.py): hosts with a pool / connections per host
+HTTP_POOL_CONNECTIONS = config("HTTP_POOL_CONNECTIONS", default=100, cast=int)
+HTTP_POOL_MAXSIZE = config("HTTP_POOL_MAXSIZE", default=10, cast=int)
+# HTTP/2 via httpx + h2 (in requirements.txt); False falls back to requests over HTTP/1.1
+HTTP_CLIENT_HTTP2 = config("HTTP_CLIENT_HTTP2", default=True, cast=bool)
+# subdomain brute-forcing: names resolved per second / lookups in flight, optional default wordlist file
+DOMAIN_ENUM_RATE = config("DOMAIN_ENUM_RATE", default=500, cast=int)
+DOMAIN_ENUM_CONCURRENCY = config("DOMAIN_ENUM_CONCURRENCY", default=256, cast=int)
+DOMAIN_SUBDOMAIN_WORDLIST = config("DOMAIN_SUBDOMAIN_WORDLIST", default="")
@@ -1,6 +1,10 @@
 import React, { useState, useEffect } from "react";
 import "../../styles/networkscanner.css";
 
+const API_BASE = "http://localhost:8000/api/networkscanner";
+// send the session cookie so anonymous scans land in the same history
+const FETCH_OPTS = { credentials: "include" };
+
 function NetworkScanner() {
   const [ip, setIp] = useState("");
   const [ports, setPorts] = useState("1-1024");
@@ -8,13 +12,49 @@ function NetworkScanner() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
 
+  const [scanId, setScanId] = useState(null);
+  const [progress, setProgress] = useState([]);
+
+  useEffect(() => {
+    let poll;
+    if (scanId && loading) {
+      poll = setInterval(async () => {
+        try {
+          const res = await fetch(`${API_BASE}/status/${scanId}/`, FETCH_OPTS);
+          const d = await res.json();
+          if (!res.ok) throw new Error(d.error || "Failed to get status");
+          setProgress(d.progress || []);
+          if (d.status === "finished") {
+            const rr = await fetch(`${API_BASE}/results/${scanId}/`, FETCH_OPTS);
+            const rd = await rr.json();
+            setResults(rd.results || []);
+            setLoading(false);
+            clearInterval(poll);
+          } else if (d.status === "error") {
+            setError(d.error || "Scan failed");
+            setLoading(false);
+            clearInterval(poll);
+          }
+        } catch (err) {
+          setError(err.message);
+          setLoading(false);
+          clearInterval(poll);
+        }
+      }, 2000);
+    }
+    return () => clearInterval(poll);
+  }, [scanId, loading]);
+
   const handleScan = async () => {
     setLoading(true);
     setError("");
     setResults([]);
+    setProgress([]);
+    setScanId(null);
 
     try {
-      const response = await fetch("http://localhost:8000/api/networkscanner/scan/", {
+      const response = await fetch(`${API_BASE}/scan/`, {
+        ...FETCH_OPTS,
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ ip: ip || "127.0.0.1", ports })
@@ -22,16 +62,15 @@ function NetworkScanner() {
 
       const data = await response.json();
       if (!response.ok) throw new Error(data.error || "Scan failed");
-      setResults(data.results || []);
+      setScanId(data.scan_id);
     } catch (err) {
       setError(err.message);
-    } finally {
       setLoading(false);
     }
   };
 
   const handleDownloadPDF = () => {
-    window.open("http://localhost:8000/api/networkscanner/download-pdf/", "_blank");
+    window.open(`${API_BASE}/download-pdf/${scanId}/`, "_blank");
   };
 
   return (
@@ -61,6 +100,11 @@ function NetworkScanner() {
       </div>
 
       {error && <p className="error-message">{error}</p>}
+      {loading && progress.length > 0 && (
+        <p className="scan-progress">
+          {progress.map((p) => `${p.stage}: ${p.status}`).join(" | ")}
+        </p>
+      )}
 
       {results.length > 0 && (
         <div className="results-table">